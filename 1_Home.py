@@ -26,6 +26,7 @@ col1, col2, col3 = st.columns(3)
 with col1:
     st.subheader("📊 Data Exploration Tools")
     st.write("Visualize trends and compare counties across multiple key public health datasets.")
+    st.page_link("pages/15_Indicator_Search.py", label="Indicator Search (all datasets)", icon="🔎")
     st.page_link("pages/2_CHIRS_Indicators.py", label="CHIRS Indicators", icon="📈")
     st.page_link("pages/3_Prevention_Agenda.py", label="Prevention Agenda Trends", icon="🎯")
     st.page_link("pages/4_MCH_Dashboard.py", label="Maternal & Child Health", icon="🤰")
@@ -36,8 +37,11 @@ with col2:
     st.subheader("⚖️ Analysis & Prioritization")
     st.write("Synthesize data and make informed decisions with AI-powered summaries and structured planning frameworks.")
     st.page_link("pages/12_County_Snapshot.py", label="County Health Snapshot", icon="🏥")
+    st.page_link("pages/13_Statewide_Map.py", label="Statewide Indicator Map", icon="🗺️")
+    st.page_link("pages/16_Correlation_Explorer.py", label="Indicator Correlations", icon="🔗")
     st.page_link("pages/9_Hanlon_Prioritization.py", label="Hanlon Prioritization Tool", icon="🧮")
     st.page_link("pages/10_SDoH_Explorer.py", label="Social Determinants of Health", icon="📊") # Corrected page number for SDoH
+    st.page_link("pages/14_EJScreen_Explorer.py", label="Environmental Justice (EJScreen)", icon="🌳")
 
 with col3:
     st.subheader("✍️ Strategic Planning & Reporting")
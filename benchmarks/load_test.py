@@ -0,0 +1,191 @@
+# benchmarks/load_test.py
+"""Drives concurrent scripted user journeys through the real pages with Streamlit's AppTest and reports rerun latency
+percentiles and memory growth as the number of simultaneous sessions rises.
+
+    python -m benchmarks.load_test                          # 1, 2, 4 and 8 sessions on 1x synthetic data
+    python -m benchmarks.load_test --sessions 1 4 16 --scale 10 --ai-latency 0.5
+
+All sessions share this process, and therefore the st.cache_data / st.cache_resource caches, as they would on one
+server. The Census API and Gemini are replaced by local stubs; --ai-latency makes the Gemini stub sleep like a real call.
+Each journey: CHIRS dashboard (pick an indicator and years, generate and save an analysis), County Snapshot for a
+random county, then the Report Builder with the saved analysis and the report assembly its download button runs."""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+
+ROOT = Path(__file__).parent.parent
+PAGES = {"chirs": "pages/2_CHIRS_Indicators.py", "snapshot": "pages/12_County_Snapshot.py", "report": "pages/5_Report_Builder.py"}
+PERCENTILES = (50, 95, 99)
+TIMEOUT_SECONDS = 300
+
+# ==============================================================================
+# --- Stubs ---
+# ==============================================================================
+def fake_census_get(url, params=None, **kwargs):
+    """Census API stand-in: a label for every requested variable and deterministic values for every NY county."""
+    response = mock.Mock(status_code=200)
+    response.raise_for_status = lambda: None
+    if url.endswith("variables.json"):
+        response.json = lambda: {"variables": {code: {"label": f"Estimate!!Total!!{code}"} for code in ("B01003_001E", "B19013_001E", "B17001_002E")}}
+    else:
+        variables = params["get"].split(",")
+        county = params["for"].split(":")[1]
+        fips = [f"{n:03d}" for n in range(1, 124, 2)] if county == "*" else [county]
+        rows = [variables + ["state", "county"]]
+        rows += [[f"County {f}" if v == "NAME" else str(1000 + (int(f) * 7919 + j * 104729) % 90000) for j, v in enumerate(variables)] + ["36", f]
+                 for f in fips]
+        response.json = lambda: rows
+    return response
+
+def fake_ai_response(latency):
+    def respond(prompt):
+        if latency: time.sleep(latency)
+        return "Stubbed analysis. " * 40
+    return respond
+
+# ==============================================================================
+# --- Journeys ---
+# ==============================================================================
+def _timed_run(at, timings, step):
+    start = time.perf_counter()
+    at.run(timeout=TIMEOUT_SECONDS)
+    timings.append((step, time.perf_counter() - start))
+    if at.exception: raise RuntimeError(f"{step}: {at.exception[0].value}")
+    return at
+
+def _widget(widgets, label_part):
+    return next(w for w in widgets if label_part in w.label)
+
+def journey(session_number):
+    """One user's path through the app; returns [(step, seconds), ...] for every rerun."""
+    from streamlit.testing.v1 import AppTest
+    from modules import reports
+    rng = random.Random(session_number)
+    timings = []
+
+    at = _timed_run(AppTest.from_file(str(ROOT / PAGES["chirs"])), timings, "chirs_open")
+    indicator = _widget(at.sidebar.selectbox, "Indicator")
+    indicator.select(rng.choice(indicator.options))
+    _timed_run(at, timings, "chirs_pick_indicator")
+    years = _widget(at.sidebar.multiselect, "Years")
+    years.set_value(years.options[:3])
+    _timed_run(at, timings, "chirs_pick_years")
+    _widget(at.button, "Generate Insights").click()
+    _timed_run(at, timings, "chirs_generate")
+    _widget(at.button, "Save This Analysis").click()
+    _timed_run(at, timings, "chirs_save")
+    saved = list(at.session_state["saved_analyses"])
+
+    at = _timed_run(AppTest.from_file(str(ROOT / PAGES["snapshot"])), timings, "snapshot_open")
+    county = _widget(at.sidebar.selectbox, "County")
+    county.select(rng.choice(county.options))
+    _timed_run(at, timings, "snapshot_pick_county")
+
+    at = AppTest.from_file(str(ROOT / PAGES["report"]))
+    at.session_state["saved_analyses"] = saved
+    _timed_run(at, timings, "report_open")
+    # The download button assembles the document lazily; time the same call it makes.
+    start = time.perf_counter()
+    sections = [reports.render_analysis_section(snap) for snap in saved]
+    reports.build_report_html("Consolidated Report", "<h1>Consolidated Report</h1>", sections, reports.ANALYSIS_REPORT_CSS, allow_cdn=True)
+    timings.append(("report_download", time.perf_counter() - start))
+    return timings
+
+# ==============================================================================
+# --- Measurement ---
+# ==============================================================================
+def rss_mb():
+    """Current resident set size (Linux), falling back to the peak on other platforms."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+def summarize(level, timings, wall_seconds, rss, baseline_rss, errors):
+    seconds = np.array([t for _, t in timings]) * 1000
+    row = {"Sessions": level, "Reruns": len(seconds), "Errors": errors}
+    row.update({f"p{p} ms": round(float(np.percentile(seconds, p)), 1) if len(seconds) else None for p in PERCENTILES})
+    row.update({"Max ms": round(float(seconds.max()), 1) if len(seconds) else None, "Reruns/s": round(len(seconds) / wall_seconds, 1),
+                "RSS MB": round(rss, 1), "Growth MB": round(rss - baseline_rss, 1)})
+    return row
+
+def step_breakdown(timings):
+    frame = pd.DataFrame(timings, columns=["Step", "Seconds"])
+    return frame.groupby("Step", sort=False)["Seconds"].describe(percentiles=[p / 100 for p in PERCENTILES])[["count", "50%", "95%", "99%"]].mul(
+        [1, 1000, 1000, 1000]).round(1).rename(columns={"count": "Reruns", "50%": "p50 ms", "95%": "p95 ms", "99%": "p99 ms"})
+
+def run_level(level, journeys_per_session):
+    errors, timings, lock = 0, [], threading.Lock()
+    def session(number):
+        nonlocal errors
+        for repeat in range(journeys_per_session):
+            try:
+                result = journey(number * 1000 + repeat)
+            except Exception as e:
+                with lock: errors += 1
+                print(f"  session {number}: {e}", file=sys.stderr)
+                continue
+            with lock: timings.extend(result)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=level) as pool:
+        list(pool.map(session, range(level)))
+    return timings, time.perf_counter() - start, errors
+
+def prepare_data(scale):
+    """Synthetic data files plus the real county boundaries, in a directory the app is pointed at via NYS_DATA_DIR."""
+    paths = synthetic.write_files(scale)
+    directory = next(iter(paths.values())).parent
+    missing = set(synthetic.FILE_NAMES) - set(paths)
+    if missing: raise SystemExit(f"Scale {scale}x is too large to write {', '.join(sorted(missing))} as xlsx; use a smaller --scale.")
+    shutil.copy(ROOT / "data" / "NYS_Counties.geojson", directory / "NYS_Counties.geojson")
+    return directory
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--journeys-per-session", type=int, default=1)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--ai-latency", type=float, default=0.0, help="Seconds the Gemini stub sleeps per call.")
+    parser.add_argument("--output", type=Path, help="Also write the summary and per-step breakdown as JSON.")
+    args = parser.parse_args(argv)
+
+    # Must be set before any page imports modules.config.
+    os.environ["NYS_DATA_DIR"] = str(prepare_data(args.scale))
+    os.chdir(ROOT)
+    with mock.patch("requests.get", fake_census_get), mock.patch("modules.ai_analysis._get_ai_response", fake_ai_response(args.ai_latency)):
+        start = time.perf_counter()
+        warmup, _, _ = run_level(1, 1)  # Fills the shared caches; cold-start cost is reported separately.
+        print(f"Warm-up journey (cold caches): {time.perf_counter() - start:.1f}s over {len(warmup)} reruns")
+        baseline_rss = rss_mb()
+        rows, breakdown = [], None
+        for level in args.sessions:
+            timings, wall_seconds, errors = run_level(level, args.journeys_per_session)
+            rows.append(summarize(level, timings, wall_seconds, rss_mb(), baseline_rss, errors))
+            print(pd.DataFrame([rows[-1]]).to_string(index=False, header=len(rows) == 1), flush=True)
+            breakdown = step_breakdown(timings) if timings else breakdown
+
+    if breakdown is not None:
+        print(f"\nPer-step latency at {args.sessions[-1]} sessions:")
+        print(breakdown.to_string())
+    if args.output:
+        args.output.write_text(json.dumps({"levels": rows, "steps": breakdown.reset_index().to_dict("records") if breakdown is not None else []}, indent=2))
+    return 1 if any(row["Errors"] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
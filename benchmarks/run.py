@@ -0,0 +1,221 @@
+# benchmarks/run.py
+"""Times the data paths behind the dashboards on synthetic data and compares against a stored baseline.
+
+    python -m benchmarks.run                      # 1x and 10x, print results
+    python -m benchmarks.run --scales 1 10 100    # 100x skips xlsx loaders (see synthetic.XLSX_MAX_ROWS)
+    python -m benchmarks.run --save-baseline      # store results as the new baseline
+    python -m benchmarks.run --compare            # exit 1 if anything regressed beyond --tolerance
+
+Cached (st.cache_data) functions are timed through __wrapped__, so every repetition does the real work."""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from benchmarks import synthetic
+from modules import utils, geo, cube, hanlon, trends, reports, census_mirror, catalog, correlation, regions, counties
+from modules.config import CONFIGS, GEOJSON_FILE_PATH, PA_LATEST_FILE_PATH
+from modules.ui_components import filter_options
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+MIN_REPEATS, MAX_REPEATS, TARGET_SECONDS = 3, 50, 1.0
+REPORT_SECTIONS = 20
+DASHBOARD_FRAMES = {"CHIRS Indicators": "chirs", "Prevention Agenda Trends": "pa", "MCH Dashboard": "mch"}
+CUBE_SOURCES = {"CHIRS Indicators": "chirs", "Prevention Agenda": "pa", "Maternal & Child Health": "mch", "County Health Rankings": "chr"}
+# The cached loaders behind utils.load_*_data, keyed by (file_path, version).
+LOADERS = {"chirs": utils._load_chirs_data, "pa": utils._load_prevention_data, "mch": utils._load_mch_data, "chr": utils._load_chr_trend_data}
+
+# ==============================================================================
+# --- Fixtures ---
+# ==============================================================================
+def loaded_frames(raw):
+    """Synthetic frames after each real loader's cleaning; file reads are replaced by the in-memory frame."""
+    frames = {}
+    for name, df in raw.items():
+        reader = "pandas.read_excel" if synthetic.FILE_NAMES[name].endswith(".xlsx") else "pandas.read_csv"
+        if name == "pa":  # The PA loader reads everything as text.
+            df = df.astype(str)
+        with mock.patch(reader, return_value=df.copy()):
+            frames[name] = LOADERS[name].__wrapped__(synthetic.FILE_NAMES[name], None)
+    return frames
+
+def dashboard_selections(df, config):
+    """First option of each selectbox and the configured defaults (or first seven options) of each multiselect, as a user would see."""
+    filters = {}
+    for i, f_config in enumerate(config["filters"]):
+        options = filter_options(df, config, filters, i)
+        if f_config["type"] == "selectbox":
+            filters[f_config["label"]] = options[0]
+        else:
+            default = f_config.get("default", [])
+            chosen = options if default == "all" else [d for d in default if d in options]
+            filters[f_config["label"]] = chosen or options[:7]
+    return filters
+
+def saved_analysis(df, config):
+    filters = dashboard_selections(df, config)
+    chart_json = utils.create_chart(utils.filter_data(df, config, filters), config).to_json()
+    return {"dashboard": config["title"], "indicator": filters[config["indicator_label"]], "filters": filters,
+            "data_source": ["Synthetic"], "data_notes": ["Unstable Estimate"], "analysis_text": "Synthetic **analysis** text.\n\n" * 5,
+            "chart_json": chart_json}
+
+def chip_plan(pa_df, county):
+    row = pa_df[(pa_df["County Name"] == county) & ~pa_df["Data Years"].str.contains("-")].iloc[0]
+    _, latest, trend_df = utils.get_pa_data_for_chip(pa_df, row["Priority Area"], row["Focus Area"], row["Indicator"], county)
+    return {"county": county, "priority_area": row["Priority Area"], "focus_area": row["Focus Area"], "indicator": row["Indicator"],
+            "overarching_goal": "Goal", "objectives": [{"text": "Reduce by 10%"}] * 3, "official_objective": "24.0", "latest_data": latest,
+            "disparities": "Rural residents", "trend_data": trend_df[["Data Years", "Percentage/Rate/Ratio"]].to_dict("records"),
+            "strategies": [{"activity": "Outreach\nprogram", "partners": "Hospitals", "timeframe": "2025", "evaluation": "Surveys", "outcome": "Improved"}] * 3}
+
+# ==============================================================================
+# --- Benchmarks ---
+# ==============================================================================
+def cases(scale):
+    """(name, callable) pairs for one scale; setup work happens here and is not timed."""
+    raw = synthetic.frames(scale)
+    paths = synthetic.write_files(scale)
+    frames = loaded_frames(raw)
+    index = geo.get_county_index(GEOJSON_FILE_PATH)
+    pa_df = frames["pa"]
+
+    for name, path in paths.items():
+        yield f"load_{name}", lambda loader=LOADERS[name], path=path: loader.__wrapped__(path, None)
+    # The most-recent-year extract behind the latest-value pages (modules/tiers.py): each key's latest row.
+    latest_path = paths["pa"].with_name(PA_LATEST_FILE_PATH.name)
+    if not latest_path.exists():
+        raw_pa = raw["pa"].astype(str)
+        years = utils.end_year(raw_pa["Data Years"])
+        raw_pa[years == years.groupby([raw_pa[col] for col in hanlon.KEY_COLS]).transform("max")].to_csv(latest_path, index=False)
+    yield "load_pa_latest", lambda: LOADERS["pa"].__wrapped__(latest_path, None)
+
+    for title, key in DASHBOARD_FRAMES.items():
+        config, df = CONFIGS[title], frames[key]
+        filters = dashboard_selections(df, config)
+        def dashboard_filter(config=config, df=df, filters=filters):
+            for i in range(len(config["filters"])):
+                filter_options(df, config, filters, i)
+            return utils.filter_data(df, config, filters)
+        yield f"dashboard_filter_{key}", dashboard_filter
+        filtered = utils.filter_data(df, config, filters)
+        yield f"chart_to_json_{key}", lambda filtered=filtered, config=config: utils.create_chart(filtered, config).to_json()
+
+    cube_frames = {source: frames[key] for source, key in CUBE_SOURCES.items()}
+    yield "cube_build", lambda: cube.build_cube(cube_frames, index)
+    indicator_cube = cube.build_cube(cube_frames, index)
+    # One newly published Prevention Agenda year, as modules/ingest.py would append it.
+    pa_years = utils.end_year(pa_df["Data Years"])
+    new_year = pa_df[pa_years == pa_years.max()].assign(**{"Data Years": str(int(pa_years.max()) + 1)})
+    yield "cube_apply_delta", lambda: cube.apply_delta(indicator_cube, {"Prevention Agenda": new_year}, index)
+    metrics = [(source, indicator) for source, indicator in zip(indicator_cube["indicators"]["source"], indicator_cube["indicators"]["indicator"])][:8]
+    def snapshot_all_counties():
+        for county in synthetic.COUNTIES:
+            for source, indicator in metrics:
+                cube.latest_metric(indicator_cube, county, source, indicator)
+    yield "snapshot_all_counties", snapshot_all_counties
+
+    correlation_matrix, _ = correlation.county_matrix(indicator_cube, pd.DataFrame())
+    yield "correlation_pairwise", lambda: correlation.pairwise_corr(correlation_matrix)
+
+    yield "catalog_build", lambda: catalog.build_catalog(cube_frames)
+    indicator_catalog = catalog.build_catalog(cube_frames)
+    def catalog_search():
+        for query in ("obesity", "infant mortalty", "prenatal care", "cancer incidence", "smoking adults"):
+            catalog.search(indicator_catalog, query)
+    yield "catalog_search", catalog_search
+
+    mirror = next(iter(paths.values())).parent / "census"
+    if not mirror.exists(): census_mirror.ingest_file(synthetic.write_acs_table(mirror.parent), root=mirror)
+    acs_variables = ["NAME", "B01003_001E", "B01003_003E", "B01003_005E"]
+    yield "census_mirror_lookup", lambda: census_mirror.lookup("acs/acs5", "2022", acs_variables, "county:*", {"in": "state:36"}, root=mirror)
+
+    region_defs = regions.definitions()
+    for title, key in DASHBOARD_FRAMES.items():
+        spec = regions.dataset_spec(title, frames[key])
+        yield f"regions_aggregate_{key}", lambda df=frames[key], spec=spec: regions.aggregate(df, spec, region_defs)
+
+    plan_row = pa_df[~pa_df["Data Years"].str.contains("-")].iloc[0]
+    yield "pa_data_for_chip", lambda: utils.get_pa_data_for_chip(pa_df, plan_row["Priority Area"], plan_row["Focus Area"], plan_row["Indicator"], plan_row["County Name"])
+    yield "hanlon_score_and_rank", lambda: hanlon.rank_priorities(hanlon.score_latest(pa_df), {})
+    yield "trends_fit_chr", lambda: trends.fit_trends(frames["chr"], [counties.KEY, "measurename"], "year", "rawvalue", ci_cols=("cilow", "cihigh"))
+
+    snaps = [saved_analysis(frames[key], CONFIGS[title]) for title, key in DASHBOARD_FRAMES.items()] * (REPORT_SECTIONS // 3 + 1)
+    snaps = snaps[:REPORT_SECTIONS]
+    def analysis_report():
+        sections = [reports._render_analysis_section.__wrapped__(str(i), {f: s.get(f) for f in reports.ANALYSIS_SECTION_FIELDS}) for i, s in enumerate(snaps)]
+        return reports.build_report_html("Report", "<h1>Report</h1>", sections, reports.ANALYSIS_REPORT_CSS, allow_cdn=True)
+    yield "report_builder_html", analysis_report
+
+    plans = [chip_plan(pa_df, county) for county in synthetic.COUNTIES[:REPORT_SECTIONS]]
+    def chip_report():
+        sections = [reports._render_chip_section.__wrapped__(str(i), plan) for i, plan in enumerate(plans)]
+        return reports.build_report_html("CHIP", "<h1>CHIP</h1>", sections, reports.CHIP_REPORT_CSS, allow_cdn=True)
+    yield "chip_report_html", chip_report
+
+# ==============================================================================
+# --- Measurement ---
+# ==============================================================================
+def measure(func):
+    """Median/min wall time over enough repetitions to fill TARGET_SECONDS, and peak traced memory of one extra run."""
+    times = []
+    while len(times) < MIN_REPEATS or (sum(times) < TARGET_SECONDS and len(times) < MAX_REPEATS):
+        start = time.perf_counter(); func(); times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median_s": statistics.median(times), "min_s": min(times), "repeats": len(times), "peak_mb": peak / 2 ** 20}
+
+def run(scales, only=None):
+    results = {}
+    for scale in scales:
+        for name, func in cases(scale):
+            if only and not any(pattern in name for pattern in only): continue
+            key = f"{name}@{scale}x"
+            results[key] = measure(func)
+            print(f"{key:<36} {results[key]['median_s'] * 1000:>10.2f} ms  {results[key]['peak_mb']:>8.1f} MB", flush=True)
+    return results
+
+def compare(results, baseline, tolerance):
+    """Rows for every benchmark present in both runs; time or memory above (1 + tolerance) x baseline is a regression."""
+    rows = []
+    for key, current in results.items():
+        if key not in baseline: continue
+        time_ratio = current["median_s"] / baseline[key]["median_s"]
+        memory_ratio = current["peak_mb"] / baseline[key]["peak_mb"] if baseline[key]["peak_mb"] else 1.0
+        rows.append({"Benchmark": key, "Time Ratio": round(time_ratio, 2), "Memory Ratio": round(memory_ratio, 2),
+                     "Regression": time_ratio > 1 + tolerance or memory_ratio > 1 + tolerance})
+    return pd.DataFrame(rows, columns=["Benchmark", "Time Ratio", "Memory Ratio", "Regression"])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--only", nargs="+", help="Run only benchmarks whose name contains one of these strings.")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--output", type=Path, help="Also write this run's results as JSON.")
+    args = parser.parse_args(argv)
+
+    results = run(args.scales, args.only)
+    if args.output: args.output.write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+        baseline.update(results)
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        print(f"Baseline saved to {BASELINE_FILE}")
+    if args.compare:
+        if not BASELINE_FILE.exists():
+            print("No baseline stored yet; run with --save-baseline first."); return 1
+        table = compare(results, json.loads(BASELINE_FILE.read_text()), args.tolerance)
+        print(table.to_string(index=False))
+        return 1 if table["Regression"].any() else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# benchmarks/synthetic.py
+"""Synthetic CHIRS / Prevention Agenda / MCH / CHR data shaped like the real files, at a chosen multiple of their size.
+
+Sizes grow by adding indicators (CHR: counties in other states), so every scale keeps 62 NY counties and ~10 data years.
+Generated files are kept under benchmarks/.data/<scale>x/ and reused by later runs."""
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from modules.utils import NY_COUNTY_FIPS_MAP
+
+DATA_ROOT = Path(__file__).parent / ".data"
+# Approximate rows in the real files at 1x.
+BASE_ROWS = {"chirs": 60_000, "pa": 40_000, "mch": 10_500, "chr": 60_000}
+YEARS = list(range(2013, 2023))
+COUNTIES = [name.split(" (")[0] for name in NY_COUNTY_FIPS_MAP]
+# openpyxl cannot write more rows than Excel allows, and writing a few hundred thousand rows already takes minutes.
+XLSX_MAX_ROWS = 250_000
+FILE_NAMES = {"chirs": "chir_county_trend.xlsx", "pa": "PreventionAgendaTrackingIndicators-CountyTrendData.csv",
+              "mch": "MCH-CountyTrendData.xlsx", "chr": "chr_trends_csv_2024.csv"}
+
+def _grid(n_rows, n_per_indicator):
+    """Row-wise (indicator, county, year) codes for enough indicators to reach n_rows."""
+    n_indicators = max(1, round(n_rows / n_per_indicator))
+    indicator = np.repeat(np.arange(n_indicators), n_per_indicator)
+    county = np.tile(np.repeat(np.arange(len(COUNTIES)), len(YEARS)), n_indicators)
+    year = np.tile(np.array(YEARS), n_indicators * len(COUNTIES))
+    return indicator, county, year
+
+def _values(rng, indicator, year):
+    base = 10 + (indicator * 37 % 90)
+    return np.round(base + 0.3 * (year - YEARS[0]) + rng.normal(0, 2, len(indicator)), 1)
+
+def _notes(rng, n, labels):
+    return np.where(rng.random(n) < 0.1, rng.choice(labels, n), "")
+
+def chirs_frame(scale, rng):
+    indicator, county, year = _grid(BASE_ROWS["chirs"] * scale, len(COUNTIES) * len(YEARS))
+    return pd.DataFrame({
+        "Geographic area": np.array([f"{c} County" for c in COUNTIES])[county], "Year": year.astype(str),
+        "Topic Area": np.char.add("Topic ", (indicator % 20).astype(str)), "Indicator Title": np.char.add("CHIRS indicator ", indicator.astype(str)),
+        "Rate/Percent": _values(rng, indicator, year), "Data Source": "Vital Statistics", "Data Notes": _notes(rng, len(indicator), ["*", "Unstable estimate"])
+    })
+
+def pa_frame(scale, rng):
+    indicator, county, year = _grid(BASE_ROWS["pa"] * scale, len(COUNTIES) * len(YEARS))
+    n = len(indicator)
+    values = _values(rng, indicator, year)
+    return pd.DataFrame({
+        "County Name": np.array(COUNTIES)[county], "Priority Area Number": (indicator % 6).astype(str),
+        "Priority Area": np.char.add("Priority Area ", (indicator % 6).astype(str)), "Focus Area Number": (indicator % 24).astype(str),
+        "Focus Area": np.char.add("Focus Area ", (indicator % 24).astype(str)), "Indicator Order on County Dashboard": indicator.astype(str),
+        "Indicator ID": indicator.astype(str), "Indicator": np.char.add("PA indicator ", indicator.astype(str)),
+        "Event Count/Rate": rng.integers(0, 3000, n).astype(str), "Average Number of Denominator/Rate": rng.integers(1000, 90000, n).astype(str),
+        "Measure Unit": "Percent", "Percentage/Rate/Ratio": values.astype(str),
+        "Lower Limit of 95% CI": (values - 1.5).round(1).astype(str), "Upper Limit of 95% CI": (values + 1.5).round(1).astype(str),
+        "Data Comments": _notes(rng, n, ["Unstable Estimate", "Data Suppressed"]),
+        "Quartile": rng.choice(["24.1+ : Q4", "< 22.5 : Q1 - Q2", "73.3+ : Q3 - Q4", "Data Not Available (N/A)/Data suppressed (s)"], n),
+        "2024 Objective": (values.mean() * 0.9).round(1).astype(str), "Objective Region": "NYS",
+        "Data Years": np.where(indicator % 3 == 0, np.char.add(np.char.add((year - 2).astype(str), "-"), year.astype(str)), year.astype(str)),
+        "Date Source": "BRFSS"
+    })
+
+def mch_frame(scale, rng):
+    indicator, county, year = _grid(BASE_ROWS["mch"] * scale, len(COUNTIES) * len(YEARS))
+    n = len(indicator)
+    values = _values(rng, indicator, year)
+    return pd.DataFrame({
+        "County Name": np.array(COUNTIES)[county], "Domain Area": np.char.add("Domain ", (indicator % 5).astype(str)),
+        "Indicator Number": indicator.astype(str), "Indicator": np.char.add("MCH indicator ", indicator.astype(str)),
+        "MCH Objective": (values.mean() * 0.9).round(1), "MCH Objective Year": 2024,
+        "Event Count/Rate": rng.integers(0, 3000, n), "Average Number of Denominator/Rate": rng.integers(1000, 90000, n),
+        "Percentage/Rate": values, "Lower Limit of 95% CI": values - 1.5, "Upper Limit of 95% CI": values + 1.5,
+        "Data Comments": _notes(rng, n, ["Unstable Estimate", "Data Suppressed"]),
+        "Data Years": np.char.add(np.char.add((year - 2).astype(str), "-"), year.astype(str)), "Date Source": "Vital Statistics"
+    })
+
+def chr_frame(scale, rng):
+    # The real file is national; roughly 40% of these rows are New York, the rest other states the loader filters out.
+    n_measures = 40
+    n_counties = max(len(COUNTIES), round(BASE_ROWS["chr"] * scale / (n_measures * len(YEARS))))
+    county = np.repeat(np.arange(n_counties), n_measures * len(YEARS))
+    measure = np.tile(np.repeat(np.arange(n_measures), len(YEARS)), n_counties)
+    year = np.tile(np.array(YEARS), n_counties * n_measures)
+    values = _values(rng, measure, year)
+    is_ny = county < len(COUNTIES)
+    return pd.DataFrame({
+        "statecode": np.where(is_ny, "36", "01"),
+        "countycode": np.where(is_ny, np.array(list(NY_COUNTY_FIPS_MAP.values()))[np.minimum(county, len(COUNTIES) - 1)], (county % 1000 + 1).astype(str)),
+        "county": np.where(is_ny, np.array(COUNTIES)[np.minimum(county, len(COUNTIES) - 1)], np.char.add("County ", county.astype(str))),
+        "measurename": np.char.add("CHR measure ", measure.astype(str)),
+        "yearspan": np.char.add(np.char.add((year - 2).astype(str), "-"), year.astype(str)),
+        "rawvalue": values, "cilow": values - 1.5, "cihigh": values + 1.5
+    })
+
+FRAMES = {"chirs": chirs_frame, "pa": pa_frame, "mch": mch_frame, "chr": chr_frame}
+
+def frames(scale, seed=0):
+    """In-memory synthetic frames for every dataset at `scale`x."""
+    rng = np.random.default_rng(seed)
+    return {name: build(scale, rng) for name, build in FRAMES.items()}
+
+def write_acs_table(directory, table="B01003", variables=6, seed=0):
+    """A data.census.gov-style ACS table download (codes row, labels row, then values) for the NY counties, for modules/census_mirror.py."""
+    rng = np.random.default_rng(seed)
+    codes = [f"{table}_{i:03d}{kind}" for i in range(1, variables + 1) for kind in "EM"]
+    rows = [["GEO_ID", "NAME"] + codes, ["Geography", "Geographic Area Name"] + [f"Estimate!!Total!!Item {c}" for c in codes]]
+    rows += [[f"0500000US36{fips}", f"{name} County, New York"] + [str(v) for v in rng.integers(100, 1_000_000, len(codes))]
+             for name, fips in NY_COUNTY_FIPS_MAP.items()]
+    path = Path(directory) / f"ACSDT5Y2022.{table}-Data.csv"
+    pd.DataFrame(rows).to_csv(path, index=False, header=False)
+    return path
+
+def write_files(scale, seed=0):
+    """Writes the synthetic datasets to disk (once per scale) and returns {dataset: path}; xlsx datasets too large to write are left out."""
+    directory = DATA_ROOT / f"{scale}x"
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name, df in frames(scale, seed).items():
+        path = directory / FILE_NAMES[name]
+        if path.suffix == ".xlsx" and len(df) > XLSX_MAX_ROWS: continue
+        if not path.exists():
+            df.to_excel(path, index=False) if path.suffix == ".xlsx" else df.to_csv(path, index=False, encoding="latin-1")
+        paths[name] = path
+    return paths
@@ -1,6 +1,7 @@
 # modules/ai_analysis.py
 import streamlit as st
 import google.generativeai as genai
+from modules import perf
 
 # --- More Robust API Key Configuration ---
 # This allows the app to run locally without a secrets file.
@@ -16,6 +17,7 @@ except (KeyError, FileNotFoundError):
     st.warning("🔑 AI features disabled. For local development, create a .streamlit/secrets.toml file with your GEMINI_API_KEY. For deployment, add it to your Streamlit Cloud secrets.", icon="⚠️")
     pass
 
+@perf.timed("gemini")
 def _get_ai_response(prompt):
     """Internal function to handle API calls and errors."""
     if not API_KEY_CONFIGURED:
@@ -0,0 +1,124 @@
+# modules/analysis_store.py
+import streamlit as st
+import pandas as pd
+import hashlib
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from modules import utils, regions, perf
+from modules.config import CONFIGS
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+# Saved analyses keep only what is needed to redraw and re-derive them: the filter selections,
+# the dataset version they were computed against, the AI text and the rendered chart spec.
+# The filtered data itself is rehydrated from the shared (cached) dataset on demand.
+#
+# Optionally, chart specs above the threshold spill to a content-addressed store on local disk,
+# so identical charts saved by different users are stored once.
+SPILL_TO_DISK = os.environ.get("NYS_SPILL_TO_DISK", "0") == "1"
+SPILL_DIR = Path(os.environ.get("NYS_SPILL_DIR", Path(__file__).parent.parent / ".analysis_store"))
+SPILL_THRESHOLD_BYTES = int(os.environ.get("NYS_SPILL_THRESHOLD_BYTES", 32 * 1024))
+# Filter lists longer than this are left out of the human-readable summary shown in reports.
+MAX_DISPLAY_FILTER_VALUES = 5
+
+# ==============================================================================
+# --- Saved Analyses ---
+# ==============================================================================
+def make_saved_analysis(config, filters, analysis_text, notes, sources):
+    return {
+        "dashboard": config["title"], "indicator": filters[config['indicator_label']],
+        "filters": {k: v for k, v in filters.items() if not (isinstance(v, list) and len(v) > MAX_DISPLAY_FILTER_VALUES)},
+        "selections": dict(filters), "dataset_version": utils.dataset_version(config["file_path"]),
+        "analysis_text": analysis_text, "data_notes": notes, "data_source": sources
+    }
+
+def attach_chart(saved, chart_json):
+    """Stores the rendered spec inline, or as a reference into the spill store when it is large."""
+    if SPILL_TO_DISK and len(chart_json) > SPILL_THRESHOLD_BYTES:
+        digest = hashlib.sha1(chart_json.encode()).hexdigest()
+        path = SPILL_DIR / f"{digest}.json"
+        if not path.exists():
+            SPILL_DIR.mkdir(parents=True, exist_ok=True)
+            path.write_text(chart_json, encoding="utf-8")
+        saved["chart_ref"] = digest
+    else:
+        saved["chart_json"] = chart_json
+
+def load_chart_json(saved):
+    if saved.get("chart_json") is not None:
+        return saved["chart_json"]
+    if saved.get("chart_ref"):
+        path = SPILL_DIR / f"{saved['chart_ref']}.json"
+        if path.exists():
+            return path.read_text(encoding="utf-8")
+    # Spec missing (e.g. spill store cleared): rebuild it from the saved selections.
+    return utils.get_chart_json(rehydrate_data(saved), CONFIGS[saved["dashboard"]])
+
+def is_stale(saved):
+    """True when the dashboard's data file changed after the analysis was saved."""
+    config = CONFIGS[saved["dashboard"]]
+    return utils.dataset_version(config["file_path"]) != saved.get("dataset_version")
+
+def refresh_chart(saved):
+    """Redraws a stale analysis's chart from the current data and marks it current; the AI text is kept as written."""
+    config = CONFIGS[saved["dashboard"]]
+    df = rehydrate_data(saved)
+    if df.empty: return
+    saved.pop("chart_json", None); saved.pop("chart_ref", None)
+    attach_chart(saved, utils.get_chart_json(df, config))
+    saved["dataset_version"] = utils.dataset_version(config["file_path"])
+
+def rehydrate_data(saved):
+    """Re-derives the filtered data behind a saved analysis from the shared dataset."""
+    config = CONFIGS[saved["dashboard"]]
+    df = regions.with_regions(config["title"], config["loader_func"](config["file_path"]), config["file_path"])
+    if df is None: return pd.DataFrame()
+    return utils.filter_data(df, config, saved["selections"])
+
+# ==============================================================================
+# --- Session Memory Accounting ---
+# ==============================================================================
+def _deep_size(value):
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+def session_memory_report(state):
+    """Approximate serialized size of every session_state entry, largest first."""
+    rows = [{"Key": str(key), "Type": type(state[key]).__name__, "Bytes": _deep_size(state[key])} for key in state.keys()]
+    return pd.DataFrame(rows, columns=["Key", "Type", "Bytes"]).sort_values("Bytes", ascending=False, ignore_index=True)
+
+@perf.cache_resource
+def _session_registry():
+    return {}
+
+def record_session_usage():
+    """Publishes this session's footprint to the process-wide registry shown by all_sessions_usage(). Pickles every
+    session_state value, so it runs only on request (the Report Builder's measure button, or in perf mode)."""
+    ctx = get_script_run_ctx()
+    if ctx is None: return
+    saved = st.session_state.get("saved_analyses", [])
+    spilled = sum((SPILL_DIR / f"{s['chart_ref']}.json").stat().st_size for s in saved
+                  if s.get("chart_ref") and (SPILL_DIR / f"{s['chart_ref']}.json").exists())
+    _session_registry()[ctx.session_id] = {
+        "Session": ctx.session_id[:8], "Saved Analyses": len(saved),
+        "CHIP Sections": len(st.session_state.get("chip_report_sections", [])),
+        "Session Bytes": int(session_memory_report(st.session_state)["Bytes"].sum()),
+        "Spilled Bytes": spilled, "Updated": time.strftime("%H:%M:%S")
+    }
+
+def all_sessions_usage():
+    registry = _session_registry()
+    try:
+        runtime = st.runtime.get_instance()
+        for session_id in [sid for sid in registry if not runtime.is_active_session(sid)]:
+            registry.pop(session_id, None)
+    except RuntimeError:
+        pass
+    return pd.DataFrame(list(registry.values()))
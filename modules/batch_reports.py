@@ -0,0 +1,165 @@
+# modules/batch_reports.py
+"""Builds a County Snapshot + CHIP-style HTML report and a JSON bundle for every county, without Streamlit.
+
+    python -m modules.batch_reports                               # all counties into ./county_reports
+    python -m modules.batch_reports --counties Albany Kings --workers 4 --priorities 3
+    python -m modules.batch_reports --census                      # include ACS demographics (one API call per county)
+
+The parent process loads the data and builds the indicator cube and Hanlon scores once; worker processes
+receive them at start-up and then render one county per task, so a statewide run scales with cores."""
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+from modules import utils, cube, hanlon, reports, counties
+from modules.config import CONFIGS, SNAPSHOT_METRICS
+
+DEFAULT_OUTPUT_DIR = Path.cwd() / "county_reports"
+DEFAULT_PRIORITIES = 5
+SNAPSHOT_CSS = """.snapshot td:nth-child(n+2){text-align:right;} .muted{color:#777;}"""
+
+_inputs = {}  # Set in each worker by _init_worker.
+
+# ==============================================================================
+# --- Inputs ---
+# ==============================================================================
+def load_inputs():
+    """Everything a county report needs, loaded and derived once in the parent process."""
+    pa_path = CONFIGS["Prevention Agenda Trends"]["file_path"]
+    pa_df = utils.load_prevention_data(pa_path)
+    indicator_cube = cube.get_cube()
+    if pa_df is None or indicator_cube is None: return None
+    scores = hanlon.rank_priorities(hanlon.get_suggested_scores(pa_path), {})
+    state_medians = {label: float(cube.cross_section(indicator_cube, code)["value"].median())
+                     for label, (source, indicator) in SNAPSHOT_METRICS.items()
+                     if (code := cube.indicator_code(indicator_cube, source, indicator)) is not None}
+    return {"pa": pa_df, "cube": indicator_cube, "scores": scores, "state_medians": state_medians}
+
+def _init_worker(inputs, include_census):
+    _inputs.update(inputs, include_census=include_census)
+
+def county_slug(county):
+    return re.sub(r"[^A-Za-z0-9]+", "_", county).strip("_")
+
+# ==============================================================================
+# --- Report Sections ---
+# ==============================================================================
+def snapshot_rows(indicator_cube, county, state_medians):
+    rows = []
+    for label, metric in cube.snapshot(indicator_cube, county).items():
+        value, year = (metric[0], metric[1]) if metric else (None, None)
+        rows.append({"label": label, "indicator": SNAPSHOT_METRICS[label][1], "value": value, "year": year,
+                     "state_median": state_medians.get(label)})
+    return rows
+
+def _snapshot_section(county, rows, census):
+    def fmt(value): return f"{value:,.1f}" if value is not None else '<span class="muted">No data</span>'
+    metric_rows = "".join(f"<tr><td>{html.escape(row['label'])}</td><td>{fmt(row['value'])}</td><td>{row['year'] or ''}</td>"
+                          f"<td>{fmt(row['state_median'])}</td></tr>" for row in rows)
+    census_html = ""
+    if census:
+        census_html = "<h3>Demographics (2022 ACS)</h3><ul>" + "".join(
+            f"<li><strong>{html.escape(name)}:</strong> {html.escape(str(value))}</li>" for name, value in census.items()) + "</ul>"
+    section_html = f"""
+    <div style="page-break-after: always;">
+        <h2>SECTION {reports.SECTION_NUMBER}: Health Snapshot</h2>
+        {census_html}
+        <table class="snapshot" border="1">
+            <thead><tr><th>Indicator</th><th>{html.escape(county)}</th><th>Year</th><th>NYS County Median</th></tr></thead>
+            <tbody>{metric_rows}</tbody>
+        </table>
+    </div>"""
+    return {"html": section_html, "chart": None}
+
+def priority_plans(county, count):
+    """CHIP plan sections (context only; goals and strategies are left for the planning team) for a county's top Hanlon priorities."""
+    scores, pa_df = _inputs["scores"], _inputs["pa"]
+    top = scores[scores["County Name"] == county].head(count)
+    pa_df = pa_df[pa_df["County Name"] == county]  # Objectives are the same in every county's rows.
+    plans = []
+    for row in top.to_dict("records"):
+        objective, latest, trend_df = utils.get_pa_data_for_chip(pa_df, row["Priority Area"], row["Focus Area"], row["Indicator"], county)
+        trend = trend_df[["Data Years", "Percentage/Rate/Ratio"]].dropna() if not trend_df.empty else trend_df
+        plans.append({"county": county, "priority_area": row["Priority Area"], "focus_area": row["Focus Area"], "indicator": row["Indicator"],
+                      "overarching_goal": f"Improve: {row['Indicator']}", "objectives": [], "strategies": [],
+                      "official_objective": objective, "latest_data": latest,
+                      "disparities": f"Hanlon priority score {row['Priority Score']:g} (rank {row['Rank']} of the county's indicators)",
+                      "trend_data": trend.to_dict("records")})
+    return plans
+
+def build_county(county, output_dir, priorities):
+    """Writes <county>.html and <county>.json; returns a one-line summary for the progress log."""
+    start = time.perf_counter()
+    rows = snapshot_rows(_inputs["cube"], county, _inputs["state_medians"])
+    census = None
+    if _inputs["include_census"]:
+        try:
+            census = utils.get_census_snapshot(county)
+        except requests.exceptions.RequestException:
+            census = {"error": "Census API unavailable."}
+    plans = priority_plans(county, priorities)
+    sections = [_snapshot_section(county, rows, census)] + [reports.render_chip_section(plan) for plan in plans]
+    document = reports.build_report_html(f"{county} County Health Report",
+                                         f"<h1>County Health Report</h1>\n    <h2>{html.escape(county)} County, NY</h2>",
+                                         sections, reports.CHIP_REPORT_CSS + "\n        " + SNAPSHOT_CSS)
+    slug = county_slug(county)
+    (output_dir / f"{slug}.html").write_text(document, encoding="utf-8")
+    bundle = {"county": county, "generated": datetime.now().isoformat(timespec="seconds"), "snapshot": rows,
+              "census": census, "priorities": plans}
+    (output_dir / f"{slug}.json").write_text(json.dumps(bundle, indent=2, default=str), encoding="utf-8")
+    return {"county": county, "seconds": time.perf_counter() - start, "html_bytes": len(document)}
+
+# ==============================================================================
+# --- Command Line ---
+# ==============================================================================
+def run(county_names, output_dir, workers, priorities, include_census):
+    missing_runtime = reports.missing_runtime()
+    if missing_runtime: raise SystemExit(reports.missing_runtime_message(missing_runtime))
+    inputs = load_inputs()
+    if inputs is None: raise SystemExit("Could not load the Prevention Agenda data or build the indicator cube.")
+    available = sorted(inputs["pa"]["County Name"].dropna().unique())
+    county_names = county_names or [c for c in available if cube.county_code(inputs["cube"], c) is not None]
+    unknown = sorted(set(county_names) - set(available))
+    if unknown: raise SystemExit(f"Unknown counties: {', '.join(unknown)}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(inputs, include_census)) as pool:
+        futures = [pool.submit(build_county, county, output_dir, priorities) for county in county_names]
+        for future in as_completed(futures):
+            results.append(future.result())
+            print(f"{results[-1]['county']:<16} {results[-1]['seconds']:6.2f}s {results[-1]['html_bytes'] / 1024:8.1f} KB", flush=True)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counties", nargs="+", help="County names as in the Prevention Agenda data (default: all).")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--priorities", type=int, default=DEFAULT_PRIORITIES, help="CHIP sections per county, from its top Hanlon priorities.")
+    parser.add_argument("--census", action="store_true", help="Include ACS demographics from the Census API.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run(args.counties, args.output_dir, args.workers, args.priorities, args.census)
+    print(f"{len(results)} county reports written to {args.output_dir} in {time.perf_counter() - start:.1f}s")
+    unmatched = counties.unmatched_report()
+    if not unmatched.empty:
+        print("\nAreas in the source files not matched to a county (left out of the reports):")
+        print(unmatched.to_string(index=False))
+    conflicts = cube.get_cube()["conflicts"]
+    if not conflicts.empty:
+        print("\nCells reported twice with different values (left empty in the snapshot tables):")
+        print(conflicts.to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
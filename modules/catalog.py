@@ -0,0 +1,122 @@
+# modules/catalog.py
+import re
+import streamlit as st
+import pandas as pd
+import numpy as np
+from modules import utils, counties, perf
+from modules.config import CONFIGS, INDICATOR_SOURCES
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+# Indicator source -> the page showing it and the dropdowns that pick one indicator there (CONFIGS filters for the
+# dashboards; the CHR page has a single measure selectbox).
+DASHBOARDS = {
+    "CHIRS Indicators": {"page": "pages/2_CHIRS_Indicators.py", "filters": CONFIGS["CHIRS Indicators"]["filters"]},
+    "Prevention Agenda": {"page": "pages/3_Prevention_Agenda.py", "filters": CONFIGS["Prevention Agenda Trends"]["filters"]},
+    "Maternal & Child Health": {"page": "pages/4_MCH_Dashboard.py", "filters": CONFIGS["MCH Dashboard"]["filters"]},
+    "County Health Rankings": {"page": "pages/11_CHR_Trends.py", "filters": [{"label": "Health Measure", "col": "measurename", "type": "selectbox"}]},
+}
+# Scores are the share of the query's trigrams found in an entry, area trigrams counting half: 1.0 when every trigram
+# is in the title, 0.5 when every trigram is only in the area names.
+MIN_SIMILARITY = 0.35
+TITLE_WEIGHT, AREA_WEIGHT = 2, 1
+SUBSTRING_BONUS = 1.0
+DEFAULT_LIMIT = 25
+
+# ==============================================================================
+# --- Filter Presets ---
+# ==============================================================================
+# A catalog match opens its page with the dropdown values in the URL (?priority_area=...&indicator=...), so the
+# dashboards start on that indicator and the link can be bookmarked or shared.
+def filter_param(label):
+    return re.sub(r"\W+", "_", label.lower()).strip("_")
+
+def preset_index(options, label):
+    """Index of the option named by the page's query parameter for this filter, else 0."""
+    preset = st.query_params.get(filter_param(label))
+    return options.index(preset) if preset in options else 0
+
+# ==============================================================================
+# --- Building the Catalog ---
+# ==============================================================================
+def _entries(source_name, df):
+    """One row per indicator of a source: its dropdown path, county coverage and year span."""
+    selectors = [f for f in DASHBOARDS[source_name]["filters"] if f["type"] == "selectbox"]
+    cols, labels = [f["col"] for f in selectors], [f["label"] for f in selectors]
+    source = INDICATOR_SOURCES[source_name]
+    grouped = df.assign(_year=utils.end_year(df[source["year_col"]])).groupby(cols, sort=False, dropna=True)
+    entries = grouped.agg(counties=(counties.KEY, "nunique"), first_year=("_year", "min"), last_year=("_year", "max")).reset_index()
+    areas = [col for col in cols if col != source["indicator_col"]]
+    first, last = entries["first_year"].astype("Int64").astype(str), entries["last_year"].astype("Int64").astype(str)
+    return pd.DataFrame({
+        "source": source_name,
+        "indicator": entries[source["indicator_col"]].astype(str),
+        "area": entries[areas].astype(str).agg(" › ".join, axis=1) if areas else "",
+        "counties": entries["counties"].astype(int),
+        "years": np.where(first == last, last, first + "–" + last),
+        "params": [dict(zip(map(filter_param, labels), map(str, values))) for values in zip(*(entries[col] for col in cols))],
+    })
+
+def _normalize(text):
+    return re.sub(r"[^a-z0-9]+", " ", str(text).lower()).strip()
+
+def trigrams(text):
+    """Trigrams of each word, padded as in pg_trgm ("  ob", " ob", "obe", ..., "ty ")."""
+    grams = set()
+    for word in _normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def build_index(entries):
+    """Inverted index trigram -> (entry rows, weights); title trigrams count more than area trigrams."""
+    postings = {}
+    for row, (title, area) in enumerate(zip(entries["indicator"], entries["area"])):
+        title_grams = trigrams(title)
+        for gram in title_grams: postings.setdefault(gram, {})[row] = TITLE_WEIGHT
+        for gram in trigrams(area) - title_grams: postings.setdefault(gram, {})[row] = AREA_WEIGHT
+    return {gram: (np.fromiter(rows.keys(), dtype=np.int32), np.fromiter(rows.values(), dtype=np.float32))
+            for gram, rows in postings.items()}
+
+def build_catalog(frames):
+    """Indicator catalog and its trigram index from {source name: loaded DataFrame}."""
+    entries = pd.concat([_entries(name, df) for name, df in frames.items()], ignore_index=True)
+    return {"entries": entries, "index": build_index(entries),
+            "titles": entries["indicator"].map(_normalize).to_numpy(dtype=object)}
+
+@perf.cache_resource(show_spinner="Building indicator catalog...")
+def _cached_catalog(versions):
+    frames = {}
+    for name, version in versions:
+        if version is None: continue
+        df = INDICATOR_SOURCES[name]["loader_func"](INDICATOR_SOURCES[name]["file_path"])
+        if df is not None and not df.empty: frames[name] = df
+    return build_catalog(frames) if frames else None
+
+def get_catalog():
+    """The shared catalog, rebuilt only when one of the source files changes."""
+    return _cached_catalog(tuple((name, utils.dataset_version(source["file_path"])) for name, source in INDICATOR_SOURCES.items()))
+
+# ==============================================================================
+# --- Search ---
+# ==============================================================================
+@perf.timed("catalog.search")
+def search(catalog, query, limit=DEFAULT_LIMIT, sources=None):
+    """Catalog rows ranked by trigram similarity to query, with a bonus when the query appears verbatim in the title."""
+    grams = trigrams(query)
+    entries = catalog["entries"]
+    if not grams: return entries.iloc[0:0].assign(score=[])
+    scores = np.zeros(len(entries), dtype=np.float32)
+    for gram in grams:
+        if gram in catalog["index"]:
+            rows, weights = catalog["index"][gram]
+            scores[rows] += weights
+    scores /= len(grams) * TITLE_WEIGHT
+    candidates = np.flatnonzero(scores >= MIN_SIMILARITY)
+    phrase = _normalize(query)
+    scores[candidates] += [SUBSTRING_BONUS if phrase in title else 0.0 for title in catalog["titles"][candidates]]
+    if sources: candidates = candidates[entries["source"].iloc[candidates].isin(sources).to_numpy()]
+    # Ties go to shorter titles, which a short query describes more completely.
+    order = np.lexsort((entries["indicator"].str.len().to_numpy()[candidates], -scores[candidates]))[:limit]
+    return entries.iloc[candidates[order]].assign(score=scores[candidates[order]].astype(float).round(2))
@@ -0,0 +1,190 @@
+# modules/census_mirror.py
+"""Local mirror of ACS summary tables, so the Census pages answer from disk instead of api.census.gov.
+
+    python -m modules.census_mirror ACSDT5Y2022.B01003-Data.csv ACSDT5Y2022.B19013-Data.csv   # data.census.gov table downloads
+    python -m modules.census_mirror acsdt5y2022-b17001.dat --geos Geos20225YR.txt              # ACS Summary File tables
+    python -m modules.census_mirror --list
+
+Each file's dataset and year come from its name (ACSDT5Y2022 / acsdt5y2022 -> acs/acs5, 2022) unless --dataset and
+--year are given. Rows are split by geography (state, county, tract) into data/census/<dataset>/<year>/<geography>.parquet;
+tables ingested into the same partition are joined on GEO_ID. utils.fetch_census_data reads the mirror first and only
+asks the API for variables the mirror does not hold."""
+import argparse
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from modules import perf
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+# config.DATA_DIR/census; resolved here because config imports utils, which reads the mirror.
+CENSUS_MIRROR_DIR = Path(os.environ.get("NYS_DATA_DIR", Path(__file__).parent.parent / "data")) / "census"
+# Summary level (first three characters of GEO_ID) -> API geography and the FIPS columns the API returns for it.
+GEOGRAPHIES = {
+    "040": ("state", ["state"]),
+    "050": ("county", ["state", "county"]),
+    "140": ("tract", ["state", "county", "tract"]),
+}
+FIPS_SLICES = {"state": slice(0, 2), "county": slice(2, 5), "tract": slice(5, 11)}
+PRODUCTS = {"dt": "", "st": "/subject", "dp": "/profile"}
+FILE_NAME_PATTERN = re.compile(r"acs(dt|st|dp)(1|5)y(\d{4})", re.IGNORECASE)
+VARIABLE_PATTERN = re.compile(r"^[A-Z0-9]+_[A-Z0-9_]+(E|M|EA|MA)$")
+SUMMARY_FILE_VARIABLE = re.compile(r"^([A-Z0-9]+)_([EM])(\d{3})$")
+
+# ==============================================================================
+# --- Store ---
+# ==============================================================================
+def partition_path(dataset, year, geography, root=CENSUS_MIRROR_DIR):
+    return Path(root) / dataset / str(year) / f"{geography}.parquet"
+
+def labels_path(dataset, year, root=CENSUS_MIRROR_DIR):
+    return Path(root) / dataset / str(year) / "variables.json"
+
+def read_labels(dataset, year, root=CENSUS_MIRROR_DIR):
+    path = labels_path(dataset, year, root)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+def _write_partition(df, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+def version(dataset, year, root=CENSUS_MIRROR_DIR):
+    """Size and modification time of every file mirrored for a dataset and year, so cached API results change with the mirror."""
+    folder = Path(root) / dataset / str(year)
+    if not folder.is_dir(): return ()
+    return tuple((path.name, path.stat().st_size, path.stat().st_mtime_ns) for path in sorted(folder.iterdir()) if path.is_file())
+
+def contents(root=CENSUS_MIRROR_DIR):
+    """One row per mirrored partition: dataset, year, geography, rows and variables."""
+    rows = []
+    for path in sorted(Path(root).glob("**/*.parquet")):
+        dataset, year = path.parent.parent.relative_to(root).as_posix(), path.parent.name
+        metadata = pq.read_metadata(path)
+        rows.append({"dataset": dataset, "year": year, "geography": path.stem, "rows": metadata.num_rows,
+                     "variables": sum(1 for name in metadata.schema.names if VARIABLE_PATTERN.match(name))})
+    return pd.DataFrame(rows, columns=["dataset", "year", "geography", "rows", "variables"])
+
+# ==============================================================================
+# --- Lookup ---
+# ==============================================================================
+def _geo_clauses(geo_for, geo_in):
+    """{"county": ["001", "003"], "state": ["36"]} from API-style for/in parameters ('*' means no restriction)."""
+    clauses = {}
+    for clause in [geo_for] + ((geo_in or {}).get("in", "").split()):
+        level, _, codes = clause.partition(":")
+        if codes and codes != "*": clauses[level] = codes.split(",")
+    return clauses
+
+@perf.timed("census_mirror")
+def lookup(dataset, year, variables, geo_for, geo_in=None, root=CENSUS_MIRROR_DIR):
+    """(frame, missing) for an API-style query: the mirrored variables for the requested geographies, in the API's
+    column layout, and the variables the mirror lacks. frame is None when the mirror cannot answer any of the query."""
+    geography = geo_for.partition(":")[0]
+    path = partition_path(dataset, year, geography, root)
+    if not path.exists(): return None, list(variables)
+    available = set(pq.read_schema(path).names)
+    present = [v for v in variables if v in available]
+    if not any(v != "NAME" for v in present): return None, list(variables)
+
+    fips_cols = next(cols for level, cols in GEOGRAPHIES.values() if level == geography)
+    df = pq.read_table(path, columns=present + fips_cols).to_pandas()
+    for level, codes in _geo_clauses(geo_for, geo_in).items():
+        if level not in df.columns: return None, list(variables)
+        df = df[df[level].isin(codes)]
+    if df.empty: return None, list(variables)
+    return df.reset_index(drop=True), [v for v in variables if v not in available]
+
+# ==============================================================================
+# --- Ingest ---
+# ==============================================================================
+def dataset_from_file_name(path):
+    """("acs/acs5", "2022") from names such as ACSDT5Y2022.B01003-Data.csv or acsdt5y2022-b01003.dat, else (None, None)."""
+    match = FILE_NAME_PATTERN.search(Path(path).name)
+    if not match: return None, None
+    product, span, year = match.groups()
+    return f"acs/acs{span}{PRODUCTS[product.lower()]}", year
+
+def read_table_file(path, geos=None):
+    """(values with GEO_ID, NAME and API-named variables, {variable: label}) from a data.census.gov CSV download
+    (codes in the first row, labels in the second) or a pipe-delimited ACS Summary File table (B01003_E001 columns,
+    names joined from the Summary File geography file when given)."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        df = pd.read_csv(path, dtype=str, skiprows=[1])
+        label_row = pd.read_csv(path, dtype=str, nrows=1).iloc[0]
+        variables = [col for col in df.columns if VARIABLE_PATTERN.match(col)]
+        labels = {col: label_row[col] for col in variables}
+    else:
+        df = pd.read_csv(path, dtype=str, sep="|")
+        df.columns = [col.upper() if col.upper() == "GEO_ID" else col for col in df.columns]
+        renamed = {col: f"{m[1]}_{m[3]}{m[2]}" for col in df.columns if (m := SUMMARY_FILE_VARIABLE.match(col))}
+        df = df.rename(columns=renamed)
+        variables, labels = list(renamed.values()), {}
+        if geos is not None:
+            names = pd.read_csv(geos, dtype=str, sep="|", usecols=["GEO_ID", "NAME"])
+            df = df.merge(names, on="GEO_ID", how="left")
+    if "GEO_ID" not in df.columns or not variables: raise ValueError(f"{path.name}: no GEO_ID column or no ACS variable columns.")
+    values = df[["GEO_ID"] + (["NAME"] if "NAME" in df.columns else [])].copy()
+    for col in variables: values[col] = pd.to_numeric(df[col], errors="coerce")
+    return values, labels
+
+def _split_geographies(values):
+    """{geography: rows with the API's FIPS columns}; summary levels the API pages do not query are dropped."""
+    summary_level = values["GEO_ID"].str[:3]
+    fips = values["GEO_ID"].str.partition("US")[2]
+    partitions = {}
+    for level, (geography, fips_cols) in GEOGRAPHIES.items():
+        rows = values[summary_level == level].copy()
+        if rows.empty: continue
+        for col in fips_cols: rows[col] = fips[rows.index].str[FIPS_SLICES[col]]
+        partitions[geography] = rows
+    return partitions
+
+def ingest_file(path, dataset=None, year=None, geos=None, root=CENSUS_MIRROR_DIR):
+    """Adds one table file to the mirror; returns {geography: rows written} for the report."""
+    inferred_dataset, inferred_year = dataset_from_file_name(path)
+    dataset, year = dataset or inferred_dataset, year or inferred_year
+    if not dataset or not year: raise ValueError(f"{Path(path).name}: give --dataset and --year (not in the file name).")
+    values, labels = read_table_file(path, geos)
+    written = {}
+    for geography, rows in _split_geographies(values).items():
+        target = partition_path(dataset, year, geography, root)
+        if target.exists():
+            # The new file's values win; variables and geographies only in the existing partition are kept.
+            rows = rows.set_index("GEO_ID").combine_first(pd.read_parquet(target).set_index("GEO_ID")).reset_index()
+        _write_partition(rows, target)
+        written[geography] = len(rows)
+    if labels:
+        merged = read_labels(dataset, year, root) | labels
+        labels_path(dataset, year, root).write_text(json.dumps(merged, indent=1, sort_keys=True))
+    return {"file": Path(path).name, "dataset": dataset, "year": year, "partitions": written, "variables": len(labels) or None}
+
+# ==============================================================================
+# --- Command Line ---
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path, help="data.census.gov table CSVs or ACS Summary File .dat tables.")
+    parser.add_argument("--dataset", help="API dataset path, e.g. acs/acs5 (default: from the file name).")
+    parser.add_argument("--year", help="Vintage, e.g. 2022 (default: from the file name).")
+    parser.add_argument("--geos", type=Path, help="Summary File geography file (Geos<year><span>YR.txt) supplying NAME for .dat tables.")
+    parser.add_argument("--list", action="store_true", help="Print the mirror's partitions.")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        print(json.dumps(ingest_file(path, args.dataset, args.year, args.geos)))
+    if args.list or not args.files:
+        print(contents().to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
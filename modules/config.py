@@ -1,9 +1,13 @@
 # modules/config.py
+import os
 from pathlib import Path
 from modules import utils, ai_analysis
 
-# Define the absolute path to the data directory
-DATA_DIR = Path(__file__).parent.parent / "data"
+# Define the absolute path to the data directory (NYS_DATA_DIR points the app at another copy, e.g. synthetic load-test data)
+DATA_DIR = Path(os.environ.get("NYS_DATA_DIR", Path(__file__).parent.parent / "data"))
+# Columnar copies of the source files, created and appended to by `python -m modules.ingest`. The loaders read a
+# file's copy instead of it once one exists (utils.current_path), checked on every load rather than here at import.
+STORE_DIR = DATA_DIR / utils.STORE_DIR_NAME
 
 CONFIGS = {
     "CHIRS Indicators": {
@@ -33,7 +37,7 @@ CONFIGS = {
         ],
         "indicator_label": "Indicator", "county_col": "County Name", "year_col": "Data Years",
         "value_col": "Percentage/Rate/Ratio", "y_axis_label": "Percentage / Rate / Ratio",
-        "source_col": "Date Source", "notes_col": "Data Comments",
+        "source_col": "Date Source", "notes_col": "Data Comments", "ci_cols": ("Lower Limit of 95% CI", "Upper Limit of 95% CI"),
         "objective_col": "2024 Objective", "objective_label": "2024 Objective", "objective_color": "red"
     },
     "MCH Dashboard": {
@@ -51,4 +55,39 @@ CONFIGS = {
         "source_col": "Date Source", "notes_col": "Data Comments",
         "objective_col": "MCH Objective", "objective_label": "MCH Objective", "objective_color": "green"
     }
-}
\ No newline at end of file
+}
+
+CHR_FILE_PATH = DATA_DIR / "chr_trends_csv_2024.csv"
+# The latest Prevention Agenda value per county and indicator, published alongside the trend file (see modules/tiers.py).
+PA_LATEST_FILE_PATH = DATA_DIR / "PreventionAgendaTrackingIndicators-CountyMostRecentYearData.csv"
+GEOJSON_FILE_PATH = DATA_DIR / "NYS_Counties.geojson"
+EJSCREEN_FILE_PATH = DATA_DIR / "EJSCREEN_2023_Tracts_with_AS_CNMI_GU_VI.csv"
+
+# Every county-level indicator source in one schema, used by the statewide map and the indicator cube.
+# CONFIGS dashboards are reused; CHR is only a trend page, so its columns are listed here.
+INDICATOR_SOURCES = {
+    "CHIRS Indicators": {"loader_func": utils.load_chirs_data, "file_path": CONFIGS["CHIRS Indicators"]["file_path"],
+                         "area_col": "Topic Area", "indicator_col": "Indicator Title", "county_col": "Geographic area",
+                         "year_col": "Year", "value_col": "Rate/Percent", "notes_col": "Data Notes"},
+    "Prevention Agenda": {"loader_func": utils.load_prevention_data, "file_path": CONFIGS["Prevention Agenda Trends"]["file_path"],
+                          "area_col": "Priority Area", "indicator_col": "Indicator", "county_col": "County Name",
+                          "year_col": "Data Years", "value_col": "Percentage/Rate/Ratio", "notes_col": "Data Comments"},
+    "Maternal & Child Health": {"loader_func": utils.load_mch_data, "file_path": CONFIGS["MCH Dashboard"]["file_path"],
+                                "area_col": "Domain Area", "indicator_col": "Indicator", "county_col": "County Name",
+                                "year_col": "Data Years", "value_col": "Percentage/Rate", "notes_col": "Data Comments"},
+    "County Health Rankings": {"loader_func": utils.load_chr_trend_data, "file_path": CHR_FILE_PATH,
+                               "area_col": None, "indicator_col": "measurename", "county_col": "county",
+                               "year_col": "year", "value_col": "rawvalue", "notes_col": None}
+}
+
+# Label -> (indicator source, indicator) shown in the County Snapshot's Key Health Indicators grid and the batch county reports.
+SNAPSHOT_METRICS = {
+    "All Cancer Incidence": ("CHIRS Indicators", "All cancer incidence rate per 100,000"),
+    "Premature Deaths (%)": ("Prevention Agenda", "Percentage of deaths that are premature (before age 65 years)"),
+    "Adult Smoking (%)": ("Prevention Agenda", "Prevalence of cigarette smoking among adults"),
+    "Adult Obesity (%)": ("Prevention Agenda", "Percentage of adults with obesity"),
+    "Early Prenatal Care (%)": ("Maternal & Child Health", "Percentage of births with early (1st trimester) prenatal care"),
+    "Infant Mortality Rate": ("Maternal & Child Health", "Infant mortality rate per 1,000 live births"),
+    "Preterm Births (%)": ("Maternal & Child Health", "Percentage of preterm births (less than 37 weeks gestation)"),
+    "Preventable Hospitalizations": ("Prevention Agenda", "Preventable hospitalizations, rate per 100,000")
+}
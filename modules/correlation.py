@@ -0,0 +1,105 @@
+# modules/correlation.py
+import pandas as pd
+import numpy as np
+from modules import utils, cube, peers, perf
+from modules.config import INDICATOR_SOURCES
+from modules.trends import T_CRITICAL_95, Z_CRITICAL_95
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+HEALTH_SOURCES = {"CHIRS Indicators": "CHIRS", "Prevention Agenda": "PA", "Maternal & Child Health": "MCH"}
+SDOH_GROUP = "ACS"
+# Pairs observed together in fewer counties than this get no coefficient.
+MIN_COUNTIES = 15
+
+# ==============================================================================
+# --- Pairwise-Complete Correlation ---
+# ==============================================================================
+def pairwise_corr(values, min_periods=MIN_COUNTIES):
+    """Pearson r and pair counts for every pair of columns, each pair using only the rows where both are present.
+
+    With M the presence mask and X the values (0 where missing), every per-pair sum is a single matrix product:
+    counts M'M, sums X'M, sums of squares (X*X)'M and cross products X'X. Columns are centred first so the
+    products stay well conditioned."""
+    values = np.asarray(values, dtype=float)
+    present = ~np.isnan(values)
+    mask = present.astype(float)
+    means = np.where(present, values, 0).sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+    x = np.where(present, values - means, 0.0)
+    n = mask.T @ mask
+    sums = x.T @ mask          # [i, j]: sum of column i over rows where j is present
+    squares = (x * x).T @ mask
+    cross = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * cross - sums * sums.T
+        var = (n * squares - sums ** 2) * (n * squares.T - sums.T ** 2)
+        r = np.clip(cov / np.sqrt(var), -1, 1)
+    r[(n < min_periods) | ~(var > 0)] = np.nan
+    return r, n.astype(int)
+
+def significant(r, n):
+    """Two-sided 95% test of r != 0 with n - 2 degrees of freedom."""
+    dof = np.maximum(n - 2, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_stat = np.abs(r) * np.sqrt(dof / np.maximum(1 - r ** 2, 1e-12))
+    t_critical = np.where(dof > len(T_CRITICAL_95), Z_CRITICAL_95, T_CRITICAL_95[np.clip(dof, 1, len(T_CRITICAL_95)) - 1])
+    return (t_stat > t_critical) & ~np.isnan(r)
+
+# ==============================================================================
+# --- County x Indicator Matrix ---
+# ==============================================================================
+def county_matrix(indicator_cube, acs):
+    """(matrix, columns): latest CHIRS/PA/MCH values and ACS variables per county (rows in cube county order), and
+    one row per matrix column with its group (source short name or ACS), indicator and display label."""
+    indicators = indicator_cube["indicators"]
+    health = indicators[indicators["source"].isin(HEALTH_SOURCES)]
+    columns = pd.DataFrame({"group": health["source"].map(HEALTH_SOURCES).to_numpy(), "source": health["source"].to_numpy(),
+                            "indicator": health["indicator"].to_numpy()})
+    blocks = [indicator_cube["latest_value"][:, health.index]]
+    if not acs.empty:
+        fips = indicator_cube["counties"]["fips"].astype(int)
+        blocks.append(acs.set_axis(acs.index.astype(int)).reindex(fips).to_numpy(dtype=float))
+        columns = pd.concat([columns, pd.DataFrame({"group": SDOH_GROUP, "source": SDOH_GROUP, "indicator": acs.columns})], ignore_index=True)
+    columns["label"] = columns["indicator"] + " (" + columns["group"] + ")"
+    return np.hstack(blocks), columns
+
+@perf.cache_resource(show_spinner="Correlating county indicators...")
+def _correlations(versions, acs_key, has_acs, _acs):
+    indicator_cube = cube.get_cube()
+    if indicator_cube is None: return None
+    matrix, columns = county_matrix(indicator_cube, _acs)
+    with perf.span("correlation.pairwise", columns=len(columns)):
+        r, n = pairwise_corr(matrix)
+    return {"matrix": matrix, "columns": columns, "counties": indicator_cube["counties"]["county"].tolist(),
+            "r": r, "n": n, "significant": significant(r, n)}
+
+def get_correlations():
+    """County x indicator matrix and all pairwise correlations, recomputed only when a source file changes or ACS
+    becomes available again after a failed Census request."""
+    versions = tuple((name, utils.dataset_version(source["file_path"])) for name, source in INDICATOR_SOURCES.items())
+    acs = peers.acs_features()
+    return _correlations(versions, peers.ACS_KEY, not acs.empty, acs)
+
+# ==============================================================================
+# --- Queries ---
+# ==============================================================================
+def strongest_pairs(correlations, rows, cols, limit=None):
+    """Pairs (row column, col column) ordered by |r|, each unordered pair once."""
+    r = correlations["r"][np.ix_(rows, cols)]
+    i, j = np.nonzero(~np.isnan(r))
+    a, b = np.asarray(rows)[i], np.asarray(cols)[j]
+    keep = a != b
+    a, b, values = a[keep], b[keep], r[i, j][keep]
+    pair_keys = np.minimum(a, b) * len(correlations["columns"]) + np.maximum(a, b)
+    _, first = np.unique(pair_keys, return_index=True)
+    order = first[np.argsort(-np.abs(values[first]), kind="stable")][:limit]
+    labels = correlations["columns"]["label"].to_numpy()
+    return pd.DataFrame({"A": labels[a[order]], "B": labels[b[order]], "r": values[order].round(3),
+                         "Counties": correlations["n"][a[order], b[order]],
+                         "Significant": correlations["significant"][a[order], b[order]], "a": a[order], "b": b[order]})
+
+def pair_frame(correlations, a, b):
+    """County values of two matrix columns, rows where both are present."""
+    frame = pd.DataFrame({"county": correlations["counties"], "x": correlations["matrix"][:, a], "y": correlations["matrix"][:, b]})
+    return frame.dropna().reset_index(drop=True)
@@ -0,0 +1,109 @@
+# modules/counties.py
+import re
+import threading
+from pathlib import Path
+import pandas as pd
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+# Every loader adds KEY, the county's 5-digit state + county FIPS as an integer (36027 for Dutchess), resolved from
+# whatever name or code its source uses. Cross-dataset joins and lookups compare these keys instead of name strings.
+KEY = "County FIPS"
+STATE_FIPS = 36
+NY_COUNTY_FIPS_MAP = { "Albany": "001", "Allegany": "003", "Bronx": "005", "Broome": "007", "Cattaraugus": "009", "Cayuga": "011", "Chautauqua": "013", "Chemung": "015", "Chenango": "017", "Clinton": "019", "Columbia": "021", "Cortland": "023", "Delaware": "025", "Dutchess": "027", "Erie": "029", "Essex": "031", "Franklin": "033", "Fulton": "035", "Genesee": "037", "Greene": "039", "Hamilton": "041", "Herkimer": "043", "Jefferson": "045", "Kings (Brooklyn)": "047", "Lewis": "049", "Livingston": "051", "Madison": "053", "Monroe": "055", "Montgomery": "057", "Nassau": "059", "New York (Manhattan)": "061", "Niagara": "063", "Oneida": "065", "Onondaga": "067", "Ontario": "069", "Orange": "071", "Orleans": "073", "Oswego": "075", "Otsego": "077", "Putnam": "079", "Queens": "081", "Rensselaer": "083", "Richmond (Staten Island)": "085", "Rockland": "087", "Saratoga": "091", "Schenectady": "093", "Schoharie": "095", "Schuyler": "097", "Seneca": "099", "St. Lawrence": "089", "Steuben": "101", "Suffolk": "103", "Sullivan": "105", "Tioga": "107", "Tompkins": "109", "Ulster": "111", "Warren": "113", "Washington": "115", "Wayne": "117", "Westchester": "119", "Wyoming": "121", "Yates": "123" }
+# Names besides "<County>", "<County> County" and the parenthesized borough names above.
+ALIASES = {"The Bronx": "005", "Bronx County": "005", "Kings": "047", "Manhattan": "061", "New York County": "061",
+           "Richmond": "085", "Staten Island": "085", "Saint Lawrence": "089", "St Lawrence": "089"}
+# Areas the source files report alongside counties (state, NYC, regions); listed apart from unrecognized names.
+AGGREGATE_AREAS = {"New York State", "New York State (excluding NYC)", "NYS", "NYS excluding NYC", "New York City", "NYC",
+                   "Capital Region", "Central NY", "Finger Lakes", "Long Island", "Mid-Hudson", "Mohawk Valley",
+                   "North Country", "Southern Tier", "Tug Hill Seaway", "Western NY"}
+# Short county names that are also the state's name. A source that reports its state total under one of these instead of
+# a name such as "New York State" cannot be told apart from the county, so those rows are left unresolved.
+AMBIGUOUS_NAMES = {"new york"}
+STATE_NAMES = {"New York State", "NYS"}
+CODE_PATTERN = re.compile(r"^(?:\d{2,7}US)?(\d{3}|\d{5})$")
+
+_unmatched = {}
+_unmatched_lock = threading.Lock()
+
+# ==============================================================================
+# --- Resolver ---
+# ==============================================================================
+def _normalize(name):
+    text = re.sub(r",\s*(new york|ny)$", "", str(name).strip(), flags=re.IGNORECASE).lower()
+    text = re.sub(r"\s+county$", "", text.replace(".", " "))
+    text = re.sub(r"^saint\s", "st ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def _build_lookup():
+    lookup, names, display_names = {}, {}, {}
+    for display, code in NY_COUNTY_FIPS_MAP.items():
+        key = STATE_FIPS * 1000 + int(code)
+        short, _, borough = display.partition(" (")
+        names[key], display_names[key] = short, display
+        for name in (display, short, borough.rstrip(")")):
+            if name: lookup[_normalize(name)] = key
+    for name, code in ALIASES.items():
+        lookup[_normalize(name)] = STATE_FIPS * 1000 + int(code)
+    return lookup, names, display_names
+
+_LOOKUP, NAMES, DISPLAY_NAMES = _build_lookup()
+
+def fips(value):
+    """Integer FIPS for a county given as a name in any source's form ("Dutchess", "Dutchess County", "Kings (Brooklyn)",
+    "Brooklyn", "Kings County, New York"), a county or state + county code ("027", "36027", 36027) or a GEOID; else None."""
+    if value is None or (isinstance(value, float) and value != value): return None
+    if isinstance(value, int):
+        key = value if value >= 1000 else STATE_FIPS * 1000 + value
+        return key if key in NAMES else None
+    text = str(value).strip()
+    match = CODE_PATTERN.match(text)
+    if match:
+        code = match[1]
+        key = STATE_FIPS * 1000 + int(code) if len(code) == 3 else int(code)
+        return key if key in NAMES else None
+    return _LOOKUP.get(_normalize(text))
+
+def fips_series(values):
+    """fips() over a column as nullable integers; each distinct value is resolved once."""
+    resolved = {value: fips(value) for value in pd.unique(values.dropna())}
+    return values.map(resolved).astype("Int64")
+
+def name(key):
+    """Short county name ("Kings") for an integer FIPS."""
+    return NAMES.get(key)
+
+def county_code(key):
+    """3-digit county FIPS as the Census API expects it ("047")."""
+    return f"{key % 1000:03d}"
+
+# ==============================================================================
+# --- Loader Keys & Unmatched Names ---
+# ==============================================================================
+def attach(df, name_col, dataset, codes=None, file_path=None):
+    """Adds KEY to a loaded frame from its county column, or from codes (state + county FIPS strings) for a source that
+    publishes them, and records the names that did not resolve per dataset and file. An ambiguous name ("New York")
+    only resolves to the county when the file also names the state separately."""
+    df[KEY] = fips_series(df[name_col] if codes is None else codes)
+    if codes is None and not df[name_col].isin(STATE_NAMES).any():
+        df.loc[df[name_col].astype(str).str.strip().str.lower().isin(AMBIGUOUS_NAMES), KEY] = pd.NA
+    unmatched = df.loc[df[KEY].isna(), name_col].dropna().astype(str).value_counts()
+    with _unmatched_lock:
+        _unmatched[(dataset, Path(file_path).name if file_path else "")] = unmatched.to_dict()
+    return df
+
+def area_kind(area):
+    if "/" in area: return "Combined counties"
+    if area.strip().lower() in AMBIGUOUS_NAMES: return "Ambiguous (state or county)"
+    if area in AGGREGATE_AREAS: return "State / region"
+    return "Unrecognized"
+
+def unmatched_report():
+    """Names in each file loaded by this process that did not resolve to a county, with their row counts."""
+    with _unmatched_lock:
+        rows = [{"Dataset": dataset, "File": file_name, "Name": area, "Rows": count, "Kind": area_kind(area)}
+                for (dataset, file_name), names in _unmatched.items() for area, count in names.items()]
+    df = pd.DataFrame(rows, columns=["Dataset", "File", "Name", "Rows", "Kind"])
+    return df.sort_values(["Dataset", "File", "Kind", "Name"], ignore_index=True)
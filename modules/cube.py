@@ -0,0 +1,254 @@
+# modules/cube.py
+import pandas as pd
+import numpy as np
+from modules import utils, geo, ingest, tiers, perf, counties
+from modules.config import INDICATOR_SOURCES, GEOJSON_FILE_PATH, SNAPSHOT_METRICS
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+# Data-quality bits stored per cell alongside the values.
+FLAG_NOTED = 1       # The source attached any comment to the value.
+FLAG_UNSTABLE = 2    # "Unstable Estimate" and similar.
+FLAG_SUPPRESSED = 4  # "Data Suppressed", "s", etc.
+QUALITY_PATTERNS = {FLAG_UNSTABLE: r"unstable|unreliable|interpret with caution", FLAG_SUPPRESSED: r"suppress"}
+
+# ==============================================================================
+# --- Building the Cube ---
+# ==============================================================================
+def _long_frame(source_name, df):
+    """One source in the shared long schema, keyed by integer county FIPS; rows for regions and other non-county areas are dropped."""
+    source = INDICATOR_SOURCES[source_name]
+    notes = df[source["notes_col"]].fillna("").astype(str).str.strip() if source["notes_col"] else pd.Series("", index=df.index)
+    flags = np.where(notes != "", FLAG_NOTED, 0)
+    for flag, pattern in QUALITY_PATTERNS.items():
+        flags |= np.where(notes.str.contains(pattern, case=False, regex=True), flag, 0)
+    long = pd.DataFrame({
+        "source": source_name,
+        "area": df[source["area_col"]].astype(str) if source["area_col"] else "",
+        "indicator": df[source["indicator_col"]].astype(str),
+        "fips": df[counties.KEY] if counties.KEY in df.columns else counties.fips_series(df[source["county_col"]]),
+        "year": utils.end_year(df[source["year_col"]]),
+        "value": pd.to_numeric(df[source["value_col"]], errors="coerce"),
+        "flags": flags.astype(np.uint8)
+    })
+    return long.dropna(subset=["fips", "year"])
+
+CELL_KEY = ["source", "indicator", "fips", "year"]
+
+def _one_row_per_cell(cell, value, flags):
+    """(rows to write, rows in conflicting cells) as masks over rows addressed by cube cell number. Copies of a cell with
+    the same value and flags (an indicator listed under two areas) collapse, and an empty copy gives way to a reported
+    value; a cell still reported with different values is written from no row and listed as a conflict instead."""
+    rows = pd.DataFrame({"cell": cell, "value": value, "flags": flags})
+    rows = rows[~rows.duplicated()]
+    rows = rows[~(rows["cell"].duplicated(keep=False) & rows["value"].isna())]
+    repeated = rows["cell"].duplicated(keep=False).to_numpy()
+    keep, conflicted = np.zeros(len(cell), dtype=bool), np.zeros(len(cell), dtype=bool)
+    keep[rows.index[~repeated]] = True
+    conflicted[rows.index[repeated]] = True
+    return keep, conflicted
+
+def _latest(values, flags, years):
+    """Latest reported value, year and flags along the last axis of value/flag arrays."""
+    present = ~np.isnan(values)
+    last = len(years) - 1 - np.argmax(present[..., ::-1], axis=-1) if len(years) else np.zeros(values.shape[:-1], dtype=int)
+    has_value = present.any(axis=-1)
+    latest_value = np.where(has_value, np.take_along_axis(values, last[..., None], axis=-1)[..., 0], np.nan)
+    latest_flags = np.where(has_value, np.take_along_axis(flags, last[..., None], axis=-1)[..., 0], 0).astype(np.uint8)
+    latest_year = np.where(has_value, years[last] if len(years) else 0, 0)
+    return latest_value, latest_year, latest_flags
+
+def build_cube(frames, index):
+    """Dense county x indicator x year store from {source name: loaded DataFrame}.
+
+    County codes follow the county index order; indicator codes number every (source, indicator) pair;
+    year codes are offsets from the first year. Cells no source reported are NaN in `values`, as are cells a source
+    reported twice with different values; those are listed in `conflicts` rather than resolved by row order."""
+    long = pd.concat([_long_frame(name, df) for name, df in frames.items()], ignore_index=True)
+    county_fips = [entry["fips"] for entry in index["counties"]]
+    fips_code = {int(fips): i for i, fips in enumerate(county_fips)}
+    long = long[long["fips"].isin(fips_code)].reset_index(drop=True)
+
+    indicator_codes, indicator_keys = pd.MultiIndex.from_frame(long[["source", "indicator"]]).factorize()
+    years = np.arange(int(long["year"].min()), int(long["year"].max()) + 1) if len(long) else np.arange(0)
+    c = long["fips"].map(fips_code).to_numpy()
+    y = (long["year"].to_numpy() - (years[0] if len(years) else 0)).astype(int)
+    keep, conflicted = _one_row_per_cell((c * len(indicator_keys) + indicator_codes) * len(years) + y,
+                                         long["value"].to_numpy(), long["flags"].to_numpy())
+    conflicts = long[conflicted].groupby(CELL_KEY, sort=False)["value"].agg(list).reset_index()
+
+    shape = (len(county_fips), len(indicator_keys), len(years))
+    values = np.full(shape, np.nan)
+    flags = np.zeros(shape, dtype=np.uint8)
+    values[c[keep], indicator_codes[keep], y[keep]] = long["value"].to_numpy()[keep]
+    flags[c[keep], indicator_codes[keep], y[keep]] = long["flags"].to_numpy()[keep]
+
+    indicators = indicator_keys.to_frame(index=False, name=["source", "indicator"])
+    # Every area an indicator is listed under, e.g. "Maternal and Women's Health; Perinatal and Infant Health".
+    area_codes, area_names = pd.factorize(long["area"])
+    area_pairs = pd.DataFrame({"code": indicator_codes, "area": area_codes}).drop_duplicates()
+    area_pairs["area"] = area_names[area_pairs["area"].to_numpy()]
+    indicators["area"] = area_pairs.sort_values("area").groupby("code")["area"].agg("; ".join).reindex(indicators.index).to_numpy()
+
+    # Latest reported value per (county, indicator), precomputed for profiles and cross-sections.
+    latest_value, latest_year, latest_flags = _latest(values, flags, years)
+
+    return {
+        "counties": pd.DataFrame({"fips": county_fips, "county": [entry["name"] for entry in index["counties"]]}),
+        "county_rows": fips_code,
+        "indicators": indicators, "indicator_codes": {key: i for i, key in enumerate(indicator_keys)},
+        "years": years, "values": values, "flags": flags, "missing": np.isnan(values),
+        "latest_value": latest_value, "latest_year": latest_year, "latest_flags": latest_flags,
+        "conflicts": conflicts
+    }
+
+def apply_delta(cube, frames, index):
+    """A new cube with the rows of {source name: appended DataFrame} written over `cube`. New indicators and years extend the
+    arrays; latest values are recomputed only for the (county, indicator) pairs the rows touch."""
+    long = pd.concat([_long_frame(name, df) for name, df in frames.items()], ignore_index=True)
+    long = long[long["fips"].isin(cube["county_rows"])].reset_index(drop=True)
+    if long.empty: return cube
+
+    indicator_codes = dict(cube["indicator_codes"])
+    added = long.drop_duplicates(["source", "indicator"])
+    added = added[[key not in indicator_codes for key in zip(added["source"], added["indicator"])]]
+    for key in zip(added["source"], added["indicator"]):
+        indicator_codes[key] = len(indicator_codes)
+    old_years = cube["years"]
+    years = np.arange(int(min(old_years[0], long["year"].min())), int(max(old_years[-1], long["year"].max())) + 1)
+    offset = int(old_years[0] - years[0])
+
+    shape = (len(cube["counties"]), len(indicator_codes), len(years))
+    values = np.full(shape, np.nan)
+    flags = np.zeros(shape, dtype=np.uint8)
+    old_shape = cube["values"].shape
+    values[:, :old_shape[1], offset:offset + old_shape[2]] = cube["values"]
+    flags[:, :old_shape[1], offset:offset + old_shape[2]] = cube["flags"]
+
+    c = long["fips"].map(cube["county_rows"]).to_numpy()
+    i = np.array([indicator_codes[key] for key in zip(long["source"], long["indicator"])])
+    y = (long["year"].to_numpy() - years[0]).astype(int)
+
+    # Appended rows meet the cube's value for the same cell as in build_cube: equal copies collapse, different ones
+    # conflict, and a cell that already conflicts stays empty.
+    cell = (c * shape[1] + i) * shape[2] + y
+    _, current = np.unique(cell, return_index=True)
+    current = current[~np.isnan(values[c[current], i[current], y[current]])]
+    rows = pd.concat([long, long.iloc[current].assign(value=values[c[current], i[current], y[current]],
+                                                      flags=flags[c[current], i[current], y[current]])], ignore_index=True)
+    c, i, y = np.concatenate([c, c[current]]), np.concatenate([i, i[current]]), np.concatenate([y, y[current]])
+    keep, conflicted = _one_row_per_cell(np.concatenate([cell, cell[current]]), rows["value"].to_numpy(), rows["flags"].to_numpy())
+    conflicted_before = pd.MultiIndex.from_frame(rows[CELL_KEY]).isin(pd.MultiIndex.from_frame(cube["conflicts"][CELL_KEY]))
+    keep &= ~conflicted_before
+    conflicted |= conflicted_before & rows["value"].notna().to_numpy()
+    values[c[keep], i[keep], y[keep]] = rows["value"].to_numpy()[keep]
+    flags[c[keep], i[keep], y[keep]] = rows["flags"].to_numpy()[keep]
+    values[c[conflicted], i[conflicted], y[conflicted]] = np.nan
+    flags[c[conflicted], i[conflicted], y[conflicted]] = 0
+    conflicts = (pd.concat([cube["conflicts"].explode("value"), rows.loc[conflicted, CELL_KEY + ["value"]]], ignore_index=True)
+                 .drop_duplicates().groupby(CELL_KEY, sort=False)["value"].agg(list).reset_index())
+
+    latest_value = np.full(shape[:2], np.nan)
+    latest_year = np.zeros(shape[:2], dtype=cube["latest_year"].dtype)
+    latest_flags = np.zeros(shape[:2], dtype=np.uint8)
+    latest_value[:, :old_shape[1]], latest_year[:, :old_shape[1]], latest_flags[:, :old_shape[1]] = \
+        cube["latest_value"], cube["latest_year"], cube["latest_flags"]
+    pairs = np.unique(np.stack([c, i]), axis=1)
+    latest_value[pairs[0], pairs[1]], latest_year[pairs[0], pairs[1]], latest_flags[pairs[0], pairs[1]] = \
+        _latest(values[pairs[0], pairs[1]], flags[pairs[0], pairs[1]], years)
+
+    indicators = pd.concat([cube["indicators"], added[["source", "indicator", "area"]]], ignore_index=True)
+    return dict(cube, indicators=indicators, indicator_codes=indicator_codes, years=years, values=values, flags=flags,
+                missing=np.isnan(values), latest_value=latest_value, latest_year=latest_year, latest_flags=latest_flags,
+                conflicts=conflicts)
+
+@perf.cache_resource(show_spinner="Building indicator cube...")
+def _cached_cube(files, key="cube"):
+    index = geo.get_county_index(GEOJSON_FILE_PATH)
+    if index is None: return None
+    paths = {str(path): version for name, path, version in files if version is not None}
+    source_by_path = {str(path): name for name, path, version in files}
+    file_paths = {str(path): path for name, path, version in files}
+
+    def build():
+        frames = {}
+        for path in paths:
+            name = source_by_path[path]
+            df = INDICATOR_SOURCES[name]["loader_func"](file_paths[path])
+            if df is not None and not df.empty: frames[name] = df
+        return build_cube(frames, index) if frames else None
+
+    # After an ingest append, the previous cube is patched with just the appended rows.
+    return ingest.incremental(key, paths, build, lambda previous, deltas: apply_delta(
+        previous, {source_by_path[path]: delta for path, delta in deltas.items()}, index))
+
+def _source_files(overrides=None):
+    """((source name, file path, version), ...) for every indicator source, with any {source name: path} overrides."""
+    overrides = overrides or {}
+    paths = {name: overrides.get(name, source["file_path"]) for name, source in INDICATOR_SOURCES.items()}
+    return tuple((name, path, utils.dataset_version(path)) for name, path in paths.items())
+
+def get_cube():
+    """The shared cube, rebuilt only when one of the source files changes."""
+    return _cached_cube(_source_files())
+
+def get_latest_cube():
+    """A cube for latest-value lookups (the County Snapshot) whose Prevention Agenda part comes from the
+    most-recent-year extract, so it never reads the full PA trend file. Its PA years cover only the latest values.
+    It is the shared cube once ingest appends have made the trend file the latest tier."""
+    latest = tiers.latest_file_path()
+    if latest == tiers.history_file_path(): return get_cube()
+    return _cached_cube(_source_files({"Prevention Agenda": latest}), key="cube:latest")
+
+# ==============================================================================
+# --- Slice Queries ---
+# ==============================================================================
+def county_code(cube, county):
+    """Row of a county given any name or FIPS form counties.fips() resolves."""
+    return cube["county_rows"].get(counties.fips(county))
+
+def indicator_code(cube, source, indicator):
+    return cube["indicator_codes"].get((source, indicator))
+
+def source_indicators(cube, source):
+    """Dictionary rows (with their codes as index) for one source."""
+    indicators = cube["indicators"]
+    return indicators[indicators["source"] == source]
+
+def county_profile(cube, county, source=None):
+    """Latest value, year and quality flags of every indicator reported for one county."""
+    row = county_code(cube, county)
+    if row is None: return pd.DataFrame()
+    profile = cube["indicators"].assign(value=cube["latest_value"][row], year=cube["latest_year"][row], flags=cube["latest_flags"][row])
+    profile = profile[~np.isnan(cube["latest_value"][row])]
+    return profile[profile["source"] == source] if source else profile
+
+def cross_section(cube, code, year=None):
+    """One indicator across all counties: the given year, or each county's latest year."""
+    if year is None:
+        values, years, flags = cube["latest_value"][:, code], cube["latest_year"][:, code], cube["latest_flags"][:, code]
+    else:
+        y = int(year) - int(cube["years"][0])
+        if not 0 <= y < len(cube["years"]): return pd.DataFrame()
+        values, flags = cube["values"][:, code, y], cube["flags"][:, code, y]
+        years = np.full(len(values), int(year))
+    section = cube["counties"].assign(year=years, value=values, flags=flags)
+    return section[~np.isnan(values)].reset_index(drop=True)
+
+def series(cube, county, code):
+    """One county's time series for one indicator."""
+    row = county_code(cube, county)
+    if row is None: return pd.DataFrame(columns=["year", "value", "flags"])
+    present = ~cube["missing"][row, code]
+    return pd.DataFrame({"year": cube["years"][present], "value": cube["values"][row, code][present], "flags": cube["flags"][row, code][present]})
+
+def latest_metric(cube, county, source, indicator):
+    """(value, year, flags) of the latest value for one county and indicator, or None when not reported."""
+    row, code = county_code(cube, county), indicator_code(cube, source, indicator)
+    if row is None or code is None or np.isnan(cube["latest_value"][row, code]): return None
+    return float(cube["latest_value"][row, code]), int(cube["latest_year"][row, code]), int(cube["latest_flags"][row, code])
+
+def snapshot(cube, county, metrics=SNAPSHOT_METRICS):
+    """{label: (value, year, flags) or None} for a {label: (source, indicator)} mapping, e.g. the County Snapshot grid."""
+    return {label: latest_metric(cube, county, source, indicator) for label, (source, indicator) in metrics.items()}
@@ -0,0 +1,109 @@
+# modules/data_viewer.py
+import io
+import math
+import streamlit as st
+import pandas as pd
+import numpy as np
+from modules import utils, perf
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+PAGE_SIZES = [25, 50, 100, 250]
+DEFAULT_PAGE_SIZE = 50
+ORIGINAL_ORDER = "(original order)"
+ORDER_KEY = "_viewer_order_{key}"
+
+# ==============================================================================
+# --- Query ---
+# ==============================================================================
+def search_mask(df, query, columns):
+    """Rows where any of the given columns, numbers included, contains query (case-insensitive, literal match)."""
+    mask = np.zeros(len(df), dtype=bool)
+    for col in columns:
+        mask |= df[col].astype(str).str.contains(query, case=False, regex=False, na=False).to_numpy()
+    return mask
+
+def row_order(df, query, columns, sort_by, descending):
+    """Positions of the rows matching query, in display order."""
+    positions = np.flatnonzero(search_mask(df, query, columns)) if query else np.arange(len(df))
+    if sort_by == ORIGINAL_ORDER: return positions
+    values = df[sort_by].iloc[positions]
+    try:
+        order = values.reset_index(drop=True).sort_values(ascending=not descending, kind="stable", na_position="last").index
+    except TypeError:  # Object columns mixing numbers and text sort as text.
+        order = values.astype(str).reset_index(drop=True).sort_values(ascending=not descending, kind="stable").index
+    return positions[order.to_numpy()]
+
+def frame_fingerprint(df):
+    """Row count and a hash of the contents, so a cached row order is only reused for the same data."""
+    return len(df), int(pd.util.hash_pandas_object(df, index=False).sum())
+
+def _cached_row_order(key, df, query, columns, sort_by, descending):
+    # Kept per viewer for the data it was computed on, so paging through a result does not search and sort again.
+    state_key = ORDER_KEY.format(key=key)
+    signature = (query, tuple(columns), sort_by, descending)
+    fingerprint = frame_fingerprint(df)
+    cached = st.session_state.get(state_key)
+    if cached and cached["fingerprint"] == fingerprint and cached["signature"] == signature: return cached["positions"]
+    with perf.span("data_viewer.query", rows=len(df)):
+        positions = row_order(df, query, columns, sort_by, descending)
+    st.session_state[state_key] = {"fingerprint": fingerprint, "signature": signature, "positions": positions}
+    return positions
+
+# ==============================================================================
+# --- Export ---
+# ==============================================================================
+def export_csv(df):
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+def export_parquet(df):
+    buffer = io.BytesIO()
+    utils.parquet_ready(df).to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+# ==============================================================================
+# --- Viewer ---
+# ==============================================================================
+@perf.fragment("data_viewer")
+def render_data_viewer(df, key, file_name="data"):
+    """Paginated table that keeps df on the server: search, sort and column choice run here and only the current
+    page is sent to the browser. Runs as a fragment, so paging does not rerun the page around it."""
+    if df is None or df.empty:
+        st.info("No rows to show."); return
+    all_columns = [str(col) for col in df.columns]
+    frame = df if list(df.columns) == all_columns else df.set_axis(all_columns, axis=1)
+
+    c1, c2, c3 = st.columns([3, 2, 1])
+    query = c1.text_input("Search", key=f"{key}_search", placeholder="Text in any shown column").strip()
+    sort_by = c2.selectbox("Sort by", [ORIGINAL_ORDER] + all_columns, key=f"{key}_sort")
+    descending = c3.toggle("Descending", key=f"{key}_desc")
+    columns = st.multiselect("Columns", all_columns, default=all_columns, key=f"{key}_columns") or all_columns
+
+    previous = st.session_state.get(ORDER_KEY.format(key=key))
+    positions = _cached_row_order(key, frame, query, columns, sort_by, descending)
+    total = len(positions)
+
+    p1, p2, p3 = st.columns([1, 1, 3])
+    page_size = p1.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=f"{key}_page_size")
+    pages = max(1, math.ceil(total / page_size))
+    # A new search starts from the first page; other changes keep the page where it still exists.
+    if previous is None or previous["signature"][0] != query: st.session_state[f"{key}_page"] = 1
+    elif st.session_state.get(f"{key}_page", 1) > pages: st.session_state[f"{key}_page"] = pages
+    page = p2.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    shown = positions[start:start + page_size]
+    matched = f" matching '{query}' (of {len(df):,})" if query else ""
+    p3.caption(f"Page {page:,} of {pages:,}: rows {start + 1 if total else 0:,}–{start + len(shown):,} of {total:,}{matched}")
+
+    st.dataframe(frame.iloc[shown][columns], hide_index=True, use_container_width=True)
+
+    # Exports cover the whole result (every page) and are only built when a button is clicked.
+    result = lambda: frame.iloc[positions][columns]
+    d1, d2, _ = st.columns([1, 1, 3])
+    d1.download_button("⬇️ CSV", data=lambda: export_csv(result()), file_name=f"{file_name}.csv", mime="text/csv",
+                       key=f"{key}_csv", use_container_width=True)
+    d2.download_button("⬇️ Parquet", data=lambda: export_parquet(result()), file_name=f"{file_name}.parquet",
+                       mime="application/vnd.apache.parquet", key=f"{key}_parquet", use_container_width=True)
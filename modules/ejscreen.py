@@ -0,0 +1,67 @@
+# modules/ejscreen.py
+import pandas as pd
+import numpy as np
+from modules import utils, perf
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+COUNTY_COL = "County Name"
+TRACT_COL = "Census Tract ID"
+POPULATION_COL = "Total Population"
+# EJScreen's own screening threshold: tracts at or above the 80th national percentile.
+HIGH_PERCENTILE = 80
+DISTRIBUTION_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+def percentile_columns(df):
+    return [col for col in df.columns if col.endswith("(%ile)")]
+
+# ==============================================================================
+# --- County Rollups ---
+# ==============================================================================
+@perf.cache_data(show_spinner="Aggregating tracts by county...")
+def _county_rollups(file_path, version):
+    df = utils.load_ejscreen_data(file_path)
+    if df is None or df.empty: return None
+    cols = percentile_columns(df)
+    values = df[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    weights = pd.to_numeric(df[POPULATION_COL], errors="coerce").fillna(0).to_numpy(dtype=float)[:, None]
+    present = ~np.isnan(values)
+
+    # Every weighted sum comes out of a single groupby over one stacked block:
+    # [value * pop | pop where value present | pop where value >= threshold | pop]
+    stacked = np.hstack([np.where(present, values, 0) * weights, present * weights, (values >= HIGH_PERCENTILE) * weights, weights])
+    sums = pd.DataFrame(stacked).groupby(df[COUNTY_COL].to_numpy()).sum()
+    n = len(cols)
+    weighted_sum, weight_total, high_total = (sums.iloc[:, i * n:(i + 1) * n].to_numpy() for i in range(3))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weighted_mean = pd.DataFrame(weighted_sum / weight_total, index=sums.index, columns=cols).round(1)
+        high_share = pd.DataFrame(100 * high_total / weight_total, index=sums.index, columns=cols).round(1)
+    population = sums.iloc[:, -1].astype(int)
+
+    distribution = df.groupby(COUNTY_COL)[cols].quantile(list(DISTRIBUTION_QUANTILES))
+    distribution.index.names = [COUNTY_COL, "Quantile"]
+    return {"columns": cols, "weighted_mean": weighted_mean, "high_share": high_share,
+            "distribution": distribution, "population": population, "tracts": df[COUNTY_COL].value_counts()}
+
+def get_county_rollups(file_path):
+    """Population-weighted county means, share of residents in high-percentile tracts and tract distributions, per dataset version."""
+    return _county_rollups(file_path, utils.dataset_version(file_path))
+
+# ==============================================================================
+# --- Tract Drill-Down ---
+# ==============================================================================
+@perf.cache_resource(show_spinner=False)
+def _tract_index(file_path, version):
+    # A shared resource: one tract table and its per-county row positions per dataset version, not a copy per call.
+    df = utils.load_ejscreen_data(file_path)
+    if df is None or df.empty: return None
+    return {"tracts": df.reset_index(drop=True), "positions": df.groupby(COUNTY_COL).indices}
+
+def get_county_tracts(file_path, county):
+    """Tracts of one county, sliced from the shared tract table by precomputed row positions instead of a scan or a
+    fresh copy of the full table."""
+    index = _tract_index(file_path, utils.dataset_version(file_path))
+    positions = index["positions"].get(county) if index else None
+    if positions is None: return pd.DataFrame()
+    return index["tracts"].iloc[positions]
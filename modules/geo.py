@@ -0,0 +1,246 @@
+# modules/geo.py
+import numpy as np
+import json
+import math
+from pathlib import Path
+from modules import utils, perf, counties
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+# Douglas-Peucker tolerances (degrees) for the pre-simplified layers, finest first.
+# At zoom z one screen pixel spans roughly 360 / (256 * 2**z) degrees, so each layer
+# is sent only at zooms where its error stays under about a pixel.
+SIMPLIFY_TOLERANCES = (0.0005, 0.002, 0.008, 0.03)
+COORD_DECIMALS = 5  # ~1 m; more precision than this is invisible on a county map.
+DEFAULT_VIEW = {"latitude": 42.9, "longitude": -75.5, "zoom": 5.8}
+
+# ==============================================================================
+# --- Geometry Helpers ---
+# ==============================================================================
+def simplify_line(points, tolerance):
+    """Douglas-Peucker simplification of an (n, 2) array, always keeping both endpoints."""
+    n = len(points)
+    if n < 3 or tolerance <= 0:
+        return points
+    keep = np.zeros(n, dtype=bool); keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2: continue
+        segment = points[start + 1:end]
+        a, b = points[start], points[end]
+        ab = b - a
+        length = math.hypot(ab[0], ab[1])
+        if length == 0:
+            dists = np.hypot(segment[:, 0] - a[0], segment[:, 1] - a[1])
+        else:
+            dists = np.abs(ab[0] * (segment[:, 1] - a[1]) - ab[1] * (segment[:, 0] - a[0])) / length
+        i = int(np.argmax(dists))
+        if dists[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split)); stack.append((split, end))
+    return points[keep]
+
+def _simplify_ring(ring, tolerance):
+    points = np.asarray(ring, dtype=float)
+    simplified = simplify_line(points, tolerance)
+    if len(simplified) < 4:  # A closed ring needs at least a triangle; keep the original instead.
+        simplified = points
+    return np.round(simplified, COORD_DECIMALS).tolist()
+
+def _polygons(geometry):
+    if geometry["type"] == "Polygon": return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon": return geometry["coordinates"]
+    return []
+
+def simplify_geometry(geometry, tolerance):
+    polygons = [[_simplify_ring(ring, tolerance) for ring in polygon] for polygon in _polygons(geometry)]
+    if geometry["type"] == "Polygon": return {"type": "Polygon", "coordinates": polygons[0]}
+    return {"type": "MultiPolygon", "coordinates": polygons}
+
+def geometry_bbox(geometry):
+    points = np.concatenate([np.asarray(ring, dtype=float) for polygon in _polygons(geometry) for ring in polygon])
+    return [float(points[:, 0].min()), float(points[:, 1].min()), float(points[:, 0].max()), float(points[:, 1].max())]
+
+def geometry_centroid(geometry):
+    """Area-weighted centroid over all polygons (holes subtract), via the shoelace formula."""
+    area_sum, cx_sum, cy_sum = 0.0, 0.0, 0.0
+    for polygon in _polygons(geometry):
+        for ring_index, ring in enumerate(polygon):
+            pts = np.asarray(ring, dtype=float)
+            x, y = pts[:, 0], pts[:, 1]
+            x1, y1 = np.roll(x, -1), np.roll(y, -1)
+            cross = x * y1 - x1 * y
+            area = abs(cross.sum() / 2)
+            if area == 0: continue
+            sign = 1 if ring_index == 0 else -1
+            cx = ((x + x1) * cross).sum() / (3 * cross.sum())
+            cy = ((y + y1) * cross).sum() / (3 * cross.sum())
+            area_sum += sign * area; cx_sum += sign * area * cx; cy_sum += sign * area * cy
+    if area_sum == 0:
+        bbox = geometry_bbox(geometry)
+        return [(bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2]
+    return [float(cx_sum / area_sum), float(cy_sum / area_sum)]
+
+def geoid_to_fips(geoid):
+    """'05000US36027' -> '36027' (state + county FIPS)."""
+    return str(geoid)[-5:]
+
+# ==============================================================================
+# --- County Geometry Index ---
+# ==============================================================================
+def build_county_index(geojson):
+    """Name/FIPS lookup with bbox, centroid and pre-simplified layers, built once per GeoJSON."""
+    counties, by_key = [], {}
+    layers = {tolerance: {"type": "FeatureCollection", "features": []} for tolerance in SIMPLIFY_TOLERANCES}
+    for feature in geojson["features"]:
+        props = feature["properties"]
+        full_name = props["name"]
+        entry = {
+            "name": full_name.removesuffix(" County"), "full_name": full_name,
+            "fips": geoid_to_fips(props["geoid"]), "feature": feature,
+            "bbox": geometry_bbox(feature["geometry"]), "centroid": geometry_centroid(feature["geometry"]),
+            "simplified": {}
+        }
+        for tolerance in SIMPLIFY_TOLERANCES:
+            simplified = {"type": "Feature", "properties": {"name": full_name, "fips": entry["fips"]},
+                          "geometry": simplify_geometry(feature["geometry"], tolerance)}
+            entry["simplified"][tolerance] = simplified
+            layers[tolerance]["features"].append(simplified)
+        counties.append(entry)
+        for key in (entry["name"], full_name, entry["fips"], props["geoid"]):
+            by_key[key] = entry
+    return {"counties": counties, "by_key": by_key, "layers": layers}
+
+@perf.cache_resource(show_spinner=False)
+def _cached_county_index(file_path, version):
+    geojson = utils.load_county_geojson(file_path)
+    return build_county_index(geojson) if geojson else None
+
+def get_county_index(file_path):
+    """Shared, read-only county index; rebuilt only when the GeoJSON file changes."""
+    return _cached_county_index(str(file_path), utils.dataset_version(file_path))
+
+def find_county(index, key):
+    """Looks up a county by any name or FIPS form counties.fips() resolves ('Dutchess', 'Dutchess County', 36027, 'Kings (Brooklyn)')."""
+    fips = counties.fips(key)
+    return index["by_key"].get(str(fips) if fips is not None else key)
+
+def tolerance_for_zoom(zoom):
+    degrees_per_pixel = 360 / (256 * 2 ** zoom)
+    usable = [t for t in SIMPLIFY_TOLERANCES if t <= degrees_per_pixel]
+    return max(usable) if usable else SIMPLIFY_TOLERANCES[0]
+
+def layer_for_zoom(index, zoom):
+    return index["layers"][tolerance_for_zoom(zoom)]
+
+def county_view(entry, fill_fraction=0.6):
+    """Latitude/longitude/zoom that centers a county and fits its bbox into ~fill_fraction of a 400px map."""
+    min_lon, min_lat, max_lon, max_lat = entry["bbox"]
+    lon_span = max(max_lon - min_lon, 1e-3)
+    lat_span = max((max_lat - min_lat) / math.cos(math.radians(entry["centroid"][1])), 1e-3)
+    zoom = math.log2(400 * fill_fraction * 360 / (256 * max(lon_span, lat_span)))
+    return {"latitude": entry["centroid"][1], "longitude": entry["centroid"][0], "zoom": round(min(max(zoom, 5.0), 11.0), 2)}
+
+# ==============================================================================
+# --- TopoJSON Encoding ---
+# ==============================================================================
+# Shared borders are stored once as arcs, coordinates are quantized to an integer grid and
+# delta-encoded, and arcs are simplified with their junction endpoints fixed, so neighbouring
+# counties still meet exactly. The topology is written once per GeoJSON version to Streamlit's
+# static folder; charts reference it by URL, so switching indicators only re-sends the values.
+STATIC_DIR = Path(__file__).parent.parent / "static"
+TOPOLOGY_FILE = "nys_counties.topo.json"
+TOPOLOGY_OBJECT = "counties"
+TOPOLOGY_QUANTIZATION = 10000
+TOPOLOGY_TOLERANCE = 1.0  # In quantized grid units (~90 m across New York).
+
+def _quantized_rings(geojson, quantization):
+    points = np.concatenate([np.asarray(ring, dtype=float) for feature in geojson["features"]
+                             for polygon in _polygons(feature["geometry"]) for ring in polygon])
+    x0, y0 = points.min(axis=0)
+    kx = (points[:, 0].max() - x0) / (quantization - 1) or 1
+    ky = (points[:, 1].max() - y0) / (quantization - 1) or 1
+    shapes = []
+    for feature in geojson["features"]:
+        polygons = []
+        for polygon in _polygons(feature["geometry"]):
+            rings = []
+            for ring in polygon:
+                q = np.rint((np.asarray(ring, dtype=float) - [x0, y0]) / [kx, ky]).astype(int)
+                q = q[np.r_[True, np.any(np.diff(q, axis=0) != 0, axis=1)]]  # Drop repeats created by quantizing.
+                ring_points = [tuple(p) for p in q.tolist()]
+                if ring_points[0] != ring_points[-1]: ring_points.append(ring_points[0])
+                if len(ring_points) >= 4: rings.append(ring_points[:-1])  # Stored open; closed again when cut into arcs.
+            if rings: polygons.append(rings)
+        shapes.append((feature, polygons))
+    return shapes, {"scale": [kx, ky], "translate": [float(x0), float(y0)]}
+
+def _find_junctions(shapes):
+    """A point is a junction where the rings passing through it stop sharing the same neighbours."""
+    neighbours, junctions = {}, set()
+    for _, polygons in shapes:
+        for rings in polygons:
+            for ring in rings:
+                m = len(ring)
+                for j, point in enumerate(ring):
+                    pair = (ring[j - 1], ring[(j + 1) % m])
+                    seen = neighbours.setdefault(point, pair)
+                    if seen != pair and seen != pair[::-1]:
+                        junctions.add(point)
+    return junctions
+
+def _cut_ring(ring, junctions):
+    cuts = [j for j, point in enumerate(ring) if point in junctions]
+    if not cuts:
+        start = min(range(len(ring)), key=ring.__getitem__)  # Canonical start so identical rings dedupe.
+        rotated = ring[start:] + ring[:start]
+        return [rotated + [rotated[0]]]
+    rotated = ring[cuts[0]:] + ring[:cuts[0]]
+    offsets = [c - cuts[0] for c in cuts] + [len(ring)]
+    closed = rotated + [rotated[0]]
+    return [closed[a:b + 1] for a, b in zip(offsets, offsets[1:])]
+
+def build_topology(geojson, quantization=TOPOLOGY_QUANTIZATION, tolerance=TOPOLOGY_TOLERANCE):
+    """Encodes county polygons as quantized, delta-encoded TopoJSON with shared arcs (ids are 5-digit FIPS)."""
+    shapes, transform = _quantized_rings(geojson, quantization)
+    junctions = _find_junctions(shapes)
+    arcs, arc_ids, geometries = [], {}, []
+
+    def arc_index(points):
+        key = tuple(points)
+        if key in arc_ids: return arc_ids[key]
+        if key[::-1] in arc_ids: return ~arc_ids[key[::-1]]
+        arc_ids[key] = len(arcs)
+        arcs.append(points)
+        return arc_ids[key]
+
+    for feature, polygons in shapes:
+        topo_polygons = [[[arc_index(arc) for arc in _cut_ring(ring, junctions)] for ring in rings] for rings in polygons]
+        props = feature["properties"]
+        geometries.append({"type": "MultiPolygon", "id": geoid_to_fips(props["geoid"]),
+                           "properties": {"name": props["name"]}, "arcs": topo_polygons})
+
+    encoded_arcs = []
+    for points in arcs:
+        pts = np.asarray(points)
+        simplified = simplify_line(pts.astype(float), tolerance).astype(int)
+        if points[0] == points[-1] and len(simplified) < 4:  # Keep closed single-arc rings drawable.
+            simplified = pts
+        encoded_arcs.append(np.vstack([simplified[:1], np.diff(simplified, axis=0)]).tolist())
+    return {"type": "Topology", "transform": transform, "arcs": encoded_arcs,
+            "objects": {TOPOLOGY_OBJECT: {"type": "GeometryCollection", "geometries": geometries}}}
+
+@perf.cache_resource(show_spinner=False)
+def _write_topology(file_path, version):
+    geojson = utils.load_county_geojson(file_path)
+    if not geojson: return None
+    STATIC_DIR.mkdir(exist_ok=True)
+    (STATIC_DIR / TOPOLOGY_FILE).write_text(json.dumps(build_topology(geojson), separators=(",", ":")))
+    return f"app/static/{TOPOLOGY_FILE}?v={version}"
+
+def county_topology_url(file_path):
+    """URL of the county TopoJSON served from Streamlit's static folder, (re)written when the GeoJSON changes."""
+    return _write_topology(str(file_path), utils.dataset_version(file_path))
@@ -0,0 +1,57 @@
+# modules/hanlon.py
+import pandas as pd
+import numpy as np
+from modules import utils, ingest, perf
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+KEY_COLS = ["County Name", "Priority Area", "Focus Area", "Indicator"]
+# Size: event count above each threshold earns the matching score; anything else (including missing counts) gets the default.
+SIZE_THRESHOLDS = [(1000, 8), (500, 7), (100, 6)]
+DEFAULT_SIZE = 5
+# Seriousness: first quartile label found in the Quartile text wins, so "Q3 - Q4" scores as Q4.
+SERIOUSNESS_BY_QUARTILE = [("Q4", 9), ("Q3", 7), ("Q1", 4), ("Q2", 4)]
+DEFAULT_SERIOUSNESS = 5
+DEFAULT_EFFECTIVENESS = 1.0
+
+# ==============================================================================
+# --- Batch Scoring ---
+# ==============================================================================
+def suggest_size(event_counts):
+    counts = pd.to_numeric(event_counts.astype(str).str.replace(",", "", regex=False), errors="coerce").to_numpy()
+    return np.select([counts > limit for limit, _ in SIZE_THRESHOLDS], [score for _, score in SIZE_THRESHOLDS], DEFAULT_SIZE)
+
+def suggest_seriousness(quartiles):
+    quartiles = quartiles.fillna("").astype(str)
+    return np.select([quartiles.str.contains(label, regex=False).to_numpy() for label, _ in SERIOUSNESS_BY_QUARTILE],
+                     [score for _, score in SERIOUSNESS_BY_QUARTILE], DEFAULT_SERIOUSNESS)
+
+def score_latest(df):
+    """Suggested scores for the latest row of every (county, priority area, focus area, indicator) in a Prevention Agenda frame."""
+    latest = df.dropna(subset=KEY_COLS).assign(
+        _year=utils.end_year(df["Data Years"])
+    ).sort_values("_year", kind="stable").drop_duplicates(KEY_COLS, keep="last")
+    scores = latest[KEY_COLS + ["Data Years", "Percentage/Rate/Ratio", "Quartile", "Event Count/Rate"]].reset_index(drop=True)
+    scores["Size"] = suggest_size(scores["Event Count/Rate"])
+    scores["Seriousness"] = suggest_seriousness(scores["Quartile"])
+    return scores
+
+@perf.cache_data(show_spinner="Scoring all indicators...")
+def _suggested_scores(file_path, version):
+    df = utils.load_prevention_data(file_path)
+    if df is None: return None
+    # After an ingest append, only the indicators and counties in the appended rows are rescored.
+    return ingest.incremental(("hanlon", str(file_path)), {str(file_path): version}, lambda: score_latest(df),
+                              lambda previous, deltas: ingest.patch_groups(previous, df, deltas[str(file_path)], KEY_COLS, score_latest))
+
+def get_suggested_scores(file_path):
+    """Suggested Size and Seriousness for the latest value of every (county, indicator), computed once per dataset version."""
+    return _suggested_scores(file_path, utils.dataset_version(file_path))
+
+def rank_priorities(scores, effectiveness):
+    """Hanlon score ((Size + Seriousness) * Effectiveness) and within-county rank, with effectiveness weighted by priority area."""
+    weights = scores["Priority Area"].map(effectiveness).fillna(DEFAULT_EFFECTIVENESS).to_numpy()
+    ranked = scores.assign(Effectiveness=weights, **{"Priority Score": (scores["Size"] + scores["Seriousness"]).to_numpy() * weights})
+    ranked["Rank"] = ranked.groupby("County Name")["Priority Score"].rank(method="min", ascending=False).astype(int)
+    return ranked.sort_values(["County Name", "Rank"], ignore_index=True)
@@ -0,0 +1,227 @@
+# modules/ingest.py
+"""Incremental ingest of newly published rows (new years or indicators) for the CHIRS, Prevention Agenda and MCH dashboards.
+
+    python -m modules.ingest "Prevention Agenda Trends" new_year.csv      # validate, append and print the change report
+    python -m modules.ingest "MCH Dashboard" revisions.xlsx --dry-run     # validate and report only
+
+The first ingest for a dataset copies the loaded source file into data/store/<file stem>.parquet, which config.py then
+reads instead of the source file. Each append adds the delta's new and revised rows to that file, keeps the delta itself
+under data/store/deltas/ and records it in a manifest. Derived tables (indicator cube, Hanlon scores, trend fits) use
+the manifest to recompute only the counties and indicators a delta touched."""
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+
+from modules import utils, counties
+from modules.config import CONFIGS, DATA_DIR, STORE_DIR
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+SOURCE_FILES = {
+    "CHIRS Indicators": "chir_county_trend.xlsx",
+    "Prevention Agenda Trends": "PreventionAgendaTrackingIndicators-CountyTrendData.csv",
+    "MCH Dashboard": "MCH-CountyTrendData.xlsx",
+}
+# Columns identifying one published value; a delta row with the same key as a stored row revises it.
+KEY_COLUMNS = {
+    "CHIRS Indicators": ["Topic Area", "Indicator Title", "Geographic area", "Year"],
+    "Prevention Agenda Trends": ["Priority Area", "Focus Area", "Indicator", "County Name", "Data Years"],
+    "MCH Dashboard": ["Domain Area", "Indicator", "County Name", "Data Years"],
+}
+DELTA_DIR = STORE_DIR / "deltas"
+
+# Last result per derived table built on a store file, kept so the next ingest append can patch it, and a lock per
+# table so that building one does not wait for another.
+_derived = {}
+_derived_locks = {}
+_locks_lock = threading.Lock()
+
+# ==============================================================================
+# --- Store ---
+# ==============================================================================
+def store_path(dataset):
+    return STORE_DIR / f"{Path(SOURCE_FILES[dataset]).stem}.parquet"
+
+def manifest_path(store_file):
+    return Path(store_file).with_suffix(".manifest.json")
+
+def read_manifest(store_file):
+    path = manifest_path(store_file)
+    return json.loads(path.read_text()) if path.exists() else {"appends": []}
+
+def _write_parquet(df, path):
+    df = utils.parquet_ready(df)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+def seed_store(dataset):
+    """Copies the loaded source file into the store; the first step of the first ingest."""
+    source = DATA_DIR / SOURCE_FILES[dataset]
+    df = CONFIGS[dataset]["loader_func"](source)
+    if df is None: raise SystemExit(f"Could not load {source} to seed the store.")
+    _write_parquet(df, store_path(dataset))
+    manifest_path(store_path(dataset)).write_text(json.dumps({"dataset": dataset, "seeded_from": source.name, "appends": []}, indent=2))
+
+# ==============================================================================
+# --- Validation & Append ---
+# ==============================================================================
+def validate_delta(delta, stored, dataset):
+    """(errors, warnings) for a loaded delta against the stored dataset's schema."""
+    config, keys = CONFIGS[dataset], KEY_COLUMNS[dataset]
+    errors, warnings = [], []
+    missing = [col for col in keys + [config["value_col"]] if col not in delta.columns]
+    if missing: return [f"Missing required columns: {', '.join(missing)}"], warnings
+    absent = [col for col in stored.columns if col not in delta.columns]
+    if absent: warnings.append(f"Columns left empty (not in delta): {', '.join(absent)}")
+    extra = [col for col in delta.columns if col not in stored.columns]
+    if extra: warnings.append(f"Columns ignored (not in stored dataset): {', '.join(extra)}")
+    if delta.empty: errors.append("Delta contains no rows.")
+    if utils.end_year(delta[config["year_col"]]).isna().any():
+        errors.append(f"{int(utils.end_year(delta[config['year_col']]).isna().sum())} rows have no recognizable year in '{config['year_col']}'.")
+    duplicated = int(delta.duplicated(keys).sum())
+    if duplicated: errors.append(f"{duplicated} rows repeat the key ({', '.join(keys)}) of another delta row.")
+    new_counties = sorted(set(delta[config["county_col"]].dropna()) - set(stored[config["county_col"]].dropna()))
+    if new_counties: warnings.append(f"Areas not in the stored dataset: {', '.join(map(str, new_counties))}")
+    if counties.KEY in delta.columns:
+        unmatched = sorted(set(delta.loc[delta[counties.KEY].isna(), config["county_col"]].dropna().astype(str)))
+        unrecognized = [area for area in unmatched if counties.area_kind(area) == "Unrecognized"]
+        if unrecognized: warnings.append(f"Areas not matched to a county FIPS code: {', '.join(unrecognized)}")
+    return errors, warnings
+
+def _row_hashes(df, columns):
+    return pd.util.hash_pandas_object(df[columns].astype(str), index=False).to_numpy()
+
+def diff_delta(delta, stored, dataset):
+    """Splits delta rows into new, revised (same key, different contents) and unchanged, aligned to the stored columns."""
+    keys = KEY_COLUMNS[dataset]
+    delta = delta.reindex(columns=stored.columns)
+    latest = stored.drop_duplicates(keys, keep="last")
+    matched = delta[keys].merge(latest[keys].assign(_row=range(len(latest))), on=keys, how="left")["_row"].to_numpy()
+    is_new = pd.isna(matched)
+    same = np.zeros(len(delta), dtype=bool)
+    if (~is_new).any():
+        columns = list(stored.columns)
+        same[~is_new] = _row_hashes(delta[~is_new], columns) == _row_hashes(latest.iloc[matched[~is_new].astype(int)], columns)
+    return delta[is_new], delta[~is_new & ~same], delta[same]
+
+def change_report(dataset, new_rows, revised_rows, unchanged_rows, stored, warnings):
+    config = CONFIGS[dataset]
+    indicator_col = next(f["col"] for f in config["filters"] if f["label"] == config["indicator_label"])
+    changed = pd.concat([new_rows, revised_rows])
+    return {
+        "dataset": dataset, "rows_new": len(new_rows), "rows_revised": len(revised_rows), "rows_unchanged": len(unchanged_rows),
+        "new_years": sorted(set(changed[config["year_col"]].astype(str)) - set(stored[config["year_col"]].astype(str))),
+        "new_indicators": sorted(set(changed[indicator_col].dropna()) - set(stored[indicator_col].dropna())),
+        "affected_counties": sorted(changed[config["county_col"]].dropna().astype(str).unique()),
+        "affected_series": int(changed[[indicator_col, config["county_col"]]].drop_duplicates().shape[0]),
+        "warnings": warnings,
+    }
+
+def append_delta(dataset, delta_file, dry_run=False):
+    """Validates a delta file and appends its new and revised rows to the dataset's store; returns the change report."""
+    config = CONFIGS[dataset]
+    store = store_path(dataset)
+    if not store.exists() and not dry_run: seed_store(dataset)
+    stored = config["loader_func"](store if store.exists() else DATA_DIR / SOURCE_FILES[dataset])
+    delta = config["loader_func"](delta_file)
+    if stored is None or delta is None: raise SystemExit("Could not load the stored dataset or the delta file.")
+    errors, warnings = validate_delta(delta, stored, dataset)
+    if errors: return {"dataset": dataset, "errors": errors, "warnings": warnings}
+
+    new_rows, revised_rows, unchanged_rows = diff_delta(delta, stored, dataset)
+    report = change_report(dataset, new_rows, revised_rows, unchanged_rows, stored, warnings)
+    changed = pd.concat([new_rows, revised_rows], ignore_index=True)
+    if dry_run or changed.empty: return report
+
+    keys = KEY_COLUMNS[dataset]
+    revised_keys = revised_rows[keys].drop_duplicates()
+    kept = stored.merge(revised_keys, on=keys, how="left", indicator=True)["_merge"].to_numpy() == "left_only"
+    manifest = read_manifest(store)
+    delta_store = DELTA_DIR / f"{store.stem}-{len(manifest['appends']) + 1:04d}.parquet"
+    _write_parquet(changed, delta_store)
+    version_before = utils.dataset_version(store)
+    _write_parquet(pd.concat([stored[kept], changed], ignore_index=True), store)
+    report.update(delta_file=str(delta_file), delta=delta_store.name, version_before=version_before,
+                  version_after=utils.dataset_version(store), ingested=datetime.now().isoformat(timespec="seconds"))
+    manifest["appends"].append(report)
+    manifest_path(store).write_text(json.dumps(manifest, indent=2))
+    return report
+
+# ==============================================================================
+# --- Incremental Derived Tables ---
+# ==============================================================================
+def changes_between(file_path, old_version, new_version):
+    """Rows appended to a source file's store copy between two of its versions, or None if the manifest cannot bridge them."""
+    file_path = utils.current_path(file_path)
+    if not utils.is_store_file(file_path): return None
+    manifest = read_manifest(file_path)
+    loader = CONFIGS[manifest["dataset"]]["loader_func"] if manifest.get("dataset") else None
+    by_version = {entry["version_before"]: entry for entry in manifest["appends"]}
+    frames, version = [], old_version
+    while version != new_version:
+        entry = by_version.get(version)
+        if entry is None or loader is None: return None
+        frames.append(loader(DELTA_DIR / entry["delta"]))
+        version = entry["version_after"]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+def _derived_lock(key):
+    with _locks_lock:
+        return _derived_locks.setdefault(key, threading.Lock())
+
+def incremental(key, versions, build, update):
+    """build() for the current {file path: version}, or update(previous, {file path: delta rows}) when the last result
+    for this key is only some ingest appends behind. The last result per key is kept in this process only when one of
+    its files is a store copy, the only case a manifest can patch: after a restart the first call builds in full and
+    later appends are patched."""
+    with _derived_lock(key):
+        previous = _derived.get(key)
+        if previous and previous["versions"] == versions: return previous["result"]
+        deltas = None
+        if previous and previous["result"] is not None and previous["versions"].keys() == versions.keys():
+            deltas = {}
+            for path, version in versions.items():
+                if previous["versions"][path] == version: continue
+                deltas[path] = changes_between(path, previous["versions"][path], version)
+                if deltas[path] is None:
+                    deltas = None
+                    break
+        result = update(previous["result"], deltas) if deltas else build()
+        if any(utils.is_store_file(utils.current_path(path)) for path in versions):
+            _derived[key] = {"versions": versions, "result": result}
+        else:
+            _derived.pop(key, None)
+        return result
+
+def patch_groups(previous, df, delta, key_cols, compute):
+    """previous with every group (by key_cols) the delta touched recomputed by compute() from df's rows for those groups."""
+    touched = delta[key_cols].drop_duplicates()
+    stale = previous[key_cols].merge(touched, on=key_cols, how="left", indicator=True)["_merge"].to_numpy() == "both"
+    return pd.concat([previous[~stale], compute(df.merge(touched, on=key_cols))], ignore_index=True)
+
+# ==============================================================================
+# --- Command Line ---
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dataset", choices=sorted(SOURCE_FILES))
+    parser.add_argument("delta_file", type=Path, help="Rows in the same format as the published file (or a .parquet export).")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report without changing the store.")
+    args = parser.parse_args(argv)
+
+    report = append_delta(args.dataset, args.delta_file, args.dry_run)
+    print(json.dumps(report, indent=2))
+    return 1 if report.get("errors") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# modules/peers.py
+import pandas as pd
+import numpy as np
+import requests
+import time
+from modules import utils, geo, cube, perf, counties
+from modules.config import INDICATOR_SOURCES, GEOJSON_FILE_PATH
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+ACS_DATASET, ACS_YEAR = "acs/acs5", "2022"
+ACS_KEY = f"{ACS_DATASET}/{ACS_YEAR}"
+# After a failed Census request, ACS is treated as unavailable for this long before it is requested again. Results
+# built without ACS are cached under their own key, so the first successful request rebuilds them with it.
+ACS_RETRY_SECONDS = 300
+ACS_VARIABLES = {
+    "B01003_001E": "Total Population", "B19013_001E": "Median Household Income", "B17001_002E": "Population Below Poverty Level",
+    "B25003_001E": "Occupied Housing Units", "B25003_002E": "Owner-Occupied Housing Units",
+    "B15003_001E": "Population 25+", "B15003_022E": "Population with Bachelor's Degree", "B01002_001E": "Median Age"
+}
+HEALTH_SOURCE = "Prevention Agenda"
+# Indicators reported for fewer counties than this share are left out of the feature matrix.
+MIN_INDICATOR_COVERAGE = 0.9
+DEFAULT_PEER_COUNT = 6
+NO_PEER_ANCHOR = "(default counties)"
+
+_acs_state = {"failed_at": None}
+
+# ==============================================================================
+# --- Feature Matrix ---
+# ==============================================================================
+def acs_table():
+    """ACS_VARIABLES for every NY county from one request, indexed by 5-digit FIPS; empty while the Census API is
+    unreachable (retried after ACS_RETRY_SECONDS)."""
+    failed_at = _acs_state["failed_at"]
+    if failed_at is not None and time.monotonic() - failed_at < ACS_RETRY_SECONDS: return pd.DataFrame()
+    try:
+        df = utils.fetch_census_data(ACS_DATASET, ACS_YEAR, list(ACS_VARIABLES), "county:*", {"in": f"state:{utils.STATE_FIPS_MAP['New York']}"})
+    except requests.exceptions.RequestException:
+        _acs_state["failed_at"] = time.monotonic(); return pd.DataFrame()
+    _acs_state["failed_at"] = None
+    if df.empty: return pd.DataFrame()
+    df.index = "36" + df["county"].astype(str)
+    return df
+
+def acs_features():
+    """Socio-economic profile of every NY county, indexed by 5-digit FIPS; empty while ACS is unavailable."""
+    df = acs_table()
+    if df.empty: return pd.DataFrame()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.DataFrame({
+            "Log Population": np.log10(df["B01003_001E"].where(df["B01003_001E"] > 0)),
+            "Median Household Income": df["B19013_001E"].where(df["B19013_001E"] > 0),
+            "Poverty Rate": df["B17001_002E"] / df["B01003_001E"],
+            "Owner-Occupied Share": df["B25003_002E"] / df["B25003_001E"],
+            "Bachelor's Degree Share": df["B15003_022E"] / df["B15003_001E"],
+            "Median Age": df["B01002_001E"].where(df["B01002_001E"] > 0)
+        })
+
+def health_features():
+    """Latest value of each well-covered Prevention Agenda indicator, one column per indicator, indexed by FIPS."""
+    indicator_cube = cube.get_cube()
+    if indicator_cube is None: return pd.DataFrame()
+    indicators = cube.source_indicators(indicator_cube, HEALTH_SOURCE)
+    wide = pd.DataFrame(indicator_cube["latest_value"][:, indicators.index], index=indicator_cube["counties"]["fips"], columns=indicators["indicator"])
+    return wide.loc[:, wide.notna().mean() >= MIN_INDICATOR_COVERAGE]
+
+def standardize(features):
+    """Column z-scores with missing values at the column mean (0); constant columns are dropped."""
+    spread = features.std()
+    features = features.loc[:, spread > 0]
+    return ((features - features.mean()) / features.std()).fillna(0)
+
+# ==============================================================================
+# --- Peer Index ---
+# ==============================================================================
+@perf.cache_resource(show_spinner="Building peer-county index...")
+def _peer_index(health_version, acs_key, has_acs, _acs):
+    index = geo.get_county_index(GEOJSON_FILE_PATH)
+    if index is None: return None
+    fips = [entry["fips"] for entry in index["counties"]]
+    blocks = [standardize(block.reindex(fips)) for block in (_acs, health_features()) if not block.empty]
+    blocks = [block for block in blocks if block.shape[1]]
+    if not blocks: return None
+    # Each block is scaled so ACS and health features carry equal weight regardless of how many columns each has.
+    matrix = np.hstack([block.to_numpy() / np.sqrt(block.shape[1]) for block in blocks])
+    squared = (matrix ** 2).sum(axis=1)
+    distances = np.sqrt(np.maximum(squared[:, None] + squared[None, :] - 2 * matrix @ matrix.T, 0))
+    np.fill_diagonal(distances, 0)
+    return {
+        "fips": fips, "names": [entry["name"] for entry in index["counties"]],
+        # Matrix row by integer county FIPS; any name or code form is resolved through counties.fips() first.
+        "position": {int(f): i for i, f in enumerate(fips)},
+        "features": pd.concat(blocks, axis=1).set_axis([entry["name"] for entry in index["counties"]]),
+        "distances": distances, "order": np.argsort(distances, axis=1, kind="stable")
+    }
+
+def get_peer_index():
+    """Standardized county feature matrix with all pairwise distances and neighbour orderings precomputed."""
+    acs = acs_features()
+    return _peer_index(utils.dataset_version(INDICATOR_SOURCES[HEALTH_SOURCE]["file_path"]), ACS_KEY, not acs.empty, acs)
+
+def find_peers(peer_index, county, k=DEFAULT_PEER_COUNT):
+    """The k counties closest to `county` (any name or FIPS form) as (name, fips, distance) tuples, nearest first."""
+    row = peer_index["position"].get(counties.fips(county)) if peer_index is not None else None
+    if row is None: return []
+    return [(peer_index["names"][j], peer_index["fips"][j], float(peer_index["distances"][row, j]))
+            for j in peer_index["order"][row, 1:k + 1]]
+
+def peer_defaults(county, options, k=DEFAULT_PEER_COUNT):
+    """`county` and its peers expressed as entries of `options`, whatever naming convention the options use."""
+    key = counties.fips(county)
+    if key is None: return []
+    wanted = [key] + [int(fips) for _, fips, _ in find_peers(get_peer_index(), key, k)]
+    by_fips = {}
+    for option in options:
+        option_key = counties.fips(option)
+        if option_key is not None: by_fips.setdefault(option_key, option)
+    return [by_fips[fips] for fips in wanted if fips in by_fips]
+
+def county_choices():
+    index = geo.get_county_index(GEOJSON_FILE_PATH)
+    return sorted(entry["name"] for entry in index["counties"]) if index else []
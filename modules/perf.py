@@ -0,0 +1,216 @@
+# modules/perf.py
+import streamlit as st
+import pandas as pd
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+# Timing spans are recorded only when enabled, either for every session (NYS_PERF=1) or for one browser
+# session by adding ?perf=1 to the URL. Cache hit/miss counters are process-wide and always on (one locked
+# increment per call). Set NYS_PERF_LOG to a file path to also append every rerun's spans there as JSON lines.
+ENABLED_FOR_ALL = os.environ.get("NYS_PERF", "0") == "1"
+QUERY_PARAM = "perf"
+LOG_FILE = os.environ.get("NYS_PERF_LOG")
+MAX_SESSION_SPANS = 5000
+SPANS_KEY = "_perf_spans"
+RERUN_KEY = "_perf_rerun"
+FRAGMENTS_KEY = "_perf_fragments"
+RERUN_START_KEY = "_perf_rerun_start"
+ENABLED_KEY = "_perf_enabled"
+
+_cache_counts = {}
+_counts_lock = threading.Lock()
+_local = threading.local()
+_background_spans = deque(maxlen=MAX_SESSION_SPANS)  # Spans recorded outside a Streamlit session (CLI, benchmarks).
+
+# ==============================================================================
+# --- Spans ---
+# ==============================================================================
+def enabled():
+    """Whether spans are recorded for this session, as read by start_rerun() at the top of the page."""
+    if ENABLED_FOR_ALL: return True
+    if get_script_run_ctx(suppress_warning=True) is None: return False
+    if ENABLED_KEY not in st.session_state: st.session_state[ENABLED_KEY] = st.query_params.get(QUERY_PARAM) == "1"
+    return st.session_state[ENABLED_KEY]
+
+def _span_buffer():
+    if get_script_run_ctx(suppress_warning=True) is None: return _background_spans
+    if SPANS_KEY not in st.session_state:
+        st.session_state[SPANS_KEY] = deque(maxlen=MAX_SESSION_SPANS)
+    return st.session_state[SPANS_KEY]
+
+@contextmanager
+def span(name, **tags):
+    """Times the enclosed block into this session's span log; a no-op unless profiling is enabled."""
+    if not enabled():
+        yield
+        return
+    depth = getattr(_local, "depth", 0)
+    _local.depth = depth + 1
+    started, start = time.time(), time.perf_counter()
+    try:
+        yield
+    finally:
+        _local.depth = depth
+        record = {"ts": started, "rerun": st.session_state.get(RERUN_KEY, 0) if get_script_run_ctx(suppress_warning=True) else None,
+                  "span": name, "depth": depth, "ms": (time.perf_counter() - start) * 1000}
+        record.update(tags)
+        _span_buffer().append(record)
+
+def timed(name=None):
+    """Decorator form of span(), named after the function unless a name is given."""
+    def decorate(func):
+        span_name = name or func.__qualname__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# ==============================================================================
+# --- Cache Counters ---
+# ==============================================================================
+def _count(name, field):
+    with _counts_lock:
+        counts = _cache_counts.setdefault(name, {"calls": 0, "misses": 0})
+        counts[field] += 1
+
+def _counted(streamlit_decorator, func, kwargs):
+    """Wraps a Streamlit cache decorator: the outer call counts every lookup, the inner body only runs (and counts) on a miss."""
+    name = f"{func.__module__.removeprefix('modules.')}.{func.__qualname__}"
+    @functools.wraps(func)
+    def on_miss(*args, **kw):
+        _count(name, "misses")
+        return func(*args, **kw)
+    cached = streamlit_decorator(**kwargs)(on_miss)
+    @functools.wraps(func)
+    def lookup(*args, **kw):
+        _count(name, "calls")
+        with span(f"cache:{name}"):
+            return cached(*args, **kw)
+    lookup.clear = cached.clear
+    return lookup
+
+def cache_data(func=None, **kwargs):
+    """Drop-in for st.cache_data that also feeds the hit/miss counters and a span per lookup."""
+    if func is None: return lambda f: _counted(st.cache_data, f, kwargs)
+    return _counted(st.cache_data, func, kwargs)
+
+def cache_resource(func=None, **kwargs):
+    """Drop-in for st.cache_resource that also feeds the hit/miss counters and a span per lookup."""
+    if func is None: return lambda f: _counted(st.cache_resource, f, kwargs)
+    return _counted(st.cache_resource, func, kwargs)
+
+def cache_stats():
+    with _counts_lock:
+        rows = [{"Function": name, "Calls": c["calls"], "Hits": c["calls"] - c["misses"], "Misses": c["misses"]} for name, c in _cache_counts.items()]
+    df = pd.DataFrame(rows, columns=["Function", "Calls", "Hits", "Misses"])
+    df["Hit Rate"] = (df["Hits"] / df["Calls"].where(df["Calls"] > 0)).round(3)
+    return df.sort_values("Calls", ascending=False, ignore_index=True)
+
+# ==============================================================================
+# --- Fragments ---
+# ==============================================================================
+# A widget inside an st.fragment reruns only that fragment. Every page calls start_rerun() first so render_panel() can
+# time each full rerun; every fragment-only rerun is credited with the difference between the page's last full rerun
+# and its own run time. Nothing is recorded unless profiling is enabled.
+def _fragment_stats():
+    if FRAGMENTS_KEY not in st.session_state:
+        st.session_state[FRAGMENTS_KEY] = {"full_reruns": 0, "last_full_ms": None, "fragments": {}}
+    return st.session_state[FRAGMENTS_KEY]
+
+def start_rerun():
+    """Marks the start of a full rerun and reads the ?perf=1 switch once for it; call at the top of every page."""
+    st.session_state[ENABLED_KEY] = st.query_params.get(QUERY_PARAM) == "1"
+    if enabled(): st.session_state[RERUN_START_KEY] = time.perf_counter()
+
+def _end_rerun():
+    stats = _fragment_stats()
+    stats["full_reruns"] += 1
+    started = st.session_state.pop(RERUN_START_KEY, None)
+    if started is not None: stats["last_full_ms"] = (time.perf_counter() - started) * 1000
+
+def fragment(name, **kwargs):
+    """st.fragment (kwargs such as run_every pass through) that also counts its fragment-only reruns and the time they
+    saved over rerunning the whole page."""
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            ctx = get_script_run_ctx(suppress_warning=True)
+            alone = bool(ctx and ctx.fragment_ids_this_run)
+            start = time.perf_counter()
+            try:
+                with span(f"fragment:{name}"):
+                    return func(*args, **kwargs)
+            finally:
+                if alone and enabled():
+                    ms = (time.perf_counter() - start) * 1000
+                    stats = _fragment_stats()
+                    counts = stats["fragments"].setdefault(name, {"runs": 0, "ms": 0.0, "saved_ms": 0.0})
+                    counts["runs"] += 1
+                    counts["ms"] += ms
+                    if stats["last_full_ms"] is not None: counts["saved_ms"] += max(stats["last_full_ms"] - ms, 0.0)
+        return st.fragment(run, **kwargs)
+    return decorate
+
+def fragment_stats():
+    stats = _fragment_stats()
+    rows = [{"Fragment": name, "Reruns": c["runs"], "Avg ms": c["ms"] / c["runs"], "Saved ms": c["saved_ms"]}
+            for name, c in stats["fragments"].items()]
+    return stats["full_reruns"], stats["last_full_ms"], pd.DataFrame(rows, columns=["Fragment", "Reruns", "Avg ms", "Saved ms"])
+
+# ==============================================================================
+# --- Export & Panel ---
+# ==============================================================================
+def spans_jsonl(spans, fragments=None):
+    """Span records followed by one record per cached function (and per fragment, if given), one JSON object per line."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    session = ctx.session_id if ctx else None
+    lines = [json.dumps({"type": "span", "session": session, **record}) for record in spans]
+    lines += [json.dumps({"type": "cache", "ts": time.time(), **row}) for row in cache_stats().to_dict("records")]
+    if fragments is not None:
+        lines += [json.dumps({"type": "fragment", "ts": time.time(), **row}) for row in fragments.to_dict("records")]
+    return "\n".join(lines) + "\n"
+
+def _append_to_log(records):
+    ctx = get_script_run_ctx(suppress_warning=True)
+    with open(LOG_FILE, "a", encoding="utf-8") as log:
+        for record in records:
+            log.write(json.dumps({"type": "span", "session": ctx.session_id if ctx else None, **record}) + "\n")
+
+def render_panel():
+    """Sidebar panel with this rerun's spans, the cache counters and fragment reruns. Call last on a page; a no-op unless
+    profiling is enabled."""
+    if not enabled(): return
+    _end_rerun()
+    rerun = st.session_state.get(RERUN_KEY, 0)
+    spans = list(_span_buffer())
+    current = sorted((record for record in spans if record["rerun"] == rerun), key=lambda record: record["ts"])
+    if LOG_FILE and current: _append_to_log(current)
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        if current:
+            df = pd.DataFrame(current)
+            df["Span"] = [" " * depth + name for depth, name in zip(df["depth"], df["span"])]
+            st.caption(f"Rerun {rerun}: {df.loc[df['depth'] == 0, 'ms'].sum():.0f} ms in top-level spans")
+            st.dataframe(df[["Span", "ms"]].round(1), hide_index=True, use_container_width=True)
+        else:
+            st.caption(f"Rerun {rerun}: no spans recorded.")
+        st.dataframe(cache_stats(), hide_index=True, use_container_width=True)
+        full_reruns, last_full_ms, fragments = fragment_stats()
+        if not fragments.empty:
+            # Fragment-only reruns do not reach this panel; it shows them as of the last full rerun.
+            st.caption(f"{full_reruns} full reruns (last {last_full_ms or 0:.0f} ms), {fragments['Reruns'].sum()} fragment-only reruns, "
+                       f"~{fragments['Saved ms'].sum() / 1000:.1f} s saved")
+            st.dataframe(fragments.round(1), hide_index=True, use_container_width=True)
+        st.download_button("Download spans (JSONL)", data=lambda: spans_jsonl(spans, fragments), file_name="perf_spans.jsonl",
+                           mime="application/x-ndjson", key="perf_download")
+    st.session_state[RERUN_KEY] = rerun + 1
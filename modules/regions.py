@@ -0,0 +1,176 @@
+# modules/regions.py
+import json
+import streamlit as st
+import pandas as pd
+import numpy as np
+from modules import utils, counties, peers, perf, census_mirror
+from modules.config import CONFIGS, DATA_DIR
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+# Built-in groups; data/regions.json ({"Name": ["County", ...]}) adds team-wide ones and the Regions sidebar
+# panel adds per-session ones. A group's rows appear in the dashboards as the county "<Name> (Region)".
+DEFAULT_REGIONS = {"Mid-Hudson": ["Dutchess", "Orange", "Putnam", "Rockland", "Sullivan", "Ulster", "Westchester"]}
+REGIONS_FILE = DATA_DIR / "regions.json"
+SESSION_KEY = "custom_regions"
+REGION_SUFFIX = " (Region)"
+COUNT_COL, DENOMINATOR_COL = "Event Count/Rate", "Average Number of Denominator/Rate"
+POPULATION_VARIABLE = "B01003_001E"
+# Per-county columns that have no regional equivalent; left empty on region rows.
+COUNTY_ONLY_COLS = ["Lower Limit of 95% CI", "Upper Limit of 95% CI", "Quartile", "cilow", "cihigh", "countycode"]
+CHR_SPEC = {"county_col": "county", "value_col": "rawvalue", "keys": ["measurename", "yearspan", "year"], "notes_col": None}
+
+# ==============================================================================
+# --- Definitions ---
+# ==============================================================================
+def region_label(name):
+    return f"{name}{REGION_SUFFIX}"
+
+def is_region(area):
+    return str(area).endswith(REGION_SUFFIX)
+
+def _file_regions():
+    try:
+        return json.loads(REGIONS_FILE.read_text()) if REGIONS_FILE.exists() else {}
+    except (OSError, ValueError) as e:
+        st.error(f"Could not read {REGIONS_FILE.name}: {e}"); return {}
+
+def definitions():
+    """((label, (member FIPS, ...)), ...) for every built-in, file and session region; hashable, for cache keys."""
+    groups = DEFAULT_REGIONS | _file_regions() | st.session_state.get(SESSION_KEY, {})
+    resolved = []
+    for name, members in groups.items():
+        fips = sorted({key for key in map(counties.fips, members) if key is not None})
+        if fips: resolved.append((region_label(name), tuple(fips)))
+    return tuple(sorted(resolved))
+
+def add_session_region(name, members):
+    """Stores a region for this session; returns an error message, or None when it was added."""
+    name = name.strip()
+    if not name: return "Give the region a name."
+    if len(members) < 2: return "Pick at least two counties."
+    if name in DEFAULT_REGIONS or name in _file_regions(): return f"'{name}' is already a shared region."
+    st.session_state.setdefault(SESSION_KEY, {})[name] = list(members)
+    return None
+
+def remove_session_region(name):
+    st.session_state.get(SESSION_KEY, {}).pop(name, None)
+
+# ==============================================================================
+# --- Aggregation ---
+# ==============================================================================
+def dataset_spec(title, df):
+    """Columns the rollup needs for one dataset: county, value, the columns identifying a published value (the
+    dashboard's other filters), optional event count and denominator, and the notes column."""
+    if title not in CONFIGS: return CHR_SPEC
+    config = CONFIGS[title]
+    keys = [f["col"] for f in config["filters"] if f["col"] != config["county_col"]]
+    has_counts = COUNT_COL in df.columns and DENOMINATOR_COL in df.columns
+    return {"county_col": config["county_col"], "value_col": config["value_col"], "keys": keys, "notes_col": config["notes_col"],
+            "count_col": COUNT_COL if has_counts else None, "denominator_col": DENOMINATOR_COL if has_counts else None}
+
+def aggregate(df, spec, region_defs, population=None):
+    """Rows for every region, indicator and year in one grouped pass.
+
+    Where every reporting member county has a denominator, the region value is the denominator-weighted mean of the
+    county values (the pooled events / denominator rate); otherwise it is population-weighted when ACS populations are
+    available for every reporting county, and a plain mean if not. Indicator-level columns (objectives, sources) take the
+    members' first value; confidence limits and other county-only columns are left empty."""
+    if not region_defs or df.empty: return df.iloc[0:0]
+    fips = df[counties.KEY].to_numpy(dtype=float, na_value=np.nan)
+    positions, labels, sizes = [], [], []
+    for label, members in region_defs:
+        rows = np.flatnonzero(np.isin(fips, members))
+        positions.append(rows); labels.append(np.full(len(rows), label, dtype=object)); sizes.append((label, len(members)))
+    members = df.iloc[np.concatenate(positions)].reset_index(drop=True)
+    members["_region"] = np.concatenate(labels)
+
+    value = pd.to_numeric(members[spec["value_col"]], errors="coerce")
+    reported = value.notna()
+    denominator = pd.to_numeric(members[spec["denominator_col"]], errors="coerce") if spec.get("denominator_col") else pd.Series(np.nan, index=members.index)
+    events = pd.to_numeric(members[spec["count_col"]], errors="coerce") if spec.get("count_col") else pd.Series(np.nan, index=members.index)
+    pop = members[counties.KEY].map(population).astype(float) if population is not None else pd.Series(np.nan, index=members.index)
+    has_denominator, has_pop = reported & (denominator > 0), reported & (pop > 0)
+    members = members.assign(
+        _reported=reported, _value=value.where(reported), _has_denominator=has_denominator, _has_pop=has_pop,
+        _weighted_denominator=(value * denominator).where(has_denominator, 0), _denominator=denominator.where(has_denominator, 0),
+        _weighted_pop=(value * pop).where(has_pop, 0), _pop=pop.where(has_pop, 0), _events=events.where(has_denominator, 0))
+
+    keys = ["_region"] + spec["keys"]
+    grouped = members.groupby(keys, sort=False, dropna=False)
+    sums = grouped[["_reported", "_has_denominator", "_has_pop", "_weighted_denominator", "_denominator", "_weighted_pop", "_pop", "_events"]].sum()
+    firsts = grouped[[col for col in df.columns if col not in keys]].first()
+    mean = grouped["_value"].mean()
+
+    by_denominator = (sums["_has_denominator"] == sums["_reported"]) & (sums["_denominator"] > 0)
+    by_pop = ~by_denominator & (sums["_has_pop"] == sums["_reported"]) & (sums["_pop"] > 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolled = np.where(by_denominator, sums["_weighted_denominator"] / sums["_denominator"],
+                          np.where(by_pop, sums["_weighted_pop"] / sums["_pop"], mean))
+    method = np.where(by_denominator, "denominator-weighted", np.where(by_pop, "population-weighted", "unweighted mean"))
+
+    result = firsts.reset_index()
+    result[spec["county_col"]] = result["_region"]
+    result[spec["value_col"]] = np.round(rolled, 2)
+    result[counties.KEY] = pd.Series(pd.NA, index=result.index, dtype="Int64")
+    for col in COUNTY_ONLY_COLS:
+        if col in result.columns: result[col] = np.nan
+    if spec.get("count_col"):
+        result[spec["count_col"]] = np.where(by_denominator, sums["_events"], np.nan)
+        result[spec["denominator_col"]] = np.where(by_denominator, sums["_denominator"], np.nan)
+    if spec["notes_col"]:
+        reporting = pd.Series(sums["_reported"].astype(int).to_numpy(), index=result.index).astype(str)
+        size = result["_region"].map(dict(sizes)).astype(str)
+        result[spec["notes_col"]] = "Region: " + reporting + " of " + size + " counties reporting, " + pd.Series(method, index=result.index)
+    result = result[result[spec["value_col"]].notna()]
+    return result.drop(columns="_region").reindex(columns=df.columns)
+
+@perf.cache_data(show_spinner=False)
+def _mirrored_populations(mirror_version):
+    mirrored, _ = census_mirror.lookup(peers.ACS_DATASET, peers.ACS_YEAR, [POPULATION_VARIABLE], "county:*",
+                                       {"in": f"state:{counties.STATE_FIPS}"})
+    if mirrored is None: return None
+    keys = counties.STATE_FIPS * 1000 + mirrored["county"].astype(int)
+    return dict(zip(keys, pd.to_numeric(mirrored[POPULATION_VARIABLE], errors="coerce")))
+
+def county_populations():
+    """{county FIPS: ACS total population} from the local ACS mirror, or from the Census API when the mirror lacks
+    them; None while neither can answer."""
+    mirrored = _mirrored_populations(census_mirror.version(peers.ACS_DATASET, peers.ACS_YEAR))
+    if mirrored is not None: return mirrored
+    acs = peers.acs_table()
+    if acs.empty: return None
+    return dict(zip(acs.index.astype(int), pd.to_numeric(acs[POPULATION_VARIABLE], errors="coerce")))
+
+def needs_population(df, spec, region_defs):
+    """Whether any region value would be population-weighted: some reported member row has no usable denominator."""
+    members = df[counties.KEY].isin([key for _, keys in region_defs for key in keys]).to_numpy()
+    reported = pd.to_numeric(df[spec["value_col"]], errors="coerce").notna().to_numpy()
+    if not spec.get("denominator_col"): return bool((members & reported).any())
+    denominator = pd.to_numeric(df[spec["denominator_col"]], errors="coerce")
+    return bool((members & reported & ~(denominator > 0).to_numpy()).any())
+
+@perf.cache_data(show_spinner=False)
+def _needs_population(title, version, region_defs, _df):
+    return needs_population(_df, dataset_spec(title, _df), region_defs)
+
+@perf.cache_data(show_spinner="Computing regional rollups...", max_entries=16)
+def _rollup(title, version, region_defs, has_population, _df, _population):
+    # Keyed on whether populations were available, so rollups computed without them are redone once ACS answers.
+    spec = dataset_spec(title, _df)
+    with perf.span("regions.aggregate", dataset=title, regions=len(region_defs)):
+        rollup = aggregate(_df, spec, region_defs, _population)
+    for col in (spec.get("count_col"), spec.get("denominator_col")):
+        if col and pd.api.types.is_string_dtype(_df[col]): rollup[col] = rollup[col].map(lambda v: v if pd.isna(v) else f"{v:g}")
+    return rollup
+
+def with_regions(title, df, file_path):
+    """df (a loaded CONFIGS dataset, or the CHR trend data) with one synthetic "<Name> (Region)" county per region.
+    Only the region rows are cached, per dataset version, set of region definitions and ACS availability; each call
+    concatenates its own copy. Populations are looked up only when a region value needs them."""
+    if df is None or df.empty or counties.KEY not in df.columns: return df
+    version, region_defs = utils.dataset_version(file_path), definitions()
+    population = county_populations() if _needs_population(title, version, region_defs, df) else None
+    rollup = _rollup(title, version, region_defs, population is not None, df, population)
+    return pd.concat([df, rollup], ignore_index=True)
@@ -0,0 +1,259 @@
+# modules/reports.py
+import requests
+import markdown
+import html
+import json
+import gzip
+import base64
+import hashlib
+import sys
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+import pandas as pd
+from modules import utils, analysis_store, perf
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+# The minified Vega runtime, committed so every exported report works fully offline. After changing a version below,
+# run `python -m modules.reports --vendor-runtime` on a networked machine and commit the new files.
+VENDOR_DIR = Path(__file__).parent.parent / "vendor"
+# Pinned to the vendored builds. They must share the major versions the installed Altair targets
+# (alt.VEGA_VERSION, alt.VEGALITE_VERSION, alt.VEGAEMBED_VERSION); Vega-Lite compiles specs of a newer minor version.
+VEGA_RUNTIME = [("vega", "6.1.2"), ("vega-lite", "6.3.0"), ("vega-embed", "7.0.2")]
+VEGA_CDN_URL = "https://cdn.jsdelivr.net/npm/{name}@{version}/build/{name}.min.js"
+
+# Rendered sections are cached by content hash; numbering and chart ids are filled in at assembly time,
+# so removing or reordering sections never forces the remaining ones to re-render.
+SECTION_CACHE_MAX_ENTRIES = 4096
+SECTION_NUMBER = "%%SECTION_NUMBER%%"
+CHART_DIV_ID = "%%CHART_DIV_ID%%"
+ANALYSIS_SECTION_FIELDS = ("dashboard", "indicator", "filters", "data_source", "data_notes", "analysis_text", "chart_json", "chart_ref")
+
+ANALYSIS_REPORT_CSS = """body{font-family:sans-serif;} h1,h2{color:#2c3e50; border-bottom:2px solid #eee;}
+        code{background-color:#f4f4f4; padding:2px 5px; border-radius:4px;}
+        .chart-container{width: 100%; height: 350px;}"""
+CHIP_REPORT_CSS = """body{font-family:sans-serif;} h1,h2{color:#2c3e50;border-bottom:2px solid #eee;}
+        table{font-size:12px; width:100%; border-collapse:collapse;}
+        th,td{border:1px solid #ccc; padding:8px; vertical-align: top; text-align: left;}
+        .chart-container{width: 100%; height: 350px;}"""
+
+# Decompresses the shared data block once, then hands each chart only the datasets it references.
+_BUNDLE_LOADER_JS = """
+async function loadReportData() {
+    const packed = Uint8Array.from(atob(document.getElementById('report-data').textContent.trim()), c => c.charCodeAt(0));
+    const stream = new Blob([packed]).stream().pipeThrough(new DecompressionStream('gzip'));
+    return JSON.parse(await new Response(stream).text());
+}
+window.addEventListener('load', async function() {
+    const datasets = await loadReportData();
+    const charts = JSON.parse(document.getElementById('report-charts').textContent);
+    for (const chart of charts) {
+        const spec = chart.spec;
+        spec.datasets = Object.fromEntries(chart.datasets.map(name => [name, datasets[name]]));
+        spec.width = 'container';
+        spec.height = 300;
+        vegaEmbed('#' + chart.div_id, spec, {"actions": false});
+    }
+});
+"""
+
+# ==============================================================================
+# --- Vega Runtime ---
+# ==============================================================================
+def vendored_runtime_path(name, version):
+    return VENDOR_DIR / f"{name}@{version}.min.js"
+
+@lru_cache(maxsize=8)
+def _read_runtime_script(path_str, mtime):
+    # A literal "</script" inside the minified source would end the inline tag early.
+    return Path(path_str).read_text(encoding="utf-8").replace("</script", "<\\/script")
+
+def missing_runtime():
+    """Runtime files not vendored yet; reports cannot be exported until this is empty."""
+    return [path for path in (vendored_runtime_path(name, version) for name, version in VEGA_RUNTIME) if not path.exists()]
+
+def missing_runtime_message(missing):
+    return (f"The Vega runtime for offline reports is missing ({', '.join(path.name for path in missing)}). Run "
+            f"`python -m modules.reports --vendor-runtime` on a networked machine and commit the files in {VENDOR_DIR.name}/.")
+
+def vega_runtime_html(allow_cdn=False):
+    """Inline <script> tags for the vendored Vega runtime. A file that is not vendored raises FileNotFoundError, unless
+    allow_cdn links it from the CDN instead (benchmarks only; such a report needs a network to render)."""
+    missing = missing_runtime()
+    if missing and not allow_cdn: raise FileNotFoundError(missing_runtime_message(missing))
+    tags = []
+    for name, version in VEGA_RUNTIME:
+        path = vendored_runtime_path(name, version)
+        if path.exists():
+            tags.append(f"<script>{_read_runtime_script(str(path), path.stat().st_mtime)}</script>")
+        else:
+            tags.append(f'<script src="{VEGA_CDN_URL.format(name=name, version=version)}"></script>')
+    return "\n".join(tags)
+
+def vendor_vega_runtime():
+    """Downloads any missing runtime files into VENDOR_DIR and returns their paths."""
+    VENDOR_DIR.mkdir(exist_ok=True)
+    paths = []
+    for name, version in VEGA_RUNTIME:
+        path = vendored_runtime_path(name, version)
+        if not path.exists():
+            response = requests.get(VEGA_CDN_URL.format(name=name, version=version), timeout=60); response.raise_for_status()
+            path.write_bytes(response.content)
+        paths.append(path)
+    return paths
+
+# ==============================================================================
+# --- Chart Bundling ---
+# ==============================================================================
+def _dataset_key(values):
+    payload = json.dumps(values, sort_keys=True, separators=(",", ":"))
+    return "data-" + hashlib.sha1(payload.encode()).hexdigest()[:20]
+
+def _rewrite_data_refs(node, renames, datasets):
+    """Points every data reference at content-hash dataset names, moving inline values into datasets."""
+    if isinstance(node, dict):
+        data = node.get("data")
+        if isinstance(data, dict):
+            if "values" in data and isinstance(data["values"], list):
+                key = _dataset_key(data["values"])
+                datasets.setdefault(key, data.pop("values"))
+                data["name"] = key
+            if data.get("name") in renames:
+                data["name"] = renames[data["name"]]
+        for value in node.values():
+            _rewrite_data_refs(value, renames, datasets)
+    elif isinstance(node, list):
+        for item in node:
+            _rewrite_data_refs(item, renames, datasets)
+
+def split_chart(spec_json):
+    """Splits a Vega-Lite spec into a data-free spec and its datasets keyed by content hash."""
+    spec = json.loads(spec_json)
+    datasets, renames = {}, {}
+    for name, values in spec.pop("datasets", {}).items():
+        key = _dataset_key(values)
+        datasets[key] = values
+        renames[name] = key
+    _rewrite_data_refs(spec, renames, datasets)
+    return {"spec": spec, "datasets": datasets}
+
+def compress_datasets(datasets):
+    """gzip + base64 of the shared datasets, decoded in the browser with DecompressionStream."""
+    payload = json.dumps(datasets, separators=(",", ":")).encode()
+    return base64.b64encode(gzip.compress(payload, compresslevel=9)).decode("ascii")
+
+def _script_json(value):
+    return json.dumps(value, separators=(",", ":")).replace("</", "<\\/")
+
+def build_report_html(title, heading_html, sections, css, allow_cdn=False):
+    """Assembles a self-contained report from rendered sections: one shared, compressed data block
+    and the Vega runtime inlined once. Cheap enough to run only when the download is requested."""
+    sections_html, charts, datasets = [], [], {}
+    for number, section in enumerate(sections, 1):
+        chart_div_id = f"vis{number}"
+        sections_html.append(section["html"].replace(SECTION_NUMBER, str(number)).replace(CHART_DIV_ID, chart_div_id))
+        if section["chart"]:
+            datasets.update(section["chart"]["datasets"])
+            charts.append({"div_id": chart_div_id, "spec": section["chart"]["spec"], "datasets": sorted(section["chart"]["datasets"])})
+    chart_scripts = ""
+    if charts:
+        chart_scripts = f"""
+    <script type="application/json" id="report-charts">{_script_json(charts)}</script>
+    <script type="text/plain" id="report-data">{compress_datasets(datasets)}</script>
+    {vega_runtime_html(allow_cdn)}
+    <script type="text/javascript">{_BUNDLE_LOADER_JS}</script>"""
+    return f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <style>
+        {css}
+    </style>
+</head>
+<body>
+    {heading_html}
+    <p><em>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</em></p>
+    {''.join(sections_html)}
+    {chart_scripts}
+</body>
+</html>
+"""
+
+# ==============================================================================
+# --- Report Sections ---
+# ==============================================================================
+def content_hash(payload):
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def escape_multiline(text):
+    return html.escape(text).replace('\n', '<br>')
+
+@perf.cache_data(max_entries=SECTION_CACHE_MAX_ENTRIES, show_spinner=False)
+def _render_analysis_section(section_hash, _snap):
+    section_html = f"""
+    <h2>{SECTION_NUMBER}. {_snap['dashboard']}: {_snap['indicator']}</h2>
+    <p><strong>Filters:</strong> <code>{_snap['filters']}</code></p>
+    <div id="{CHART_DIV_ID}" class="chart-container"></div>
+    <p><strong>Source:</strong> {', '.join(_snap['data_source'])}</p>
+    <div><strong>Data Notes:</strong><ul>{''.join([f"<li>{note}</li>" for note in _snap['data_notes']])}</ul></div>
+    <div><h3>AI-Generated Insights</h3>{markdown.markdown(_snap['analysis_text'])}</div>
+    <hr>
+    """
+    return {"html": section_html, "chart": split_chart(analysis_store.load_chart_json(_snap))}
+
+def render_analysis_section(snap):
+    """Rendered HTML and split chart for one saved dashboard analysis, cached by a hash of its contents."""
+    payload = {field: snap.get(field) for field in ANALYSIS_SECTION_FIELDS}
+    return _render_analysis_section(content_hash(payload), payload)
+
+@perf.cache_data(max_entries=SECTION_CACHE_MAX_ENTRIES, show_spinner=False)
+def _render_chip_section(section_hash, _plan):
+    trend_df = pd.DataFrame(_plan.get('trend_data', []))
+    chart_json = None
+    if not trend_df.empty:
+        chart_json = utils.get_trend_chart_json(trend_df, f"Recent Trend for '{_plan['indicator']}' in {_plan['county']} County")
+    chart_script_part = f'<div id="{CHART_DIV_ID}" class="chart-container"></div>' if chart_json else ""
+
+    objectives_html = "".join([f"<li><strong>OBJECTIVE #{j + 1}:</strong> {html.escape(obj['text'])}</li>" for j, obj in
+                               enumerate(_plan.get('objectives', [])) if obj.get('text')])
+    strategy_rows_html = "".join([f"""<tr>
+        <td>{escape_multiline(strat.get('activity', ''))}</td>
+        <td>{escape_multiline(strat.get('partners', ''))}</td>
+        <td>{html.escape(strat.get('timeframe', ''))}</td>
+        <td>{html.escape(strat.get('evaluation', ''))}</td>
+        <td>{html.escape(strat.get('outcome', ''))}</td>
+    </tr>""" for strat in _plan.get('strategies', []) if any(strat.values())])
+
+    section_html = f"""
+    <div style="page-break-after: always;">
+        <h2>SECTION {SECTION_NUMBER}: {html.escape(_plan.get('priority_area', ''))}</h2>
+        <h3>Focus Area: {html.escape(_plan.get('focus_area', ''))}</h3>
+        <h4>Overarching Goal: {html.escape(_plan.get('overarching_goal', ''))}</h4>
+        <ul>{objectives_html}</ul>
+        <p><strong>Context - Official 2024 Objective:</strong> {html.escape(_plan.get('official_objective', ''))}</p>
+        <p><strong>Context - {html.escape(_plan.get('county', ''))} County's Most Recent Data:</strong> {html.escape(_plan.get('latest_data', ''))}</p>
+        <p><strong>Disparities Addressed:</strong> {html.escape(_plan.get('disparities', ''))}</p>
+        <hr>
+        {chart_script_part}
+        <h3>STRATEGIES</h3>
+        <table border="1">
+            <thead><tr><th>Strategy Activities</th><th>Partners</th><th>Timeframe</th><th>Evaluation</th><th>Outcome</th></tr></thead>
+            <tbody>{strategy_rows_html}</tbody>
+        </table>
+    </div>"""
+    return {"html": section_html, "chart": split_chart(chart_json) if chart_json else None}
+
+def render_chip_section(plan):
+    """Rendered HTML and split trend chart for one CHIP plan section, cached by a hash of its contents."""
+    return _render_chip_section(content_hash(plan), plan)
+
+if __name__ == "__main__":
+    if "--vendor-runtime" in sys.argv[1:]:
+        for path in vendor_vega_runtime():
+            print(f"Vendored {path}")
+    else:
+        print("Usage: python -m modules.reports --vendor-runtime")
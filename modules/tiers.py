@@ -0,0 +1,68 @@
+# modules/tiers.py
+"""Tiered Prevention Agenda data.
+
+Latest-value views (county lists, Hanlon scores, the CHIP data context, the County Snapshot) read the state's
+most-recent-year extract, a small fraction of the trend file. The full trend history is read only when a trend chart
+asks for it, in a background thread, so the page stays interactive while it loads."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from modules import utils
+from modules.config import CONFIGS, PA_LATEST_FILE_PATH
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+HISTORY_POLL_SECONDS = 1
+HISTORY_ERROR_KEY = "_pa_history_error"
+
+# One worker: concurrent requests for the history share a single read.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pa-history")
+_history_loads = {}
+_history_lock = threading.Lock()
+
+# ==============================================================================
+# --- Latest Tier ---
+# ==============================================================================
+def history_file_path():
+    return CONFIGS["Prevention Agenda Trends"]["file_path"]
+
+def latest_file_path():
+    """The most-recent-year extract, or the trend file when the extract is missing or ingest appends (modules/ingest.py)
+    have made the trend file newer than it."""
+    if PA_LATEST_FILE_PATH.exists() and not utils.is_store_file(utils.current_path(history_file_path())): return PA_LATEST_FILE_PATH
+    return history_file_path()
+
+def load_latest():
+    """Latest value of every Prevention Agenda indicator per county, in the trend file's columns."""
+    return utils.load_prevention_data(latest_file_path())
+
+# ==============================================================================
+# --- History Tier ---
+# ==============================================================================
+def _history_load():
+    """(file key, future) for the background read of the current trend file, started on first request. The thread
+    reads the file directly; Streamlit calls, such as the cached loader's error message, only work in a script run."""
+    path = history_file_path()
+    key = (str(path), utils.dataset_version(path))
+    with _history_lock:
+        if key not in _history_loads:
+            _history_loads.clear()
+            _history_loads[key] = _executor.submit(utils.read_prevention_data, path)
+        return key, _history_loads[key]
+
+def history_ready():
+    """True once the full trend file is loaded (or has failed to); the first call starts loading it in the background."""
+    return _history_load()[1].done()
+
+def load_history():
+    """The full Prevention Agenda trend frame, waiting for the background load if it is still running. The frame is
+    shared by every session, so callers filter it rather than modify it. None when the file could not be read; the
+    error is shown once per session and file version."""
+    key, load = _history_load()
+    error = load.exception()
+    if error is None: return load.result()
+    if st.session_state.get(HISTORY_ERROR_KEY) != key:
+        st.session_state[HISTORY_ERROR_KEY] = key
+        st.error(f"Could not load the Prevention Agenda trend history ({error}); trend charts are unavailable.")
+    return None
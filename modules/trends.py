@@ -0,0 +1,131 @@
+# modules/trends.py
+import pandas as pd
+import numpy as np
+from modules import utils, ingest, perf, counties
+from modules.config import CONFIGS
+
+# ==============================================================================
+# --- Constants ---
+# ==============================================================================
+# Two-sided 95% critical values of Student's t for 1..30 degrees of freedom; larger samples use the normal value.
+T_CRITICAL_95 = np.array([12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228, 2.201, 2.179, 2.160, 2.145, 2.131,
+                          2.120, 2.110, 2.101, 2.093, 2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042])
+Z_CRITICAL_95 = 1.96
+MIN_POINTS = 3
+MOVER_COLUMNS = ["Points", "First Year", "Last Year", "First Value", "Last Value", "Change per Year", "CI Low", "CI High", "Annual % Change", "% Change", "Significant", "Method"]
+
+# ==============================================================================
+# --- Grouped Least Squares ---
+# ==============================================================================
+def _group_sum(codes, values, n_groups):
+    return np.bincount(codes, weights=values, minlength=n_groups)
+
+def fit_trends(df, series_cols, year_col, value_col, ci_cols=None):
+    """Linear trend for every series in df at once: slope with its 95% confidence interval, percent change and a
+    significance flag (the interval excludes zero; series need MIN_POINTS points).
+
+    Each series is a unique combination of series_cols. All sums are grouped with np.bincount, so the cost is a
+    handful of array passes regardless of the number of series. Where ci_cols (low, high) are given and every
+    point of a series has a valid interval, points are weighted by inverse variance (SE = CI width / 3.92)."""
+    data = df[series_cols].copy()
+    data["_x"] = utils.end_year(df[year_col]).astype(float)
+    data["_y"] = pd.to_numeric(df[value_col], errors="coerce")
+    if ci_cols:
+        low, high = (pd.to_numeric(df[col], errors="coerce") for col in ci_cols)
+        data["_se"] = (high - low) / (2 * Z_CRITICAL_95)
+    data = data.dropna(subset=series_cols + ["_x", "_y"])
+    if data.empty: return pd.DataFrame(columns=series_cols + MOVER_COLUMNS)
+
+    grouped = data.groupby(series_cols, sort=False)
+    codes, n_groups = grouped.ngroup().to_numpy(), grouped.ngroups
+    x, y = data["_x"].to_numpy(), data["_y"].to_numpy()
+    n = np.bincount(codes, minlength=n_groups)
+
+    weights = np.ones_like(y)
+    weighted = np.zeros(n_groups, dtype=bool)
+    if ci_cols:
+        se = data["_se"].to_numpy()
+        valid = np.isfinite(se) & (se > 0)
+        weighted = _group_sum(codes, valid, n_groups) == n
+        weights = np.where(weighted[codes] & valid, 1 / np.where(valid, se, 1) ** 2, 1.0)
+
+    # Centered weighted sums for numerical stability with calendar-year x values.
+    w_total = _group_sum(codes, weights, n_groups)
+    x_mean = _group_sum(codes, weights * x, n_groups) / w_total
+    y_mean = _group_sum(codes, weights * y, n_groups) / w_total
+    dx, dy = x - x_mean[codes], y - y_mean[codes]
+    sxx = _group_sum(codes, weights * dx * dx, n_groups)
+    sxy = _group_sum(codes, weights * dx * dy, n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        residual = dy - slope[codes] * dx
+        dof = n - 2
+        scale = _group_sum(codes, weights * residual * residual, n_groups) / dof
+        # With inverse-variance weights the residual scale should be ~1; only inflate it for overdispersion.
+        scale = np.where(weighted, np.maximum(scale, 1.0), scale)
+        slope_se = np.sqrt(scale / sxx)
+        t_stat = np.abs(slope / slope_se)
+
+    t_critical = np.where(dof > len(T_CRITICAL_95), Z_CRITICAL_95, T_CRITICAL_95[np.clip(dof, 1, len(T_CRITICAL_95)) - 1])
+    significant = (n >= MIN_POINTS) & (slope_se > 0) & (t_stat > t_critical)
+    significant |= (n >= MIN_POINTS) & (slope_se == 0) & (slope != 0)
+    half_width = np.where(dof >= 1, t_critical * slope_se, np.nan)
+
+    # First and last observation of each series from one lexicographic sort.
+    order = np.lexsort((x, codes))
+    boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+    first, last = order[np.r_[0, boundaries]], order[np.r_[boundaries - 1, len(order) - 1]]
+    group_ids = codes[first]
+
+    result = data[series_cols].iloc[first].reset_index(drop=True)
+    slope, y_mean, n, half_width = slope[group_ids], y_mean[group_ids], n[group_ids], half_width[group_ids]
+    first_value, last_value = y[first], y[last]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result["Points"] = n
+        result["First Year"] = x[first].astype(int)
+        result["Last Year"] = x[last].astype(int)
+        result["First Value"] = first_value
+        result["Last Value"] = last_value
+        result["Change per Year"] = slope
+        result["CI Low"] = slope - half_width
+        result["CI High"] = slope + half_width
+        result["Annual % Change"] = np.where(y_mean != 0, 100 * slope / np.abs(y_mean), np.nan)
+        result["% Change"] = np.where(first_value != 0, 100 * (last_value - first_value) / np.abs(first_value), np.nan)
+    result["Significant"] = significant[group_ids]
+    result["Method"] = np.where(weighted[group_ids], "WLS (CI)", "OLS")
+    return result[n >= 2].round({"Change per Year": 4, "CI Low": 4, "CI High": 4, "Annual % Change": 2, "% Change": 2}).reset_index(drop=True)
+
+# ==============================================================================
+# --- Cached Trend Tables ---
+# ==============================================================================
+def series_columns(config):
+    """Every filter column except the year identifies one time series in a CONFIGS dashboard."""
+    return [f["col"] for f in config["filters"] if f["col"] != config["year_col"]]
+
+@perf.cache_data(show_spinner="Fitting trends...")
+def _config_trends(title, version):
+    config = CONFIGS[title]
+    df = config["loader_func"](config["file_path"])
+    if df is None: return None
+    series_cols, path = series_columns(config), str(config["file_path"])
+    fit = lambda frame: fit_trends(frame, series_cols, config["year_col"], config["value_col"], config.get("ci_cols"))
+    # After an ingest append, only the series with appended rows are refitted.
+    return ingest.incremental(("trends", title), {path: version}, lambda: fit(df),
+                              lambda previous, deltas: ingest.patch_groups(previous, df, deltas[path], series_cols, fit))
+
+def get_config_trends(config):
+    """Trend statistics for every county and indicator of a CONFIGS dashboard, per dataset version."""
+    return _config_trends(config["title"], utils.dataset_version(config["file_path"]))
+
+@perf.cache_data(show_spinner="Fitting trends...")
+def _chr_trends(file_path, version):
+    df = utils.load_chr_trend_data(file_path)
+    if df is None or df.empty: return None
+    # Series are keyed on the county FIPS; the county column keeps CHR's name for display.
+    fit = fit_trends(df, [counties.KEY, "measurename"], "year", "rawvalue", ci_cols=("cilow", "cihigh"))
+    fit.insert(0, "county", fit[counties.KEY].map(df.groupby(counties.KEY)["county"].first()))
+    return fit
+
+def get_chr_trends(file_path):
+    """Trend statistics for every CHR county and measure, weighted by the published confidence intervals, per dataset version."""
+    return _chr_trends(file_path, utils.dataset_version(file_path))
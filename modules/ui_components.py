@@ -1,44 +1,79 @@
 # modules/ui_components.py
 import streamlit as st
-from modules import utils
+import json
+from modules import utils, analysis_store, trends, peers, catalog, regions, counties, tiers, perf
+from modules.data_viewer import render_data_viewer
+
+
+def peer_anchor_selector(key):
+    """Sidebar choice of a county whose most similar peers replace the hard-coded default county selection."""
+    anchor = st.sidebar.selectbox("Compare with peers of", [peers.NO_PEER_ANCHOR] + peers.county_choices(), key=key,
+                                  help="Peers are the counties most similar in ACS demographics and latest Prevention Agenda indicators.")
+    return None if anchor == peers.NO_PEER_ANCHOR else anchor
+
+
+def region_editor():
+    """Sidebar list of the county groups shown as "<Name> (Region)", with a form adding groups for this session."""
+    with st.sidebar.expander("🗺️ Regions"):
+        custom = st.session_state.get(regions.SESSION_KEY, {})
+        for label, members in regions.definitions():
+            st.caption(f"**{label}**: {', '.join(counties.name(key) for key in members)}")
+        for name in list(custom):
+            st.button(f"Remove {name}", key=f"remove_region_{name}", on_click=regions.remove_session_region, args=(name,))
+        st.text_input("New region name", key="new_region_name")
+        st.multiselect("Member counties", sorted(counties.NAMES.values()), key="new_region_counties")
+        st.button("Add Region", key="add_region", on_click=_add_region)
+
+
+def _add_region():
+    error = regions.add_session_region(st.session_state.new_region_name, st.session_state.new_region_counties)
+    if error:
+        st.toast(error); return
+    st.session_state.new_region_name, st.session_state.new_region_counties = "", []
+
+
+def filter_options(df, config, filters, i):
+    """Options for the i-th filter, given the selections already made in the filters before it."""
+    temp_df = df
+    for prev_filter_config in config["filters"][:i]:
+        if isinstance(filters[prev_filter_config["label"]], list):
+            temp_df = temp_df[temp_df[prev_filter_config["col"]].isin(filters[prev_filter_config["label"]])]
+        else:
+            temp_df = temp_df[temp_df[prev_filter_config["col"]] == filters[prev_filter_config["label"]]]
+    f_config = config["filters"][i]
+    options = sorted(temp_df[f_config["col"]].dropna().unique(), reverse=(f_config["col"] == config["year_col"]))
+    # Regions are listed ahead of the counties.
+    return sorted(options, key=lambda o: not regions.is_region(o)) if f_config["col"] == config["county_col"] else options
 
 
 def render_dashboard(config, df):
+    df = regions.with_regions(config["title"], df, config["file_path"])
     st.sidebar.header("Data Filters")
+    peer_anchor = peer_anchor_selector(f"peers_{config['title']}")
     filters = {}
-    for i, f_config in enumerate(config["filters"]):
-        temp_df = df.copy()
-        for j in range(i):
-            prev_filter_config = config["filters"][j]
-            if isinstance(filters[prev_filter_config["label"]], list):
-                temp_df = temp_df[temp_df[prev_filter_config["col"]].isin(filters[prev_filter_config["label"]])]
-            else:
-                temp_df = temp_df[temp_df[prev_filter_config["col"]] == filters[prev_filter_config["label"]]]
-
-        options = sorted(temp_df[f_config["col"]].dropna().unique(), reverse=(f_config["col"] == config["year_col"]))
-
-        if f_config["type"] == "selectbox":
-            filters[f_config["label"]] = st.sidebar.selectbox(f"{i + 1}. {f_config['label']}", options)
-        elif f_config["type"] == "multiselect":
-            default_val = f_config.get("default", [])
-            if default_val == "all": default_val = options
-            default_selection = [d for d in default_val if d in options]
-            filters[f_config["label"]] = st.sidebar.multiselect(f"{i + 1}. {f_config['label']}", options,
-                                                                default=default_selection)
-
-    filtered_df = df.copy()
+    with perf.span("dashboard.filter_widgets"):
+        for i, f_config in enumerate(config["filters"]):
+            options = filter_options(df, config, filters, i)
+
+            if f_config["type"] == "selectbox":
+                filters[f_config["label"]] = st.sidebar.selectbox(f"{i + 1}. {f_config['label']}", options,
+                                                                  index=catalog.preset_index(options, f_config["label"]))
+            elif f_config["type"] == "multiselect":
+                default_val = f_config.get("default", [])
+                if default_val == "all": default_val = options
+                if peer_anchor and f_config["col"] == config["county_col"]: default_val = peers.peer_defaults(peer_anchor, options)
+                default_selection = [d for d in default_val if d in options]
+                filters[f_config["label"]] = st.sidebar.multiselect(f"{i + 1}. {f_config['label']}", options,
+                                                                    default=default_selection)
+
+    region_editor()
+
     for f_config in config["filters"]:
-        selected_val = filters[f_config["label"]]
-        if not selected_val:
+        if not filters[f_config["label"]]:
             st.warning(f"⬅️ Please select at least one {f_config['label']}.");
             return
-        if isinstance(selected_val, list):
-            filtered_df = filtered_df[filtered_df[f_config["col"]].isin(selected_val)]
-        else:
-            filtered_df = filtered_df[filtered_df[f_config["col"]] == selected_val]
-
-    if config.get("value_col"):
-        filtered_df = filtered_df.dropna(subset=[config["value_col"]])
+    with perf.span("dashboard.filter_data"):
+        filtered_df = utils.filter_data(df, config, filters)
 
     st.header(f"📈 Analysis for: {filters[config['indicator_label']]}")
 
@@ -46,51 +81,93 @@ def render_dashboard(config, df):
         st.info("No data available for the current filter combination.");
         return
 
-    final_chart = utils.create_chart(filtered_df, config)
-    st.altair_chart(final_chart, use_container_width=True)
+    chart_json = utils.get_chart_json(filtered_df, config)
+    st.vega_lite_chart(json.loads(chart_json), use_container_width=True)
 
     st.subheader("Data Context")
     sources = [s for s in filtered_df[config['source_col']].dropna().unique() if s]
     if sources: st.caption(f"Source: {', '.join(sources)}")
+    if perf.enabled():
+        payload = utils.chart_payload_sizes(filtered_df, chart_json)
+        st.caption(f"Chart spec: {payload['spec_bytes'] / 1024:.1f} KB (the filtered rows with every column would be "
+                   f"{payload['filtered_rows_bytes'] / 1024:.1f} KB as JSON)")
 
     notes = [n for n in filtered_df[config['notes_col']].dropna().unique() if n]
     if notes:
         st.markdown("**Data Comments/Notes:**")
         for note in notes: st.markdown(f"- {note}")
 
+    with st.expander("📊 Biggest Movers"):
+        _movers_panel(config, filters)
+
     st.divider()
+    _ai_panel(config, filters, filtered_df, notes, sources)
+
+    with st.expander("View Filtered Raw Data"):
+        render_data_viewer(filtered_df, key=f"raw_{config['title']}", file_name=f"{config['title']} - {filters[config['indicator_label']]}")
+
+
+# The movers and AI sections are fragments: their widgets rerun only the section, not the filter cascade and chart above.
+@perf.fragment("dashboard.movers")
+def _movers_panel(config, filters):
+    labels_by_col = {f["col"]: f["label"] for f in config["filters"]}
+    indicator_col = next(col for col, label in labels_by_col.items() if label == config["indicator_label"])
+    render_movers(trends.get_config_trends(config), config["county_col"], indicator_col,
+                  filters[config['indicator_label']], filters[labels_by_col[config["county_col"]]])
+
+
+@perf.fragment("dashboard.ai_panel")
+def _ai_panel(config, filters, filtered_df, notes, sources):
     st.subheader("🤖 AI-Powered Analysis")
 
     if st.button(f"Generate Insights for {filters[config['indicator_label']]}"):
         with st.spinner("Analyzing..."):
             ai_text = config["analyzer_func"](filtered_df, filters[config['indicator_label']])
-            st.session_state.current_ai_analysis = {
-                "dashboard": config["title"], "indicator": filters[config['indicator_label']],
-                "filters": {k: v for k, v in filters.items() if not (isinstance(v, list) and len(v) > 5)},
-                "analysis_text": ai_text, "data_notes": notes, "data_source": sources,
-                "raw_data": filtered_df.copy(), "config": config
-            }
-            st.rerun()
+            # Compact record: selections and dataset version instead of a copy of the data and config.
+            st.session_state.current_ai_analysis = analysis_store.make_saved_analysis(config, filters, ai_text, notes, sources)
 
     if st.session_state.current_ai_analysis and st.session_state.current_ai_analysis["indicator"] == filters[
         config['indicator_label']]:
         current = st.session_state.current_ai_analysis
         st.markdown(current["analysis_text"])
-        # In modules/ui_components.py, find and REPLACE this block inside render_dashboard
-
-        if st.button("💾 Save This Analysis", key="save_analysis"):
-            # --- NEW: Generate and save the chart's JSON "recipe" ---
-            chart_for_saving = utils.create_chart(current["raw_data"], current["config"])
-            chart_json = chart_for_saving.to_json()
 
-            # Add the JSON to the dictionary we're saving
-            current["chart_json"] = chart_json
-
-            if "saved_analyses" not in st.session_state: st.session_state.saved_analyses = []
-            st.session_state.saved_analyses.append(current)
-            st.session_state.current_ai_analysis = None
-            st.success(f"Saved analysis for '{current['indicator']}'")
-            st.rerun()
-
-    with st.expander("View Filtered Raw Data"):
-        st.dataframe(filtered_df)
\ No newline at end of file
+        # Saved in the click callback, so the fragment's rerun already renders without the pending analysis.
+        st.button("💾 Save This Analysis", key="save_analysis", on_click=_save_analysis, args=(config, filters, filtered_df))
+
+
+def _save_analysis(config, filters, filtered_df):
+    current = st.session_state.current_ai_analysis
+    # --- Save the chart's JSON "recipe" (served from the chart cache) ---
+    analysis_df = filtered_df if current["selections"] == filters else analysis_store.rehydrate_data(current)
+    analysis_store.attach_chart(current, utils.get_chart_json(analysis_df, config))
+
+    if "saved_analyses" not in st.session_state: st.session_state.saved_analyses = []
+    st.session_state.saved_analyses.append(current)
+    st.session_state.current_ai_analysis = None
+    st.toast(f"Saved analysis for '{current['indicator']}'")
+
+
+def render_movers(movers, county_col, indicator_col, indicator, counties=None):
+    """Sortable table of fitted trends, either for one indicator across all counties or for the selected counties across all indicators."""
+    if movers is None or movers.empty:
+        st.info("Not enough data points to fit trends."); return
+    # Options are fixed scope names shown with the current indicator, and the key names the option set, so a kept
+    # selection always means the same scope when the indicator or county selection changes.
+    scope_labels = {"indicator": f"{indicator}: all counties", "counties": "Selected counties: all indicators"}
+    scopes = ["indicator", "counties"] if counties else ["indicator"]
+    c1, c2 = st.columns([3, 1])
+    scope = c1.radio("Show", scopes, format_func=scope_labels.get, horizontal=True, key=f"movers_scope_{indicator_col}_{'_'.join(scopes)}")
+    only_significant = c2.checkbox("Significant only", key=f"movers_sig_{indicator_col}")
+    view = movers[movers[indicator_col] == indicator] if scope == "indicator" else movers[movers[county_col].isin(counties)]
+    if only_significant: view = view[view["Significant"]]
+    st.caption("Slopes are least-squares fits over each series' data years; 'Significant' marks slopes different from zero at the 95% level. "
+               "Whether an increase is good or bad depends on the measure.")
+    st.dataframe(view.sort_values("Annual % Change", key=lambda s: s.abs(), ascending=False), hide_index=True, use_container_width=True)
+
+
+# Polls while the Prevention Agenda trend history loads in the background (modules/tiers.py), then reruns the page
+# once so the trend chart renders; the page no longer calls it after that, which stops the polling.
+@perf.fragment("tiers.history_wait", run_every=tiers.HISTORY_POLL_SECONDS)
+def await_trend_history():
+    if tiers.history_ready(): st.rerun()
+    st.caption("⏳ Loading the full trend history in the background...")
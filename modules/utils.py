@@ -5,11 +5,19 @@ import altair as alt
 import requests
 import re
 import json
+import hashlib
+from pathlib import Path
+from modules import perf, census_mirror, counties
+from modules.counties import NY_COUNTY_FIPS_MAP
 
 # ==============================================================================
 # --- Constants ---
 # ==============================================================================
 CENSUS_API_BASE_URL = "https://api.census.gov/data"
+# Seconds to connect and to wait for each read; an unreachable API fails fast instead of hanging the page.
+CENSUS_TIMEOUT_SECONDS = 10
+# Folder next to the source files holding modules/ingest.py's columnar copies (config.STORE_DIR).
+STORE_DIR_NAME = "store"
 VALID_DATASETS = {
     "acs/acs5": {"name": "ACS 5-Year Estimates", "years": ["2022", "2021", "2020", "2019"]},
     "acs/acs1": {"name": "ACS 1-Year Estimates", "years": ["2022", "2021", "2019"]},
@@ -17,37 +25,45 @@ VALID_DATASETS = {
     "pep/population": {"name": "Population Estimates", "years": ["2022", "2021"]}
 }
 STATE_FIPS_MAP = { "New York": "36", "New Jersey": "34", "Connecticut": "09", "Pennsylvania": "42", "Massachusetts": "25", "Alabama": "01", "Alaska": "02", "Arizona": "04", "Arkansas": "05", "California": "06", "Colorado": "08", "Delaware": "10", "District of Columbia": "11", "Florida": "12", "Georgia": "13", "Hawaii": "15", "Idaho": "16", "Illinois": "17", "Indiana": "18", "Iowa": "19", "Kansas": "20", "Kentucky": "21", "Louisiana": "22", "Maine": "23", "Maryland": "24", "Michigan": "26", "Minnesota": "27", "Mississippi": "28", "Missouri": "29", "Montana": "30", "Nebraska": "31", "Nevada": "32", "New Hampshire": "33", "New Mexico": "35", "North Carolina": "37", "North Dakota": "38", "Ohio": "39", "Oklahoma": "40", "Oregon": "41", "Rhode Island": "44", "South Carolina": "45", "South Dakota": "46", "Tennessee": "47", "Texas": "48", "Utah": "49", "Vermont": "50", "Virginia": "51", "Washington": "53", "West Virginia": "54", "Wisconsin": "55", "Wyoming": "56" }
-NY_COUNTY_FIPS_MAP = { "Albany": "001", "Allegany": "003", "Bronx": "005", "Broome": "007", "Cattaraugus": "009", "Cayuga": "011", "Chautauqua": "013", "Chemung": "015", "Chenango": "017", "Clinton": "019", "Columbia": "021", "Cortland": "023", "Delaware": "025", "Dutchess": "027", "Erie": "029", "Essex": "031", "Franklin": "033", "Fulton": "035", "Genesee": "037", "Greene": "039", "Hamilton": "041", "Herkimer": "043", "Jefferson": "045", "Kings (Brooklyn)": "047", "Lewis": "049", "Livingston": "051", "Madison": "053", "Monroe": "055", "Montgomery": "057", "Nassau": "059", "New York (Manhattan)": "061", "Niagara": "063", "Oneida": "065", "Onondaga": "067", "Ontario": "069", "Orange": "071", "Orleans": "073", "Oswego": "075", "Otsego": "077", "Putnam": "079", "Queens": "081", "Rensselaer": "083", "Richmond (Staten Island)": "085", "Rockland": "087", "Saratoga": "091", "Schenectady": "093", "Schoharie": "095", "Schuyler": "097", "Seneca": "099", "St. Lawrence": "089", "Steuben": "101", "Suffolk": "103", "Sullivan": "105", "Tioga": "107", "Tompkins": "109", "Ulster": "111", "Warren": "113", "Washington": "115", "Wayne": "117", "Westchester": "119", "Wyoming": "121", "Yates": "123" }
 
 # ==============================================================================
 # --- Data Loading Functions ---
 # ==============================================================================
-@st.cache_data
-def load_chirs_data(file_path):
+@perf.cache_data
+@perf.timed("load_chirs_data")
+def _load_chirs_data(file_path, version):
     try:
-        df = pd.read_excel(file_path, engine='openpyxl')
+        df = pd.read_parquet(file_path) if is_store_file(file_path) else pd.read_excel(file_path, engine='openpyxl')
         for col in ['Geographic area', 'Year', 'Topic Area', 'Indicator Title', 'Data Source', 'Data Notes']:
             if col in df.columns: df[col] = df[col].astype(str).replace('nan', '')
-        return df
+        return counties.attach(df, 'Geographic area', "CHIRS", file_path=file_path)
     except Exception as e:
         st.error(f"Error loading CHIRS data: {e}"); return None
 
-@st.cache_data
-def load_prevention_data(file_path):
+def read_prevention_data(file_path):
+    """The Prevention Agenda file as load_prevention_data returns it, without Streamlit calls (safe in a background
+    thread); raises on failure."""
+    file_path = current_path(file_path)
+    df = pd.read_parquet(file_path) if is_store_file(file_path) else pd.read_csv(file_path, encoding='latin-1', dtype=str)
+    df.columns = df.columns.str.strip()
+    df['Percentage/Rate/Ratio'] = pd.to_numeric(df['Percentage/Rate/Ratio'], errors='coerce')
+    df['2024 Objective'] = pd.to_numeric(df['2024 Objective'], errors='coerce')
+    df['Data Years'] = df['Data Years'].astype(str)
+    return counties.attach(df, 'County Name', "Prevention Agenda", file_path=file_path)
+
+@perf.cache_data
+@perf.timed("load_prevention_data")
+def _load_prevention_data(file_path, version):
     try:
-        df = pd.read_csv(file_path, encoding='latin-1', dtype=str)
-        df.columns = df.columns.str.strip()
-        df['Percentage/Rate/Ratio'] = pd.to_numeric(df['Percentage/Rate/Ratio'], errors='coerce')
-        df['2024 Objective'] = pd.to_numeric(df['2024 Objective'], errors='coerce')
-        df['Data Years'] = df['Data Years'].astype(str)
-        return df
+        return read_prevention_data(file_path)
     except Exception as e:
         st.error(f"Error loading Prevention Agenda data: {e}"); return None
 
-@st.cache_data
-def load_mch_data(file_path):
+@perf.cache_data
+@perf.timed("load_mch_data")
+def _load_mch_data(file_path, version):
     try:
-        df = pd.read_excel(file_path, engine='openpyxl', header=0)
+        df = pd.read_parquet(file_path) if is_store_file(file_path) else pd.read_excel(file_path, engine='openpyxl', header=0)
         df.columns = df.columns.str.strip()
         if 'County Name' in df.columns:
             df['County Name'] = df['County Name'].str.strip()
@@ -56,12 +72,13 @@ def load_mch_data(file_path):
         df['Data Years'] = df['Data Years'].astype(str)
         for col in ['Data Comments', 'Date Source']:
              if col in df.columns: df[col] = df[col].astype(str).replace('nan', '')
-        return df
+        return counties.attach(df, 'County Name', "MCH", file_path=file_path)
     except Exception as e:
         st.error(f"Error loading MCH data: {e}"); return None
 
-@st.cache_data
-def load_chr_trend_data(file_path):
+@perf.cache_data
+@perf.timed("load_chr_trend_data")
+def _load_chr_trend_data(file_path, version):
     try:
         df = pd.read_csv(file_path, dtype=str)
         df_ny = df[df['statecode'] == '36'].copy()
@@ -73,13 +90,34 @@ def load_chr_trend_data(file_path):
         df_ny['rawvalue'] = pd.to_numeric(df_ny['rawvalue'], errors='coerce')
         df_ny['year'] = pd.to_numeric(df_ny['year'], errors='coerce')
         df_ny.dropna(subset=['county', 'year', 'rawvalue'], inplace=True)
-        return df_ny
+        # Counties are keyed on their FIPS codes; countycode 000 is the state total, which CHR also names "New York".
+        codes = df_ny['statecode'].str.zfill(2) + df_ny['countycode'].str.zfill(3)
+        df_ny = df_ny[codes.str.slice(2) != '000'].copy()
+        return counties.attach(df_ny, 'county', "County Health Rankings", codes=codes[df_ny.index], file_path=file_path)
     except FileNotFoundError:
         st.error(f"File not found: {file_path}. Please ensure it is in the 'data' folder."); return None
     except Exception as e:
         st.error(f"An error occurred while loading the CHR Trend data: {e}"); return None
 
-@st.cache_data
+# Loaded frames are cached per file version, and the ingest store's copy is looked up on every load, so a file
+# replaced, or first ingested or appended to by modules/ingest.py, is picked up on the next rerun.
+def load_chirs_data(file_path):
+    file_path = current_path(file_path)
+    return _load_chirs_data(file_path, dataset_version(file_path))
+
+def load_prevention_data(file_path):
+    file_path = current_path(file_path)
+    return _load_prevention_data(file_path, dataset_version(file_path))
+
+def load_mch_data(file_path):
+    file_path = current_path(file_path)
+    return _load_mch_data(file_path, dataset_version(file_path))
+
+def load_chr_trend_data(file_path):
+    return _load_chr_trend_data(file_path, dataset_version(file_path))
+
+@perf.cache_data
+@perf.timed()
 def load_ejscreen_data(file_path):
     try:
         columns_to_keep = ['ID', 'STATE_FIPS', 'P_LDPNT_D2', 'P_PM25_D2', 'P_OZONE_D2', 'P_CANCR_D2', 'P_RESP_D2', 'P_TRAFF_D2', 'P_PROXPN_D2', 'P_LOWINC_D2', 'P_LMINR_D2', 'P_LESHSP_D2', 'P_LNGISP_D2', 'P_UNDR5_D2', 'P_OVR64_D2', 'ACSTOTPOP']
@@ -88,9 +126,8 @@ def load_ejscreen_data(file_path):
         df_ny = df[df['STATE_FIPS'] == '36'].copy()
         if df_ny.empty:
             st.error("No data for New York (STATE_FIPS 36) found in the national EJScreen file."); return pd.DataFrame()
-        df_ny['County FIPS'] = df_ny['ID'].str.slice(0, 5)
-        fips_to_name = {f"36{fips}": name.split(' (')[0] for name, fips in NY_COUNTY_FIPS_MAP.items()}
-        df_ny['County Name'] = df_ny['County FIPS'].map(fips_to_name)
+        df_ny[counties.KEY] = counties.fips_series(df_ny['ID'].str.slice(0, 5))
+        df_ny['County Name'] = df_ny[counties.KEY].map(counties.NAMES)
         df_ny.rename(columns=column_rename_map, inplace=True)
         df_ny.dropna(subset=['County Name'], inplace=True)
         return df_ny
@@ -99,7 +136,8 @@ def load_ejscreen_data(file_path):
     except Exception as e:
         st.error(f"An error occurred while loading the EJScreen data: {e}"); return None
 
-@st.cache_data
+@perf.cache_data
+@perf.timed()
 def load_county_geojson(file_path):
     try:
         with open(file_path) as f:
@@ -112,30 +150,104 @@ def load_county_geojson(file_path):
 # ==============================================================================
 # --- Helper Functions ---
 # ==============================================================================
+def is_store_file(file_path):
+    """True for the columnar copies modules/ingest.py keeps of the source files."""
+    return Path(file_path).suffix == ".parquet"
+
+def current_path(file_path):
+    """The ingest store's copy of a source file (store/<file stem>.parquet next to it) once modules/ingest.py has
+    created one, otherwise the file itself."""
+    path = Path(file_path)
+    stored = path.parent / STORE_DIR_NAME / f"{path.stem}.parquet"
+    return stored if not is_store_file(path) and stored.exists() else path
+
+def parquet_ready(df):
+    """Copy of df with object columns stored as text (NaN kept); the published files mix numbers and text in them."""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+def dataset_version(file_path):
+    """Identifies the current contents of a data file (or of its ingest store copy) by its size and modification time."""
+    try:
+        stat = current_path(file_path).stat()
+    except OSError:
+        return None
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+def end_year(values):
+    """Numeric year from a year column; spans such as "2020-2022" map to their final year."""
+    if pd.api.types.is_numeric_dtype(values): return values
+    return pd.to_numeric(values.astype(str).str.extract(r"(\d{4})\D*$", expand=False), errors="coerce")
+
+def filter_data(df, config, filters):
+    """Applies a dashboard's filter selections ({label: value or list of values}) to df."""
+    for f_config in config["filters"]:
+        selected_val = filters.get(f_config["label"])
+        if isinstance(selected_val, list):
+            df = df[df[f_config["col"]].isin(selected_val)]
+        else:
+            df = df[df[f_config["col"]] == selected_val]
+    if config.get("value_col"):
+        df = df.dropna(subset=[config["value_col"]])
+    return df
+
 def clean_variable_label(label: str) -> str:
     if not isinstance(label, str): return "N/A"
     readable_label = label.replace("Estimate!!", "").replace("Total:!!", "").replace("!!", " | ")
     return re.sub(r'\s+', ' ', readable_label).strip()
 
-@st.cache_data
+@perf.cache_data
 def fetch_census_variables(dataset: str, year: str):
     url = f"{CENSUS_API_BASE_URL}/{year}/{dataset}/variables.json"
     try:
-        response = requests.get(url); response.raise_for_status()
+        response = requests.get(url, timeout=CENSUS_TIMEOUT_SECONDS); response.raise_for_status()
         data = response.json().get("variables", {})
         return { var: clean_variable_label(info.get("label", "")) for var, info in data.items() if "label" in info and not var.endswith(("A", "M", "MA", "EA")) and (var.endswith("E") or var.endswith("N")) }
     except requests.exceptions.RequestException:
+        # Offline: the variables held in the local ACS mirror, if any.
+        mirrored = {var: clean_variable_label(label) for var, label in census_mirror.read_labels(dataset, year).items() if var.endswith("E")}
+        if mirrored:
+            st.sidebar.info(f"Census API unavailable; showing the {len(mirrored)} variables in the local mirror."); return mirrored
         st.sidebar.warning(f"Could not automatically load variables for {dataset} {year}."); return {}
 
-@st.cache_data
 def fetch_census_data(dataset: str, year: str, variables: list, geo_for: str, geo_in: dict = None):
+    """Census API query results, answered from the local ACS mirror where it holds the variables; only the
+    variables it lacks are requested from the API and joined on the geography columns. When that request fails,
+    the mirrored variables are returned alone; with nothing mirrored, the RequestException propagates."""
     if not variables: return pd.DataFrame()
-    if "NAME" not in variables: variables.insert(0, "NAME")
+    variables = list(variables) if "NAME" in variables else ["NAME"] + list(variables)
+    try:
+        return _fetch_census_data(dataset, year, variables, geo_for, geo_in, census_mirror.version(dataset, year))
+    except requests.exceptions.RequestException:
+        mirrored, missing = census_mirror.lookup(dataset, year, variables, geo_for, geo_in)
+        if mirrored is None: raise
+        st.warning(f"Census API unavailable; showing only the variables in the local mirror ({', '.join(missing)} missing).")
+        return _mirrored_part(mirrored, variables)
+
+@perf.cache_data
+def _fetch_census_data(dataset, year, variables, geo_for, geo_in, mirror_version):
+    mirrored, missing = census_mirror.lookup(dataset, year, variables, geo_for, geo_in)
+    if not missing: return mirrored
+    df = _fetch_census_api(dataset, year, missing if mirrored is not None else variables, geo_for, geo_in)
+    if mirrored is None: return df
+    if df.empty: return _mirrored_part(mirrored, variables)
+    geo_cols = [col for col in mirrored.columns if col not in variables]
+    return mirrored.merge(df, on=geo_cols)[variables + geo_cols]
+
+def _mirrored_part(mirrored, variables):
+    """The mirror's rows in the full query's column layout, with the variables it lacks left empty."""
+    geo_cols = [col for col in mirrored.columns if col not in variables]
+    return mirrored.reindex(columns=variables + geo_cols)
+
+@perf.timed("census_api")
+def _fetch_census_api(dataset, year, variables, geo_for, geo_in):
     params = {"get": ",".join(variables), "for": geo_for}
     if geo_in: params.update(geo_in)
     url = f"{CENSUS_API_BASE_URL}/{year}/{dataset}"
     try:
-        response = requests.get(url, params=params); response.raise_for_status()
+        response = requests.get(url, params=params, timeout=CENSUS_TIMEOUT_SECONDS); response.raise_for_status()
         data = response.json()
         if len(data) < 2: return pd.DataFrame()
         df = pd.DataFrame(data[1:], columns=data[0])
@@ -148,11 +260,11 @@ def fetch_census_data(dataset: str, year: str, variables: list, geo_for: str, ge
         st.error("API Error: Received unexpected data format."); return pd.DataFrame()
 
 def get_census_snapshot(county_name):
-    county_fips = NY_COUNTY_FIPS_MAP.get(county_name)
-    if not county_fips:
+    county_fips = counties.fips(county_name)
+    if county_fips is None:
         return {"error": "County FIPS code not found."}
     variables = {"B01003_001E": "Total Population", "B19013_001E": "Median Household Income", "B17001_002E": "Population Below Poverty Level"}
-    df = fetch_census_data(dataset="acs/acs5", year="2022", variables=list(variables.keys()), geo_for=f"county:{county_fips}", geo_in={"in": "state:36"})
+    df = fetch_census_data(dataset="acs/acs5", year="2022", variables=list(variables.keys()), geo_for=f"county:{counties.county_code(county_fips)}", geo_in={"in": "state:36"})
     if df.empty or len(df) == 0:
         return {"Total Population": "N/A", "Median Household Income": "N/A", "Population Below Poverty Level": "N/A"}
     results = {}
@@ -164,39 +276,6 @@ def get_census_snapshot(county_name):
             results[name] = "N/A"
     return results
 
-def get_snapshot_data(chirs_df, pa_df, mch_df, county_name):
-    results = {}
-    def fetch_metric(df, county, county_col, indicator_full_name, indicator_col, year_col, value_col):
-        filtered_df = df[(df[county_col] == county) & (df[indicator_col] == indicator_full_name)].copy()
-        if filtered_df.empty: return "N/A", ""
-        filtered_df[year_col] = pd.to_numeric(filtered_df[year_col], errors='coerce')
-        filtered_df.dropna(subset=[year_col, value_col], inplace=True)
-        if filtered_df.empty: return "N/A", ""
-        latest = filtered_df.sort_values(by=year_col, ascending=False).iloc[0]
-        value = latest[value_col]
-        year = int(latest[year_col])
-        try:
-            return f"{float(value):.1f}", str(year)
-        except (ValueError, TypeError):
-            return str(value), str(year)
-    val, year = fetch_metric(chirs_df, f"{county_name} County", 'Geographic area', "All cancer incidence rate per 100,000", "Indicator Title", 'Year', 'Rate/Percent')
-    results["All Cancer Incidence"] = (val, year, "All cancer incidence rate per 100,000")
-    val, year = fetch_metric(pa_df, county_name, 'County Name', "Percentage of deaths that are premature (before age 65 years)", "Indicator", 'Data Years', 'Percentage/Rate/Ratio')
-    results["Premature Deaths (%)"] = (val, year, "Percentage of deaths that are premature (before age 65 years)")
-    val, year = fetch_metric(pa_df, county_name, 'County Name', "Prevalence of cigarette smoking among adults", "Indicator", 'Data Years', 'Percentage/Rate/Ratio')
-    results["Adult Smoking (%)"] = (val, year, "Prevalence of cigarette smoking among adults")
-    val, year = fetch_metric(pa_df, county_name, 'County Name', "Percentage of adults with obesity", "Indicator", 'Data Years', 'Percentage/Rate/Ratio')
-    results["Adult Obesity (%)"] = (val, year, "Percentage of adults with obesity")
-    val, year = fetch_metric(mch_df, county_name, 'County Name', "Percentage of births with early (1st trimester) prenatal care", "Indicator", 'Data Years', 'Percentage/Rate')
-    results["Early Prenatal Care (%)"] = (val, year, "Percentage of births with early (1st trimester) prenatal care")
-    val, year = fetch_metric(mch_df, county_name, 'County Name', "Infant mortality rate per 1,000 live births", "Indicator", 'Data Years', 'Percentage/Rate')
-    results["Infant Mortality Rate"] = (val, year, "Infant mortality rate per 1,000 live births")
-    val, year = fetch_metric(mch_df, county_name, 'County Name', "Percentage of preterm births (less than 37 weeks gestation)", "Indicator", 'Data Years', 'Percentage/Rate')
-    results["Preterm Births (%)"] = (val, year, "Percentage of preterm births (less than 37 weeks gestation)")
-    val, year = fetch_metric(pa_df, county_name, 'County Name', "Preventable hospitalizations, rate per 100,000", "Indicator", 'Data Years', 'Percentage/Rate/Ratio')
-    results["Preventable Hospitalizations"] = (val, year, "Preventable hospitalizations, rate per 100,000")
-    return results
-
 def get_pa_data_for_chip(df, priority_area, focus_area, indicator_name, county_name):
     objective_text = "Not available"; data_point_text = "Not available"; trend_df = pd.DataFrame()
     if df is None: return objective_text, data_point_text, trend_df
@@ -207,35 +286,81 @@ def get_pa_data_for_chip(df, priority_area, focus_area, indicator_name, county_n
         if pd.notna(objective): objective_text = f"{objective} {measure}"
         county_df = indicator_df[indicator_df['County Name'] == county_name].copy()
         if not county_df.empty:
-            county_df['Data Years'] = pd.to_numeric(county_df['Data Years'], errors='coerce')
+            # Multi-year spans ("2016-2018") sort and display by their final year.
+            county_df['Data Years'] = end_year(county_df['Data Years'])
             trend_df = county_df.sort_values(by='Data Years', ascending=False).head(5)
             latest_data = trend_df.iloc[0]
             value = latest_data['Percentage/Rate/Ratio']
-            year = int(latest_data['Data Years'])
-            if pd.notna(value): data_point_text = f"{value} {measure} ({year})"
+            year = latest_data['Data Years']
+            if pd.notna(value): data_point_text = f"{value} {measure} ({int(year)})" if pd.notna(year) else f"{value} {measure}"
     return objective_text, data_point_text, trend_df
 
-def get_hanlon_data(df, county, priority, focus, indicator):
-    if df is None: return None
-    filtered_df = df[(df['County Name'] == county) & (df['Priority Area'] == priority) & (df['Focus Area'] == focus) & (df['Indicator'] == indicator)].copy()
-    if filtered_df.empty: return None
-    filtered_df['Data Years'] = pd.to_numeric(filtered_df['Data Years'], errors='coerce')
-    filtered_df = filtered_df.sort_values(by='Data Years', ascending=False)
-    return filtered_df
-
 # ==============================================================================
 # --- Charting Function ---
 # ==============================================================================
+# Config keys that change the chart spec; everything else in a CONFIGS entry (loaders, analyzers, filters) is irrelevant to it.
+CHART_ENCODING_KEYS = ("county_col", "year_col", "value_col", "y_axis_label", "objective_col", "objective_label", "objective_color")
+CHART_CACHE_MAX_ENTRIES = 256
+
+def chart_columns(config):
+    """Returns the columns create_chart actually encodes for a dashboard config."""
+    columns = [config['county_col'], config['year_col'], config['value_col']]
+    if config.get("objective_col"): columns.append(config['objective_col'])
+    return columns
+
+def frame_hash(df):
+    """Content hash of a DataFrame's column names and values, used as a cache key."""
+    digest = hashlib.sha1("|".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+def chart_data(df, config):
+    """Projects df to the encoded columns and drops duplicate rows, so only what the chart draws is serialized."""
+    return df[chart_columns(config)].drop_duplicates().reset_index(drop=True)
+
+@perf.timed()
 def create_chart(df, config):
-    line = alt.Chart(df).mark_line(point=True).encode(
+    # All layers share one projected dataset, which Altair emits once as a named top-level dataset.
+    chart_df = chart_data(df, config)
+    line = alt.Chart().mark_line(point=True).encode(
         x=alt.X(f"{config['year_col']}:N", title='Year', sort=alt.SortField(config['year_col'])),
         y=alt.Y(f"{config['value_col']}:Q", title=config['y_axis_label'], scale=alt.Scale(zero=False)),
         color=alt.Color(f"{config['county_col']}:N", title='County'),
         tooltip=[config['county_col'], config['year_col'], config['value_col']]
     )
-    chart = line
     if config.get("objective_col"):
-        objective_line = alt.Chart(df).mark_rule(color=config['objective_color'], strokeDash=[5,5]).encode(y=f"mean({config['objective_col']}):Q")
+        objective_line = alt.Chart().mark_rule(color=config['objective_color'], strokeDash=[5,5]).encode(y=f"mean({config['objective_col']}):Q")
         objective_text = objective_line.mark_text(align='left', baseline='middle', dx=7, text=config['objective_label']).encode(color=alt.value(config['objective_color']))
-        return (chart + objective_line + objective_text).interactive()
-    return chart.interactive()
\ No newline at end of file
+        return alt.layer(line, objective_line, objective_text, data=chart_df).interactive()
+    return line.properties(data=chart_df).interactive()
+
+@perf.cache_data(max_entries=CHART_CACHE_MAX_ENTRIES, show_spinner=False)
+def _build_chart_json(data_hash, encoding, _chart_df):
+    return create_chart(_chart_df, dict(encoding)).to_json()
+
+def get_chart_json(df, config):
+    """Vega-Lite JSON for create_chart, memoized on the projected data and the encoding-related config fields."""
+    chart_df = chart_data(df, config)
+    encoding = tuple((key, config.get(key)) for key in CHART_ENCODING_KEYS)
+    return _build_chart_json(frame_hash(chart_df), encoding, chart_df)
+
+def chart_payload_sizes(df, chart_json):
+    """Bytes of the chart spec sent and, for comparison, of df's rows serialized whole (every column, duplicates kept).
+    Serializing df is not free, so only the perf panel asks for this."""
+    return {"spec_bytes": len(chart_json), "filtered_rows_bytes": len(df.to_json(orient='records', date_format='iso'))}
+
+def create_trend_chart(trend_df, title):
+    return alt.Chart(trend_df).mark_line(point=True).encode(
+        x=alt.X('Data Years:O', title='Year', sort='ascending'),
+        y=alt.Y('Percentage/Rate/Ratio:Q', title='Rate / Percent', scale=alt.Scale(zero=False)),
+        tooltip=['Data Years', 'Percentage/Rate/Ratio']
+    ).properties(title=title)
+
+@perf.cache_data(max_entries=CHART_CACHE_MAX_ENTRIES, show_spinner=False)
+def _build_trend_chart_json(data_hash, title, _trend_df):
+    return create_trend_chart(_trend_df, title).to_json()
+
+def get_trend_chart_json(trend_df, title):
+    """Vega-Lite JSON for a CHIP indicator trend chart, memoized like get_chart_json."""
+    chart_df = trend_df[['Data Years', 'Percentage/Rate/Ratio']].drop_duplicates().reset_index(drop=True)
+    return _build_trend_chart_json(frame_hash(chart_df), title, chart_df)
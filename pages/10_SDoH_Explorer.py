@@ -2,8 +2,11 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from modules import utils, ai_analysis
+from modules import utils, ai_analysis, peers, perf
+from modules.ui_components import peer_anchor_selector
+from modules.data_viewer import render_data_viewer
 
+perf.start_rerun()
 st.title("📊 Social Determinants of Health (SDoH) Explorer")
 st.write(
     "Compare key socio-economic indicators across New York counties using data from the US Census Bureau's American Community Survey (ACS).")
@@ -42,7 +45,8 @@ selected_variables = st.sidebar.multiselect(
 )
 
 st.sidebar.header("Geography Selection")
-default_ny_counties = ["Dutchess", "Orange", "Rockland", "Putnam", "Sullivan", "Westchester", "Ulster"]
+peer_anchor = peer_anchor_selector("peers_sdoh")
+default_ny_counties = peers.peer_defaults(peer_anchor, utils.NY_COUNTY_FIPS_MAP) if peer_anchor else ["Dutchess", "Orange", "Rockland", "Putnam", "Sullivan", "Westchester", "Ulster"]
 selected_counties = st.sidebar.multiselect("Select NY Counties", options=list(utils.NY_COUNTY_FIPS_MAP.keys()),
                                            default=default_ny_counties)
 
@@ -71,7 +75,7 @@ if st.sidebar.button("🚀 Fetch SDoH Data", use_container_width=True):
             display_df.rename(columns=available_sdoh_vars, inplace=True)
 
             st.subheader("Raw SDoH Data")
-            st.dataframe(display_df)
+            render_data_viewer(display_df.reset_index(), key="sdoh_data", file_name=f"sdoh_{year}")
 
             # --- Visualization ---
             st.subheader("Indicator Comparison")
@@ -106,4 +110,6 @@ if st.sidebar.button("🚀 Fetch SDoH Data", use_container_width=True):
     else:
         st.warning("Please select at least one variable and one county.")
 else:
-    st.info("Select your desired variables and counties, then click 'Fetch Data'.")
\ No newline at end of file
+    st.info("Select your desired variables and counties, then click 'Fetch Data'.")
+
+perf.render_panel()
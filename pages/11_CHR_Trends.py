@@ -2,23 +2,24 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from modules import utils
-from pathlib import Path
+from modules import utils, trends, peers, catalog, regions, perf
+from modules.ui_components import render_movers, peer_anchor_selector, region_editor
+from modules.data_viewer import render_data_viewer
+from modules.config import CHR_FILE_PATH
 
+perf.start_rerun()
 st.title("🏆 County Health Rankings - Trend Explorer")
 st.write("Visualize trends over time for key health measures from the County Health Rankings & Roadmaps program.")
 
 
 # --- Load the Data ---
-@st.cache_data
+DATA_FILE = CHR_FILE_PATH
+
+
 def load_data():
-    script_path = Path(__file__)
-    project_root = script_path.parent.parent
-    # --- FIX IS HERE: Use the exact filename from your disk ---
-    data_file = project_root / "data" / "chr_trends_csv_2024.csv"
-    return utils.load_chr_trend_data(data_file)
+    return utils.load_chr_trend_data(DATA_FILE)
 
-df = load_data()
+df = regions.with_regions("County Health Rankings", load_data(), DATA_FILE)
 
 if df is not None:
     # --- Sidebar for User Selections ---
@@ -26,16 +27,18 @@ if df is not None:
 
     # Let user select a measure to analyze
     all_measures = sorted(df['measurename'].unique())
-    selected_measure = st.sidebar.selectbox("Select a Health Measure:", all_measures)
+    selected_measure = st.sidebar.selectbox("Select a Health Measure:", all_measures, index=catalog.preset_index(all_measures, "Health Measure"))
 
     # Let user select counties
-    all_counties = sorted(df['county'].dropna().unique())
-    default_counties = ["Dutchess", "Orange", "Rockland", "Putnam", "Sullivan", "Westchester", "Ulster"]
+    all_counties = sorted(sorted(df['county'].dropna().unique()), key=lambda c: not regions.is_region(c))
+    peer_anchor = peer_anchor_selector("peers_chr")
+    default_counties = peers.peer_defaults(peer_anchor, all_counties) if peer_anchor else ["Dutchess", "Orange", "Rockland", "Putnam", "Sullivan", "Westchester", "Ulster"]
     selected_counties = st.sidebar.multiselect(
         "Select Counties to Compare:",
         options=all_counties,
         default=[c for c in default_counties if c in all_counties]
     )
+    region_editor()
 
     if not selected_counties:
         st.warning("Please select at least one county.")
@@ -63,8 +66,15 @@ if df is not None:
 
             # --- Data Table Expander ---
             with st.expander("View Detailed Trend Data"):
-                st.dataframe(filtered_df[['yearspan', 'county', 'rawvalue', 'cilow', 'cihigh']])
+                render_data_viewer(filtered_df[['yearspan', 'county', 'rawvalue', 'cilow', 'cihigh']], key="chr_trend_data",
+                                   file_name=f"CHR - {selected_measure}")
+
+            # --- Movers Table ---
+            st.subheader("📊 Biggest Movers")
+            render_movers(trends.get_chr_trends(DATA_FILE), 'county', 'measurename', selected_measure, selected_counties)
         else:
             st.info("No data available for the selected measure and counties.")
 else:
-    st.error("Could not load the County Health Rankings trend data.")
\ No newline at end of file
+    st.error("Could not load the County Health Rankings trend data.")
+
+perf.render_panel()
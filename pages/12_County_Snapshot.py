@@ -2,30 +2,36 @@
 import streamlit as st
 import pandas as pd
 import pydeck as pdk
-from modules import utils, ai_analysis
-from pathlib import Path
+from modules import utils, ai_analysis, geo, cube, tiers, perf
+from modules.config import GEOJSON_FILE_PATH, SNAPSHOT_METRICS
 
 # Remove st.set_page_config from this page file
 
+perf.start_rerun()
 st.title("🏥 County Health Snapshot")
 st.write("A high-level overview of key health indicators for a selected county.")
 
 
-@st.cache_data
 def load_all_data():
-    script_path = Path(__file__);
-    project_root = script_path.parent.parent
-    chirs_path = project_root / "data" / "chir_county_trend.xlsx"
-    pa_path = project_root / "data" / "PreventionAgendaTrackingIndicators-CountyTrendData.csv"
-    mch_path = project_root / "data" / "MCH-CountyTrendData.xlsx"
-    geojson_path = project_root / "data" / "NYS_Counties.geojson"
-    return {
-        "chirs": utils.load_chirs_data(chirs_path), "pa": utils.load_prevention_data(pa_path),
-        "mch": utils.load_mch_data(mch_path), "geojson": utils.load_county_geojson(geojson_path)
-    }
+    # Only latest values are shown, so the county list comes from the most-recent-year extract.
+    return {"pa": tiers.load_latest()}
+
+
+# The summary button reruns only this fragment, not the Census lookup, map and metrics above it.
+@perf.fragment("snapshot.ai_summary")
+def ai_summary_panel(selected_county, all_metrics, census_data):
+    st.subheader("🤖 AI-Powered Executive Summary")
+    if st.button(f"Generate Summary for {selected_county} County", use_container_width=True):
+        with st.spinner("AI is analyzing..."):
+            metrics_for_ai = {label: (val, year) for label, (val, year, name) in all_metrics.items()}
+            metrics_for_ai.update({k: (v, "2022") for k, v in census_data.items()})
+            summary = ai_analysis.summarize_county_snapshot(selected_county, metrics_for_ai)
+            st.markdown(summary)
 
 
 data = load_all_data()
+# The geometry index is a shared resource (not copied per rerun like st.cache_data results).
+data["county_index"] = geo.get_county_index(GEOJSON_FILE_PATH)
 pa_df = data["pa"]
 
 if pa_df is None:
@@ -49,32 +55,40 @@ else:
         st.metric("Population Below Poverty", census_data.get("Population Below Poverty Level", "N/A"))
 
         st.subheader("Location")
-        geojson = data.get("geojson")
-        if geojson:
-            county_name_for_geojson = f"{selected_county} County"
-            county_feature = next(
-                (f for f in geojson['features'] if f['properties']['name'] == county_name_for_geojson), None)
-            if county_feature:
-                bbox = county_feature['properties'].get('bbox', [-75.5, 42.5, -73.5, 41.5])
-                center_lon, center_lat = (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
-                view_state = pdk.ViewState(latitude=center_lat, longitude=center_lon, zoom=6.5, pitch=0)
-
-                geojson_layer = pdk.Layer('GeoJsonLayer', geojson,
+        county_index = data.get("county_index")
+        if county_index:
+            county_entry = geo.find_county(county_index, selected_county)
+            if county_entry:
+                view = geo.county_view(county_entry)
+                view_state = pdk.ViewState(latitude=view["latitude"], longitude=view["longitude"], zoom=view["zoom"], pitch=0)
+                # Only the simplified layer matching this zoom is sent, plus the selected county as a highlight.
+                tolerance = geo.tolerance_for_zoom(view["zoom"])
+                geojson_layer = pdk.Layer('GeoJsonLayer', county_index["layers"][tolerance],
                                           stroked=True, filled=True,
                                           get_fill_color='[200, 200, 200, 40]',
                                           get_line_color=[100, 100, 100], get_line_width=100,
                                           highlight_color=[65, 182, 196, 200], auto_highlight=True, pickable=True
                                           )
-                st.pydeck_chart(pdk.Deck(layers=[geojson_layer], initial_view_state=view_state,
+                selected_layer = pdk.Layer('GeoJsonLayer', county_entry["simplified"][tolerance],
+                                           stroked=True, filled=True,
+                                           get_fill_color=[65, 182, 196, 90],
+                                           get_line_color=[20, 90, 110], get_line_width=200)
+                st.pydeck_chart(pdk.Deck(layers=[geojson_layer, selected_layer], initial_view_state=view_state,
                                          map_style='mapbox://styles/mapbox/light-v10', tooltip={"text": "{name}"}))
             else:
-                st.warning(f"Boundary data not found for {county_name_for_geojson}.")
+                st.warning(f"Boundary data not found for {selected_county} County.")
         else:
             st.error("County boundary GeoJSON file could not be loaded.")
 
     with col2:
         st.subheader("Key Health Indicators")
-        all_metrics = utils.get_snapshot_data(data["chirs"], data["pa"], data["mch"], selected_county)
+        # Each metric is a direct lookup into the latest-value cube's array; its PA values come from the extract.
+        indicator_cube = cube.get_latest_cube()
+        snapshot = cube.snapshot(indicator_cube, selected_county) if indicator_cube else {}
+        all_metrics = {}
+        for label, (source_name, indicator_name) in SNAPSHOT_METRICS.items():
+            metric = snapshot.get(label)
+            all_metrics[label] = (f"{metric[0]:.1f}", str(metric[1]), indicator_name) if metric else ("N/A", "", indicator_name)
         sub_col1, sub_col2, sub_col3, sub_col4 = st.columns(4)
 
 
@@ -98,10 +112,6 @@ else:
 
     st.divider()
 
-    st.subheader("🤖 AI-Powered Executive Summary")
-    if st.button(f"Generate Summary for {selected_county} County", use_container_width=True):
-        with st.spinner("AI is analyzing..."):
-            metrics_for_ai = {label: (val, year) for label, (val, year, name) in all_metrics.items()}
-            metrics_for_ai.update({k: (v, "2022") for k, v in census_data.items()})
-            summary = ai_analysis.summarize_county_snapshot(selected_county, metrics_for_ai)
-            st.markdown(summary)
\ No newline at end of file
+    ai_summary_panel(selected_county, all_metrics, census_data)
+
+perf.render_panel()
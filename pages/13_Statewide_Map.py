@@ -0,0 +1,49 @@
+# pages/13_Statewide_Map.py
+import streamlit as st
+import altair as alt
+from modules import geo, cube, perf
+from modules.config import INDICATOR_SOURCES, GEOJSON_FILE_PATH
+
+perf.start_rerun()
+st.title("🗺️ Statewide Indicator Map")
+st.write("Compare the most recent value of any indicator across all 62 New York counties.")
+
+topology_url = geo.county_topology_url(GEOJSON_FILE_PATH)
+indicator_cube = cube.get_cube()
+
+st.sidebar.header("Indicator")
+source_name = st.sidebar.selectbox("1. Data Source", list(INDICATOR_SOURCES.keys()))
+source = INDICATOR_SOURCES[source_name]
+indicators = cube.source_indicators(indicator_cube, source_name) if indicator_cube else None
+
+if topology_url is None:
+    st.error("County boundary GeoJSON file could not be loaded.")
+elif indicators is None or indicators.empty:
+    st.error(f"Could not load {source_name} data.")
+else:
+    if source["area_col"]:
+        area = st.sidebar.selectbox(f"2. {source['area_col']}", sorted(indicators["area"].unique()))
+        indicators = indicators[indicators["area"] == area]
+    indicator = st.sidebar.selectbox("3. Indicator", sorted(indicators["indicator"]))
+    values = cube.cross_section(indicator_cube, cube.indicator_code(indicator_cube, source_name, indicator))[["fips", "county", "year", "value"]]
+
+    st.header(f"🗺️ {indicator}")
+    if values.empty:
+        st.info("No county-level values are available for this indicator.")
+    else:
+        years = sorted(values["year"].astype(int).unique())
+        st.caption(f"Most recent data year per county: {years[0]}–{years[-1]}" if len(years) > 1 else f"Data year: {years[0]}")
+        # The geometry comes from a static TopoJSON URL the browser caches; only this small value table is in the spec.
+        counties = alt.Data(url=topology_url, format=alt.DataFormat(type="topojson", feature=geo.TOPOLOGY_OBJECT))
+        choropleth = alt.Chart(counties).mark_geoshape(stroke="white", strokeWidth=0.5).transform_lookup(
+            lookup="id", from_=alt.LookupData(values, "fips", ["county", "year", "value"])
+        ).encode(
+            color=alt.Color("value:Q", title="Value", scale=alt.Scale(scheme="blues")),
+            tooltip=[alt.Tooltip("properties.name:N", title="County"), alt.Tooltip("value:Q", title="Value"), alt.Tooltip("year:Q", title="Year", format="d")]
+        ).project("mercator").properties(height=550)
+        st.altair_chart(choropleth, use_container_width=True)
+
+        with st.expander("View County Values"):
+            st.dataframe(values.sort_values("value", ascending=False), hide_index=True)
+
+perf.render_panel()
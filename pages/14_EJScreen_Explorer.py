@@ -0,0 +1,66 @@
+# pages/14_EJScreen_Explorer.py
+import streamlit as st
+import pandas as pd
+import altair as alt
+from modules import ejscreen, perf
+from modules.config import EJSCREEN_FILE_PATH
+
+perf.start_rerun()
+st.title("🌳 Environmental Justice (EJScreen) Explorer")
+st.write("Compare environmental burden and demographic indicators across New York counties, then drill into the census tracts of any county. "
+         "Values are national percentiles; county figures are weighted by tract population.")
+
+rollups = ejscreen.get_county_rollups(EJSCREEN_FILE_PATH)
+
+if rollups is None:
+    st.error("Could not load EJScreen data.")
+else:
+    st.sidebar.header("Indicator")
+    indicator = st.sidebar.selectbox("Select EJScreen Indicator", rollups["columns"])
+
+    # --- Statewide County Comparison ---
+    st.header(f"📊 {indicator} by County")
+    county_df = pd.DataFrame({
+        "County": rollups["weighted_mean"].index,
+        "Population-Weighted Percentile": rollups["weighted_mean"][indicator].to_numpy(),
+        f"% of Residents in Tracts ≥ {ejscreen.HIGH_PERCENTILE}th": rollups["high_share"][indicator].to_numpy(),
+        "Population": rollups["population"].reindex(rollups["weighted_mean"].index).to_numpy(),
+        "Tracts": rollups["tracts"].reindex(rollups["weighted_mean"].index).to_numpy()
+    }).sort_values("Population-Weighted Percentile", ascending=False)
+
+    bar = alt.Chart(county_df).mark_bar().encode(
+        x=alt.X("Population-Weighted Percentile:Q", scale=alt.Scale(domain=[0, 100])),
+        y=alt.Y("County:N", sort="-x", title=None),
+        tooltip=list(county_df.columns)
+    ).properties(height=alt.Step(14))
+    st.altair_chart(bar, use_container_width=True)
+    with st.expander("View County Table"):
+        st.dataframe(county_df, hide_index=True)
+
+    st.divider()
+
+    # --- County Drill-Down ---
+    st.header("🔎 Tract Drill-Down")
+    county = st.selectbox("Select County", sorted(rollups["weighted_mean"].index))
+    tracts = ejscreen.get_county_tracts(EJSCREEN_FILE_PATH, county)
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Population-Weighted Percentile", rollups["weighted_mean"].at[county, indicator])
+    c2.metric(f"Residents in Tracts ≥ {ejscreen.HIGH_PERCENTILE}th", f"{rollups['high_share'].at[county, indicator]}%")
+    c3.metric("Census Tracts", len(tracts))
+
+    distribution = rollups["distribution"].loc[county, indicator].rename("Tract Percentile").to_frame()
+    distribution.index = [f"P{int(q * 100)}" for q in distribution.index]
+    st.caption("Distribution of tract percentiles (unweighted)")
+    st.dataframe(distribution.T)
+
+    if not tracts.empty:
+        histogram = alt.Chart(tracts[[ejscreen.TRACT_COL, indicator]]).mark_bar().encode(
+            x=alt.X(f"{indicator}:Q", bin=alt.Bin(step=10, extent=[0, 100]), title=indicator),
+            y=alt.Y("count():Q", title="Tracts")
+        ).properties(height=250)
+        st.altair_chart(histogram, use_container_width=True)
+        st.dataframe(tracts[[ejscreen.TRACT_COL, ejscreen.POPULATION_COL] + rollups["columns"]].sort_values(indicator, ascending=False),
+                     hide_index=True)
+
+perf.render_panel()
@@ -0,0 +1,33 @@
+# pages/15_Indicator_Search.py
+import streamlit as st
+from modules import catalog, perf
+from modules.config import INDICATOR_SOURCES
+
+perf.start_rerun()
+st.title("🔎 Indicator Search")
+st.write("Search every CHIRS, Prevention Agenda, MCH and County Health Rankings indicator by title or topic, then open it on its dashboard.")
+
+indicator_catalog = catalog.get_catalog()
+
+if indicator_catalog is None:
+    st.error("Could not load any indicator data.")
+else:
+    c1, c2 = st.columns([3, 2])
+    query = c1.text_input("Search indicators", value=st.query_params.get("q", ""), placeholder="e.g. obesity, prenatal care, asthma emergency visits").strip()
+    sources = c2.multiselect("Datasets", list(INDICATOR_SOURCES.keys()), placeholder="All datasets")
+    entries = indicator_catalog["entries"]
+    st.caption(f"{len(entries):,} indicators across {entries['source'].nunique()} datasets. Typos and partial words still match.")
+
+    if query:
+        results = catalog.search(indicator_catalog, query, sources=sources)
+        if results.empty:
+            st.info(f"No indicators match '{query}'.")
+        else:
+            st.subheader(f"{len(results)} best matches")
+            for _, row in results.iterrows():
+                left, right = st.columns([5, 1])
+                left.markdown(f"**{row['indicator']}**  \n{row['source']}" + (f" · {row['area']}" if row["area"] else "") +
+                              f" · {row['counties']} counties · {row['years']}")
+                right.page_link(catalog.DASHBOARDS[row["source"]]["page"], label="Open", icon="➡️", query_params=row["params"])
+
+perf.render_panel()
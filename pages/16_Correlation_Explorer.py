@@ -0,0 +1,94 @@
+# pages/16_Correlation_Explorer.py
+import streamlit as st
+import pandas as pd
+import numpy as np
+import altair as alt
+from modules import correlation, perf
+
+perf.start_rerun()
+st.title("🔗 Indicator Correlation Explorer")
+st.write("Which health outcomes move with which social determinants? Correlations of the latest county values, each pair computed over the counties reporting both.")
+
+correlations = correlation.get_correlations()
+
+if correlations is None:
+    st.error("Could not load the indicator data.")
+else:
+    columns = correlations["columns"]
+    has_acs = (columns["group"] == correlation.SDOH_GROUP).any()
+    if not has_acs: st.warning("ACS social determinants are unavailable (Census API unreachable and no local mirror); showing health indicators only.")
+
+    # --- Sidebar ---
+    st.sidebar.header("Correlation Settings")
+    views = ["Health outcomes × social determinants", "Health outcomes × health outcomes"] if has_acs else ["Health outcomes × health outcomes"]
+    view = st.sidebar.radio("Compare", views)
+    groups = st.sidebar.multiselect("Health Datasets", list(correlation.HEALTH_SOURCES.values()), default=list(correlation.HEALTH_SOURCES.values()))
+    min_counties = st.sidebar.slider("Minimum counties per pair", correlation.MIN_COUNTIES, 62, 30)
+    top_n = st.sidebar.slider("Indicators shown", 10, 60, 25, step=5)
+    significant_only = st.sidebar.checkbox("Significant pairs only (95%)")
+
+    health = np.flatnonzero(columns["group"].isin(groups).to_numpy())
+    sdoh = np.flatnonzero((columns["group"] == correlation.SDOH_GROUP).to_numpy())
+    r = np.where(correlations["n"] >= min_counties, correlations["r"], np.nan)
+    if significant_only: r = np.where(correlations["significant"], r, np.nan)
+
+    if not groups:
+        st.warning("⬅️ Please select at least one health dataset.")
+    else:
+        # Rows are the health indicators most strongly related to anything in the compared set.
+        among_health = view == "Health outcomes × health outcomes"
+        targets = health if among_health else sdoh
+        strength = np.abs(r[np.ix_(health, targets)])
+        if among_health: np.fill_diagonal(strength, np.nan)
+        best = np.where(np.isnan(strength).all(axis=1), -1, np.nan_to_num(strength, nan=-1).max(axis=1))
+        order = np.argsort(-best, kind="stable")[:top_n]
+        rows = health[order[best[order] >= 0]]
+        cols = rows if among_health else targets
+
+        if len(rows) == 0:
+            st.info("No indicator pairs meet the current settings.")
+        else:
+            labels = columns["label"].to_numpy()
+            heat = pd.DataFrame({"Indicator": np.repeat(labels[rows], len(cols)), "Compared With": np.tile(labels[cols], len(rows)),
+                                 "r": r[np.ix_(rows, cols)].ravel().round(3), "Counties": correlations["n"][np.ix_(rows, cols)].ravel()})
+            heat = heat.dropna(subset=["r"])
+
+            st.header("Correlation Heatmap")
+            st.caption("Click a cell to plot that pair by county below.")
+            cell = alt.selection_point(name="cell", fields=["Indicator", "Compared With"], on="click")
+            heatmap = alt.Chart(heat).mark_rect().encode(
+                x=alt.X("Compared With:N", sort=list(labels[cols]), title=None, axis=alt.Axis(labelLimit=180, labelAngle=-45)),
+                y=alt.Y("Indicator:N", sort=list(labels[rows]), title=None, axis=alt.Axis(labelLimit=320)),
+                color=alt.Color("r:Q", scale=alt.Scale(scheme="redblue", domain=[-1, 1], reverse=True), title="Pearson r"),
+                opacity=alt.condition(cell, alt.value(1), alt.value(0.4)),
+                tooltip=["Indicator", "Compared With", "r", "Counties"]
+            ).add_params(cell).properties(height=max(300, 18 * len(rows)))
+            event = st.altair_chart(heatmap, use_container_width=True, on_select="rerun", key="correlation_heatmap")
+
+            pairs = correlation.strongest_pairs(dict(correlations, r=r), rows, cols, limit=50)
+            with st.expander("Strongest Pairs"):
+                st.dataframe(pairs.drop(columns=["a", "b"]), hide_index=True, use_container_width=True)
+
+            # --- Drill-down ---
+            chosen = (event.selection.get("cell") or [None])[0] if event else None
+            by_label = {label: i for i, label in enumerate(labels)}
+            if chosen and chosen.get("Indicator") in by_label and chosen.get("Compared With") in by_label:
+                a, b = by_label[chosen["Indicator"]], by_label[chosen["Compared With"]]
+            elif not pairs.empty:
+                a, b = int(pairs["a"].iloc[0]), int(pairs["b"].iloc[0])
+            else:
+                a = b = None
+
+            if a is not None and a != b:
+                st.header("County Drill-Down")
+                points = correlation.pair_frame(correlations, b, a)
+                verdict = "significant at 95%" if correlations["significant"][a, b] else "not significant at 95%"
+                st.caption(f"r = {correlations['r'][a, b]:.3f} across {correlations['n'][a, b]} counties ({verdict})")
+                base = alt.Chart(points).encode(x=alt.X("x:Q", title=labels[b], scale=alt.Scale(zero=False)),
+                                                y=alt.Y("y:Q", title=labels[a], scale=alt.Scale(zero=False)))
+                scatter = base.mark_circle(size=70).encode(tooltip=[alt.Tooltip("county:N", title="County"),
+                                                                    alt.Tooltip("x:Q", title=labels[b]), alt.Tooltip("y:Q", title=labels[a])])
+                fit = base.transform_regression("x", "y").mark_line(color="gray", strokeDash=[4, 4])
+                st.altair_chart((scatter + fit).interactive(), use_container_width=True)
+
+perf.render_panel()
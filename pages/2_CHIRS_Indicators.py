@@ -1,8 +1,10 @@
 # pages/2_📈_CHIRS_Indicators.py
 import streamlit as st
+from modules import perf
 from modules.config import CONFIGS
 from modules.ui_components import render_dashboard
 
+perf.start_rerun()
 st.title("📈 CHIRS Indicators Dashboard")
 
 # Get the configuration for this specific dashboard
@@ -17,4 +19,6 @@ if df is not None:
         st.session_state.current_ai_analysis = None
     st.session_state.last_dashboard = "CHIRS Indicators"
 
-    render_dashboard(config, df)
\ No newline at end of file
+    render_dashboard(config, df)
+
+perf.render_panel()
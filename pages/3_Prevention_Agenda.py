@@ -1,8 +1,10 @@
 # pages/3_Prevention_Agenda.py
 import streamlit as st
+from modules import perf
 from modules.config import CONFIGS
 from modules.ui_components import render_dashboard
 
+perf.start_rerun()
 st.title("🎯 Prevention Agenda Trends Dashboard")
 
 config = CONFIGS["Prevention Agenda Trends"]
@@ -14,3 +16,5 @@ if df is not None:
     st.session_state.last_dashboard = "Prevention Agenda Trends"
 
     render_dashboard(config, df)
+
+perf.render_panel()
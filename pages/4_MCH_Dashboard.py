@@ -1,8 +1,10 @@
 # pages/4_MCH_Dashboard.py
 import streamlit as st
+from modules import perf
 from modules.config import CONFIGS
 from modules.ui_components import render_dashboard
 
+perf.start_rerun()
 st.title("🤰 Maternal & Child Health (MCH) Dashboard")
 
 config = CONFIGS["MCH Dashboard"]
@@ -13,4 +15,6 @@ if df is not None:
         st.session_state.current_ai_analysis = None
     st.session_state.last_dashboard = "MCH Dashboard"
 
-    render_dashboard(config, df)
\ No newline at end of file
+    render_dashboard(config, df)
+
+perf.render_panel()
@@ -1,10 +1,8 @@
 # pages/5_Report_Builder.py
 import streamlit as st
-import markdown
-from datetime import datetime
-import json
-import html
+from modules import reports, analysis_store, perf
 
+perf.start_rerun()
 st.title("📋 Consolidated Report Builder")
 
 if "saved_analyses" not in st.session_state or not st.session_state.saved_analyses:
@@ -16,6 +14,9 @@ indices_to_remove = [];
 for i, snap in enumerate(st.session_state.saved_analyses):
     with st.container():
         st.subheader(f"{i + 1}. {snap['dashboard']}: {snap['indicator']}")
+        if analysis_store.is_stale(snap):
+            st.warning("The dashboard's data has changed since this analysis was saved; its chart and text reflect the earlier data.")
+            st.button("🔄 Redraw Chart with Current Data", key=f"refresh_{i}", on_click=analysis_store.refresh_chart, args=(snap,))
         if st.button(f"🗑️ Remove Analysis #{i + 1}", key=f"remove_{i}"):
             indices_to_remove.append(i)
         st.markdown(snap['analysis_text'])
@@ -28,74 +29,31 @@ st.divider();
 st.header("Download Full Report")
 
 # ==============================================================================
-# --- FINAL, CORRECT REPORT GENERATION LOGIC ---
+# --- REPORT GENERATION (bundled by modules/reports.py) ---
 # ==============================================================================
-report_html_parts = []
-vega_embed_scripts = []
-
-for i, snap in enumerate(st.session_state.saved_analyses):
-    chart_div_id = f"vis{i}"
-
-    # --- THIS IS THE FIX: No json.dumps here ---
-    # We will pass the raw JSON string directly into the JavaScript template.
-    chart_spec = snap['chart_json']
-
-    # Create the JavaScript call for this specific chart
-    script = f"""
-        const spec{i} = {chart_spec};
-        spec{i}.width = 'container';
-        spec{i}.height = 300;
-        vegaEmbed('#{chart_div_id}', spec{i}, {{"actions": false}});
-    """
-    vega_embed_scripts.append(script)
-
-    # Build the HTML body part for this section
-    section_html = f"""
-    <h2>{i + 1}. {snap['dashboard']}: {snap['indicator']}</h2>
-    <p><strong>Filters:</strong> <code>{snap['filters']}</code></p>
-    <div id="{chart_div_id}" class="chart-container"></div>
-    <p><strong>Source:</strong> {', '.join(snap['data_source'])}</p>
-    <div><strong>Data Notes:</strong><ul>{''.join([f"<li>{note}</li>" for note in snap['data_notes']])}</ul></div>
-    <div><h3>AI-Generated Insights</h3>{markdown.markdown(snap['analysis_text'])}</div>
-    <hr>
-    """
-    report_html_parts.append(section_html)
-
-# --- Create the single, master script tag ---
-master_script = f"""
-<script type="text/javascript">
-    // This function will run after the page is fully loaded
-    window.onload = function() {{
-        {';'.join(vega_embed_scripts)}
-    }};
-</script>
-"""
-
-# --- Assemble the final HTML document ---
-final_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>NYS Health Report</title>
-    <script src="https://cdn.jsdelivr.net/npm/vega@5"></script>
-    <script src="https://cdn.jsdelivr.net/npm/vega-lite@5"></script>
-    <script src="https://cdn.jsdelivr.net/npm/vega-embed@6"></script>
-    <style>
-        body{{font-family:sans-serif;}} h1,h2{{color:#2c3e50; border-bottom:2px solid #eee;}}
-        code{{background-color:#f4f4f4; padding:2px 5px; border-radius:4px;}}
-        .chart-container{{width: 100%; height: 350px;}}
-    </style>
-</head>
-<body>
-    <h1>NYS Health Data Report</h1>
-    <p><em>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</em></p>
-    {''.join(report_html_parts)}
-    {master_script}
-</body>
-</html>
-"""
+# Each section is served from the render cache unless its contents changed; the full
+# document is only assembled when the download button is clicked.
+sections = [reports.render_analysis_section(snap) for snap in st.session_state.saved_analyses]
 
+missing_runtime = reports.missing_runtime()
+if missing_runtime: st.error(reports.missing_runtime_message(missing_runtime))
 st.download_button(
     label="📥 Download Full Report as HTML",
-    data=final_html, file_name="NYS_Health_Data_Report.html", mime="text/html"
-)
\ No newline at end of file
+    data=lambda: reports.build_report_html("NYS Health Report", "<h1>NYS Health Data Report</h1>",
+                                           sections, reports.ANALYSIS_REPORT_CSS),
+    file_name="NYS_Health_Data_Report.html", mime="text/html", disabled=bool(missing_runtime)
+)
+
+# ==============================================================================
+# --- SESSION MEMORY ---
+# ==============================================================================
+# Measuring pickles every session_state value, so it runs on request (always in perf mode).
+with st.expander("🧠 Session Memory Usage"):
+    if perf.enabled() or st.button("Measure Session Memory"):
+        analysis_store.record_session_usage()
+        st.caption("Approximate serialized size of what this session keeps on the server.")
+        st.dataframe(analysis_store.session_memory_report(st.session_state), hide_index=True)
+        st.caption("All sessions that have measured")
+        st.dataframe(analysis_store.all_sessions_usage(), hide_index=True)
+
+perf.render_panel()
@@ -2,8 +2,11 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from modules import utils  # Import our shared utility functions
+from modules import utils, peers, perf  # Import our shared utility functions
+from modules.ui_components import peer_anchor_selector
+from modules.data_viewer import render_data_viewer
 
+perf.start_rerun()
 st.title("🌎 US Census Data Explorer")
 st.write("An interface to query, visualize, and compare data directly from the US Census Bureau API.")
 
@@ -38,7 +41,8 @@ elif geo_level == "All NY Counties":
     geo_for_param = "county:*"
     geo_in_param = {"in": f"state:{utils.STATE_FIPS_MAP['New York']}"}
 elif geo_level == "Specific NY Counties":
-    default_ny_counties = ["Dutchess", "Orange", "Rockland", "Putnam", "Sullivan", "Westchester", "Ulster"]
+    peer_anchor = peer_anchor_selector("peers_census")
+    default_ny_counties = peers.peer_defaults(peer_anchor, utils.NY_COUNTY_FIPS_MAP) if peer_anchor else ["Dutchess", "Orange", "Rockland", "Putnam", "Sullivan", "Westchester", "Ulster"]
     selected_counties = st.sidebar.multiselect("Select NY Counties", options=list(utils.NY_COUNTY_FIPS_MAP.keys()),
                                                default=default_ny_counties)
     if selected_counties:
@@ -60,7 +64,7 @@ if st.sidebar.button("🚀 Fetch Census Data", use_container_width=True):
         if not df.empty:
             st.success(f"Successfully fetched {len(df)} records.")
             st.subheader(f"Data for {', '.join(selected_variables)}")
-            st.dataframe(df)
+            render_data_viewer(df, key="census_data", file_name=f"census_{dataset_key.replace('/', '_')}_{year}")
 
             # --- Data Visualization with Altair ---
             # Ensure we only try to plot the numeric variables that were actually returned
@@ -89,4 +93,6 @@ if st.sidebar.button("🚀 Fetch Census Data", use_container_width=True):
     else:
         st.warning("Please ensure you have selected at least one variable and a valid geography.")
 else:
-    st.info("Select your desired dataset, year, variables, and geography, then click 'Fetch Data'.")
\ No newline at end of file
+    st.info("Select your desired dataset, year, variables, and geography, then click 'Fetch Data'.")
+
+perf.render_panel()
@@ -1,20 +1,14 @@
 # pages/7_✍️_CHIP_Wizard.py
 import streamlit as st
 import pandas as pd
-import altair as alt
-from modules import utils, ai_analysis
-from pathlib import Path
+import json
+from modules import utils, ai_analysis, tiers, perf
+from modules.ui_components import await_trend_history
 
+perf.start_rerun()
 
-@st.cache_data
-def load_pa_data():
-    script_path = Path(__file__)
-    project_root = script_path.parent.parent
-    data_file = project_root / "data" / "PreventionAgendaTrackingIndicators-CountyTrendData.csv"
-    return utils.load_prevention_data(data_file)
-
-
-pa_df = load_pa_data()
+# Selections and the data context come from the latest-value extract; the trend chart waits for the full history.
+pa_df = tiers.load_latest()
 
 # Initialize session state for this page if it doesn't exist
 if 'chip_wizard' not in st.session_state:
@@ -64,23 +58,22 @@ if pa_df is not None:
     st.session_state.chip_wizard['indicator'] = st.selectbox("Select a related PA Indicator:", indicator_list,
                                                              index=indicator_index, key="chip_indicator")
 
-    official_objective, latest_data, trend_df = utils.get_pa_data_for_chip(pa_df, st.session_state.chip_wizard[
-        'priority_area'], st.session_state.chip_wizard['focus_area'], st.session_state.chip_wizard['indicator'],
-                                                                           st.session_state.chip_wizard['county'])
+    chip_selection = [st.session_state.chip_wizard[k] for k in ('priority_area', 'focus_area', 'indicator', 'county')]
+    official_objective, latest_data, _ = utils.get_pa_data_for_chip(pa_df, *chip_selection)
 
     st.subheader("Data Context")
     col1, col2 = st.columns(2)
     col1.metric("Official 2024 Objective", official_objective)
     col2.metric(f"{st.session_state.chip_wizard['county']} County's Most Recent Data", latest_data)
 
-    if not trend_df.empty:
-        trend_chart = alt.Chart(trend_df).mark_line(point=True).encode(
-            x=alt.X('Data Years:O', title='Year', sort='ascending'),
-            y=alt.Y('Percentage/Rate/Ratio:Q', title='Rate / Percent', scale=alt.Scale(zero=False)),
-            tooltip=['Data Years', 'Percentage/Rate/Ratio']
-        ).properties(
-            title=f"Recent Trend for '{st.session_state.chip_wizard['indicator']}' in {st.session_state.chip_wizard['county']} County")
-        st.altair_chart(trend_chart, use_container_width=True)
+    trend_df = utils.get_pa_data_for_chip(tiers.load_history(), *chip_selection)[2] if tiers.history_ready() else None
+    if trend_df is None:
+        await_trend_history()
+    elif not trend_df.empty:
+        trend_chart_json = utils.get_trend_chart_json(
+            trend_df,
+            f"Recent Trend for '{st.session_state.chip_wizard['indicator']}' in {st.session_state.chip_wizard['county']} County")
+        st.vega_lite_chart(json.loads(trend_chart_json), use_container_width=True)
 
     st.divider()
 
@@ -141,7 +134,9 @@ if pa_df is not None:
     st.header("Step 4: Add Section to Final Report")
     if st.button("➕ Add This Section to the CHIP Report", use_container_width=True, type="primary"):
         plan_snapshot = st.session_state.chip_wizard.copy()
-        plan_snapshot['trend_data'] = trend_df.to_dict(orient='records')
+        if trend_df is None: trend_df = utils.get_pa_data_for_chip(tiers.load_history(), *chip_selection)[2]
+        # Only the charted columns are kept; the report rebuilds its trend chart from these.
+        plan_snapshot['trend_data'] = trend_df[['Data Years', 'Percentage/Rate/Ratio']].to_dict(orient='records') if not trend_df.empty else []
         plan_snapshot['official_objective'] = official_objective
         plan_snapshot['latest_data'] = latest_data
 
@@ -161,4 +156,6 @@ if pa_df is not None:
             f"Added section for '{plan_snapshot['focus_area']}' to the report! The form is now clear for the next section.")
         st.rerun()
 else:
-    st.error("Could not load Prevention Agenda data.")
\ No newline at end of file
+    st.error("Could not load Prevention Agenda data.")
+
+perf.render_panel()
@@ -1,22 +1,16 @@
 # pages/9_🧮_Hanlon_Prioritization.py
 import streamlit as st
 import pandas as pd
-from modules import utils, ai_analysis
-from pathlib import Path  # <-- Import the Path library
+from modules import utils, ai_analysis, hanlon, tiers, perf
 
+perf.start_rerun()
 
-# --- Load Data (with ROBUST path) ---
-@st.cache_data
-def load_pa_data():
-    # --- THE FIX IS HERE ---
-    # Build the absolute path to the data file, making it runnable from anywhere
-    script_path = Path(__file__)
-    project_root = script_path.parent.parent  # Go up two levels (from pages/ to the root)
-    data_file = project_root / "data" / "PreventionAgendaTrackingIndicators-CountyTrendData.csv"
-    return utils.load_prevention_data(data_file)
-
-
-pa_df = load_pa_data()
+# --- Load Data ---
+# Hanlon scores only the latest values, so the small most-recent-year extract is enough. Resolved on every rerun,
+# since an ingest append switches it to the trend file.
+pa_data_file = tiers.latest_file_path()
+pa_df = utils.load_prevention_data(pa_data_file)
+scores = hanlon.get_suggested_scores(pa_data_file)
 
 st.title("🧮 Hanlon Method: Data-Driven Prioritization")
 st.write("A tool to prioritize Prevention Agenda indicators using a data-driven approach.")
@@ -43,34 +37,14 @@ if pa_df is not None:
     indicators = sorted(pa_df[pa_df['Focus Area'] == selected_focus]['Indicator'].dropna().unique())
     selected_indicator = c4.selectbox("Select Indicator:", indicators)
 
-    # --- Fetch Data for the selection ---
-    hanlon_data = utils.get_hanlon_data(pa_df, selected_county, selected_priority, selected_focus, selected_indicator)
-
-    if hanlon_data is not None and not hanlon_data.empty:
-        latest_data = hanlon_data.iloc[0]
-
-        # --- Automated Scoring Logic ---
-        size_score_suggestion = 5
-        if pd.notna(latest_data.get('Event Count/Rate')):
-            try:
-                event_count = float(str(latest_data['Event Count/Rate']).replace(',', ''))
-                if event_count > 1000:
-                    size_score_suggestion = 8
-                elif event_count > 500:
-                    size_score_suggestion = 7
-                elif event_count > 100:
-                    size_score_suggestion = 6
-            except (ValueError, TypeError):
-                pass
-
-        seriousness_score_suggestion = 5
-        quartile = str(latest_data.get('Quartile', ''))
-        if 'Q4' in quartile:
-            seriousness_score_suggestion = 9
-        elif 'Q3' in quartile:
-            seriousness_score_suggestion = 7
-        elif 'Q1' in quartile or 'Q2' in quartile:
-            seriousness_score_suggestion = 4
+    # --- Suggested scores for the selection come from the batch table ---
+    match = scores[(scores['County Name'] == selected_county) & (scores['Priority Area'] == selected_priority) &
+                   (scores['Focus Area'] == selected_focus) & (scores['Indicator'] == selected_indicator)]
+
+    if not match.empty:
+        latest_data = match.iloc[0]
+        size_score_suggestion = latest_data['Size']
+        seriousness_score_suggestion = latest_data['Seriousness']
 
         st.divider()
         st.header("2. Score the Problem")
@@ -104,5 +78,20 @@ if pa_df is not None:
 
     else:
         st.warning("No data found for this specific combination. Please make another selection.")
+
+    # --- Batch Ranking ---
+    st.divider()
+    st.header(f"4. Rank Every Indicator for {selected_county} County")
+    st.write("Size and Seriousness are the suggested scores for each indicator's latest data. "
+             "Set Effectiveness per priority area to reflect how well available interventions work; the ranking updates instantly.")
+    with st.expander("Effectiveness by Priority Area", expanded=True):
+        effectiveness = {area: st.slider(area, 0.5, 1.5, hanlon.DEFAULT_EFFECTIVENESS, 0.1, key=f"hanlon_eff_{area}")
+                         for area in priority_areas}
+    ranked = hanlon.rank_priorities(scores[scores['County Name'] == selected_county], effectiveness)
+    st.dataframe(ranked[['Rank', 'Priority Score', 'Indicator', 'Priority Area', 'Focus Area', 'Data Years',
+                         'Percentage/Rate/Ratio', 'Quartile', 'Size', 'Seriousness', 'Effectiveness']],
+                 hide_index=True, use_container_width=True)
 else:
-    st.error("Could not load Prevention Agenda data.")
\ No newline at end of file
+    st.error("Could not load Prevention Agenda data.")
+
+perf.render_panel()
@@ -0,0 +1,25 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+PA_COUNTIES = ["Albany", "Dutchess", "Kings", "New York", "Orange"]
+
+def pa_rows(years, indicators=("Adult obesity", "Adult smoking"), counties=PA_COUNTIES, seed=0):
+    """Rows in the Prevention Agenda trend file's layout, as the CSV stores them (text)."""
+    rng = np.random.default_rng(seed)
+    rows = [{"Priority Area": "Chronic Disease", "Focus Area": "Healthy Eating", "Indicator": indicator,
+             "County Name": county, "Data Years": str(year), "Percentage/Rate/Ratio": f"{rng.uniform(10, 40):.1f}",
+             "2024 Objective": "24.2", "Quartile": str(rng.integers(1, 5)),
+             "Event Count/Rate": str(rng.integers(50, 5000)), "Measure Unit": "Percent", "Data Comments": "", "Date Source": "BRFSS"}
+            for indicator in indicators for county in counties for year in years]
+    return pd.DataFrame(rows)
+
+@pytest.fixture
+def pa_frame():
+    return pa_rows
@@ -0,0 +1,24 @@
+# tests/test_correlation.py
+import numpy as np
+import pandas as pd
+
+from modules import correlation
+
+
+def test_pairwise_corr_matches_pandas_pairwise_complete():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(62, 6))
+    values[:, 1] += values[:, 0] * 2  # One strongly correlated pair.
+    values[rng.random(values.shape) < 0.25] = np.nan
+    values[:50, 5] = np.nan  # Too few counties in common with any column.
+
+    r, n = correlation.pairwise_corr(values, min_periods=15)
+    expected = pd.DataFrame(values).corr(min_periods=15).to_numpy()
+    np.testing.assert_allclose(r, expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+    present = ~np.isnan(values)
+    np.testing.assert_array_equal(n, present.T.astype(int) @ present.astype(int))
+
+def test_constant_column_has_no_coefficient():
+    values = np.column_stack([np.arange(20.0), np.full(20, 3.0)])
+    r, _ = correlation.pairwise_corr(values, min_periods=5)
+    assert np.isnan(r[0, 1]) and np.isnan(r[1, 1])
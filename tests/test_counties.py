@@ -0,0 +1,46 @@
+# tests/test_counties.py
+import pandas as pd
+import pytest
+
+from modules import counties, utils
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Dutchess", 36027), ("Dutchess County", 36027), ("Dutchess County, New York", 36027),
+    ("Kings (Brooklyn)", 36047), ("Brooklyn", 36047), ("Kings", 36047), ("047", 36047), ("36047", 36047),
+    (36047, 36047), (47, 36047), ("0500000US36047", 36047), ("St. Lawrence", 36089), ("Saint Lawrence County", 36089),
+    ("New York County", 36061), ("Manhattan", 36061), ("New York (Manhattan)", 36061),
+    ("Essex/Hamilton", None), ("New York State", None), ("36999", None), (None, None), (float("nan"), None),
+])
+def test_fips_resolves_every_source_form(value, expected):
+    assert counties.fips(value) == expected
+
+def test_new_york_is_manhattan_only_where_the_state_is_named_separately():
+    with_state = counties.attach(pd.DataFrame({"area": ["New York", "New York State", "Kings"]}), "area", "test-with-state")
+    assert with_state[counties.KEY].tolist()[0] == 36061
+    assert pd.isna(with_state[counties.KEY].tolist()[1])
+
+    without_state = counties.attach(pd.DataFrame({"area": ["New York", "Kings"]}), "area", "test-without-state")
+    assert pd.isna(without_state[counties.KEY].tolist()[0])
+    assert without_state[counties.KEY].tolist()[1] == 36047
+    report = counties.unmatched_report()
+    row = report[(report["Dataset"] == "test-without-state") & (report["Name"] == "New York")]
+    assert row["Kind"].tolist() == ["Ambiguous (state or county)"]
+
+def test_codes_take_precedence_over_names():
+    df = pd.DataFrame({"county": ["New York", "Albany"]})
+    keyed = counties.attach(df, "county", "test-codes", codes=pd.Series(["36061", "36001"]))
+    assert keyed[counties.KEY].tolist() == [36061, 36001]
+
+def test_unmatched_names_are_kept_per_file(tmp_path, pa_frame):
+    extract, trend = tmp_path / "latest.csv", tmp_path / "trend.csv"
+    pa_frame([2022], counties=["Albany", "Essex/Hamilton"]).to_csv(extract, index=False)
+    pa_frame([2021, 2022], counties=["Albany", "NYS excluding NYC"]).to_csv(trend, index=False)
+    utils.read_prevention_data(extract)
+    utils.read_prevention_data(trend)
+
+    report = counties.unmatched_report()
+    report = report[report["File"].isin(["latest.csv", "trend.csv"])]
+    assert report[["Dataset", "File", "Name", "Rows"]].to_dict("records") == [
+        {"Dataset": "Prevention Agenda", "File": "latest.csv", "Name": "Essex/Hamilton", "Rows": 2},
+        {"Dataset": "Prevention Agenda", "File": "trend.csv", "Name": "NYS excluding NYC", "Rows": 4}]
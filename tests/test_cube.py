@@ -0,0 +1,66 @@
+# tests/test_cube.py
+import numpy as np
+import pandas as pd
+
+from modules import counties, cube
+
+INDEX = {"counties": [{"fips": f, "name": counties.name(int(f))} for f in ("36001", "36027", "36047", "36061", "36071")]}
+
+def _pa(rows):
+    df = pd.DataFrame(rows, columns=["Priority Area", "Indicator", "County Name", "Data Years", "Percentage/Rate/Ratio", "Data Comments"])
+    return counties.attach(df, "County Name", "test-cube")
+
+def _cell(built, county, indicator, year):
+    code = built["indicator_codes"][("Prevention Agenda", indicator)]
+    return built["values"][built["county_rows"][county], code, year - built["years"][0]]
+
+def test_cube_cells_latest_values_and_flags():
+    built = cube.build_cube({"Prevention Agenda": _pa([
+        ["Chronic Disease", "Obesity", "Albany", "2020", 30.0, ""],
+        ["Chronic Disease", "Obesity", "Albany", "2019-2021", 31.0, "Unstable estimate"],
+        ["Chronic Disease", "Obesity", "Kings", "2020", 25.0, ""],
+        ["Chronic Disease", "Obesity", "New York State", "2020", 28.0, ""],
+        ["Chronic Disease", "Obesity", "New York", "2021", 22.0, ""]])}, INDEX)
+    assert list(built["years"]) == [2020, 2021]
+    assert built["values"].shape == (5, 1, 2)
+    assert _cell(built, 36001, "Obesity", 2020) == 30.0
+    assert _cell(built, 36061, "Obesity", 2021) == 22.0  # "New York" is Manhattan beside a "New York State" row.
+    assert built["latest_value"][built["county_rows"][36001], 0] == 31.0
+    assert built["latest_flags"][built["county_rows"][36001], 0] == cube.FLAG_NOTED | cube.FLAG_UNSTABLE
+    assert np.isnan(_cell(built, 36027, "Obesity", 2020))
+    assert built["conflicts"].empty
+
+def test_duplicate_listings_collapse_and_disagreements_are_conflicts():
+    built = cube.build_cube({"Prevention Agenda": _pa([
+        ["Chronic Disease", "Obesity", "Albany", "2020", 30.0, ""],
+        ["Healthy Eating", "Obesity", "Albany", "2020", 30.0, ""],
+        ["Chronic Disease", "Obesity", "Kings", "2020", np.nan, ""],
+        ["Healthy Eating", "Obesity", "Kings", "2020", 25.0, ""],
+        ["Chronic Disease", "Obesity", "Orange", "2020", 20.0, ""],
+        ["Healthy Eating", "Obesity", "Orange", "2020", 21.0, ""]])}, INDEX)
+    assert _cell(built, 36001, "Obesity", 2020) == 30.0
+    assert _cell(built, 36047, "Obesity", 2020) == 25.0
+    assert np.isnan(_cell(built, 36071, "Obesity", 2020))
+    assert built["conflicts"]["fips"].tolist() == [36071]
+    assert sorted(built["conflicts"]["value"].iloc[0]) == [20.0, 21.0]
+    assert built["indicators"]["area"].tolist() == ["Chronic Disease; Healthy Eating"]
+
+def test_apply_delta_equals_full_rebuild():
+    base = [["Chronic Disease", "Obesity", "Albany", "2020", 30.0, ""],
+            ["Chronic Disease", "Obesity", "Kings", "2020", 25.0, ""],
+            ["Chronic Disease", "Obesity", "Orange", "2020", 20.0, ""],
+            ["Chronic Disease", "Smoking", "Orange", "2021", 12.0, ""],
+            ["Chronic Disease", "Obesity", "New York State", "2020", 28.0, ""]]
+    delta = [["Chronic Disease", "Obesity", "Albany", "2022", 29.0, "Unstable estimate"],  # New year.
+             ["Chronic Disease", "Obesity", "Kings", "2020", 25.0, ""],  # Same value again.
+             ["Healthy Eating", "Obesity", "Orange", "2020", 22.0, ""],  # Disagrees with the stored value.
+             ["Chronic Disease", "Diabetes", "Dutchess", "2019", 9.0, ""]]  # New indicator, earlier year.
+    patched = cube.apply_delta(cube.build_cube({"Prevention Agenda": _pa(base)}, INDEX), {"Prevention Agenda": _pa(delta)}, INDEX)
+    full = cube.build_cube({"Prevention Agenda": _pa(base + delta)}, INDEX)
+
+    order = [patched["indicator_codes"][key] for key in full["indicator_codes"]]
+    np.testing.assert_array_equal(patched["years"], full["years"])
+    for name in ("values", "flags", "latest_value", "latest_year", "latest_flags"):
+        np.testing.assert_array_equal(patched[name][:, order], full[name], err_msg=name)
+    conflicts = lambda built: built["conflicts"].assign(value=built["conflicts"]["value"].map(sorted)).to_dict("records")
+    assert conflicts(patched) == conflicts(full)
@@ -0,0 +1,28 @@
+# tests/test_ejscreen.py
+import numpy as np
+import pandas as pd
+
+from modules import ejscreen, utils
+
+COLUMNS = ['ID', 'STATE_FIPS', 'P_LDPNT_D2', 'P_PM25_D2', 'P_OZONE_D2', 'P_CANCR_D2', 'P_RESP_D2', 'P_TRAFF_D2', 'P_PROXPN_D2',
+           'P_LOWINC_D2', 'P_LMINR_D2', 'P_LESHSP_D2', 'P_LNGISP_D2', 'P_UNDR5_D2', 'P_OVR64_D2', 'ACSTOTPOP']
+
+def _tract_file(path):
+    rng = np.random.default_rng(5)
+    ids = [f"36001{i:06d}" for i in range(4)] + [f"36027{i:06d}" for i in range(3)] + ["34003000100"]
+    df = pd.DataFrame(rng.uniform(0, 100, (len(ids), len(COLUMNS))), columns=COLUMNS)
+    df["ID"], df["STATE_FIPS"] = ids, [i[:2] for i in ids]
+    df["ACSTOTPOP"] = rng.integers(1000, 6000, len(ids))
+    df.to_csv(path, index=False)
+    return path
+
+def test_county_tracts_are_sliced_from_the_shared_index(tmp_path, monkeypatch):
+    path = _tract_file(tmp_path / "ejscreen.csv")
+    full = utils.load_ejscreen_data(path)
+    dutchess = ejscreen.get_county_tracts(path, "Dutchess")
+    pd.testing.assert_frame_equal(dutchess.reset_index(drop=True), full[full["County Name"] == "Dutchess"].reset_index(drop=True))
+    assert ejscreen.get_county_tracts(path, "Kings").empty
+
+    # Later drill-downs never reload (and copy) the tract table.
+    monkeypatch.setattr(utils, "load_ejscreen_data", lambda *args: (_ for _ in ()).throw(AssertionError("reloaded")))
+    assert len(ejscreen.get_county_tracts(path, "Albany")) == 4
@@ -0,0 +1,34 @@
+# tests/test_geo.py
+import numpy as np
+
+from modules import geo
+
+def _square(x0, name, geoid):
+    ring = [[x0, 0], [x0 + 1, 0], [x0 + 1, 1], [x0, 1], [x0, 0]]
+    return {"type": "Feature", "properties": {"name": name, "geoid": geoid}, "geometry": {"type": "Polygon", "coordinates": [ring]}}
+
+def _decode(topology, index):
+    arc = np.cumsum(topology["arcs"][index if index >= 0 else ~index], axis=0)
+    points = arc * topology["transform"]["scale"] + topology["transform"]["translate"]
+    return points if index >= 0 else points[::-1]
+
+# Two unit squares side by side, sharing the edge x = 1.
+GEOJSON = {"type": "FeatureCollection", "features": [_square(0, "Albany County", "0500000US36001"),
+                                                     _square(1, "Allegany County", "0500000US36003")]}
+
+def test_topology_ids_and_shared_arc():
+    topology = geo.build_topology(GEOJSON, quantization=11, tolerance=0)
+    geometries = topology["objects"][geo.TOPOLOGY_OBJECT]["geometries"]
+    assert [g["id"] for g in geometries] == ["36001", "36003"]
+    assert [g["properties"]["name"] for g in geometries] == ["Albany County", "Allegany County"]
+    left, right = ({a if a >= 0 else ~a for a in g["arcs"][0][0]} for g in geometries)
+    shared = left & right
+    assert len(shared) == 1  # The common edge is stored once and referenced by both counties.
+    assert len(topology["arcs"]) == 3
+
+def test_topology_rings_decode_to_the_original_corners():
+    topology = geo.build_topology(GEOJSON, quantization=11, tolerance=0)
+    for feature, geometry in zip(GEOJSON["features"], topology["objects"][geo.TOPOLOGY_OBJECT]["geometries"]):
+        ring = np.concatenate([_decode(topology, a)[:-1] for a in geometry["arcs"][0][0]])
+        expected = {tuple(p) for p in feature["geometry"]["coordinates"][0]}
+        assert {tuple(np.round(p, 6)) for p in ring} == expected
@@ -0,0 +1,66 @@
+# tests/test_hanlon.py
+import numpy as np
+import pandas as pd
+
+from modules import hanlon
+
+def _baseline_suggestions(row):
+    """The per-row scoring the Hanlon page did before batch scoring, unchanged."""
+    size = 5
+    if pd.notna(row.get('Event Count/Rate')):
+        try:
+            event_count = float(str(row['Event Count/Rate']).replace(',', ''))
+            if event_count > 1000: size = 8
+            elif event_count > 500: size = 7
+            elif event_count > 100: size = 6
+        except (ValueError, TypeError):
+            pass
+    seriousness = 5
+    quartile = str(row.get('Quartile', ''))
+    if 'Q4' in quartile: seriousness = 9
+    elif 'Q3' in quartile: seriousness = 7
+    elif 'Q1' in quartile or 'Q2' in quartile: seriousness = 4
+    return size, seriousness
+
+def _pa_scores_frame():
+    rng = np.random.default_rng(3)
+    counts = ["1,500", "1000", "1000.5", "501", "500", "101", "100", "42", "", "n/a", None, np.nan, "s", "2,000,000"]
+    quartiles = ["Q1 (Best)", "Q2", "Q3", "Q4 (Worst)", "Q3 - Q4", "", None, np.nan, "N/A", "q4"]
+    rows = []
+    for county in ["Albany", "Dutchess", "Kings"]:
+        for area, focus in [("Chronic Disease", "Healthy Eating"), ("Chronic Disease", "Tobacco"), ("Mental Health", "Well-being")]:
+            for indicator in ["A", "B", "C", "D"]:
+                for year in rng.permutation([2019, 2020, 2021])[:rng.integers(1, 4)]:
+                    rows.append({"County Name": county, "Priority Area": area, "Focus Area": focus, "Indicator": indicator,
+                                 "Data Years": str(year), "Percentage/Rate/Ratio": rng.uniform(0, 50),
+                                 "Event Count/Rate": counts[rng.integers(len(counts))], "Quartile": quartiles[rng.integers(len(quartiles))]})
+    rows.append(dict(rows[0], **{"County Name": None}))  # Rows without a county are not scored.
+    return pd.DataFrame(rows)
+
+def test_batch_scores_match_the_per_row_baseline():
+    df = _pa_scores_frame()
+    scores = hanlon.score_latest(df).set_index(hanlon.KEY_COLS)
+    latest = df.dropna(subset=hanlon.KEY_COLS).assign(_year=df["Data Years"].astype(int))
+    latest = latest.loc[latest.groupby(hanlon.KEY_COLS)["_year"].idxmax()].set_index(hanlon.KEY_COLS)
+    assert sorted(scores.index) == sorted(latest.index)
+    for key, row in latest.iterrows():
+        assert (scores.loc[key, "Size"], scores.loc[key, "Seriousness"]) == _baseline_suggestions(row), key
+        assert scores.loc[key, "Data Years"] == row["Data Years"]
+
+def test_rank_order_with_ties_and_weights():
+    scores = hanlon.score_latest(_pa_scores_frame())
+    effectiveness = {"Chronic Disease": 1.2, "Mental Health": 0.5}
+    ranked = hanlon.rank_priorities(scores, effectiveness)
+    for county, group in ranked.groupby("County Name"):
+        priority = [(size + seriousness) * effectiveness[area]
+                    for size, seriousness, area in zip(group["Size"], group["Seriousness"], group["Priority Area"])]
+        expected = [1 + sum(other > score for other in priority) for score in priority]  # Tied scores share the best rank.
+        assert group["Rank"].tolist() == expected
+        assert group["Rank"].is_monotonic_increasing
+        assert np.allclose(group["Priority Score"], priority)
+    assert ranked.duplicated(["County Name", "Rank"]).any()  # The data does contain ties.
+
+def test_unweighted_priority_areas_use_the_default_effectiveness():
+    scores = hanlon.score_latest(_pa_scores_frame())
+    ranked = hanlon.rank_priorities(scores, {})
+    assert (ranked["Effectiveness"] == hanlon.DEFAULT_EFFECTIVENESS).all()
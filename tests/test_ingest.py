@@ -0,0 +1,72 @@
+# tests/test_ingest.py
+import pandas as pd
+import pytest
+
+from modules import hanlon, ingest, trends, utils
+from modules.config import CONFIGS
+
+DATASET = "Prevention Agenda Trends"
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, pa_frame):
+    """A data directory holding a Prevention Agenda source file, with the ingest store beside it."""
+    monkeypatch.setattr(ingest, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ingest, "STORE_DIR", tmp_path / utils.STORE_DIR_NAME)
+    monkeypatch.setattr(ingest, "DELTA_DIR", tmp_path / utils.STORE_DIR_NAME / "deltas")
+    monkeypatch.setattr(ingest, "_derived", {})
+    pa_frame([2018, 2019, 2020]).to_csv(tmp_path / ingest.SOURCE_FILES[DATASET], index=False)
+    return tmp_path
+
+def _append(data_dir, name, rows):
+    rows.to_csv(data_dir / name, index=False)
+    report = ingest.append_delta(DATASET, data_dir / name)
+    assert not report.get("errors"), report
+    return report
+
+def _derived(source, key, compute, key_cols, builds):
+    """A derived table through ingest.incremental, the way hanlon and trends build theirs."""
+    def build():
+        builds.append(key)
+        return compute(utils.load_prevention_data(source))
+    path = str(source)
+    return ingest.incremental(key, {path: utils.dataset_version(source)}, build,
+                              lambda previous, deltas: ingest.patch_groups(previous, utils.load_prevention_data(source),
+                                                                           deltas[path], key_cols, compute))
+
+def _sorted(df, cols):
+    return df.sort_values(cols, ignore_index=True)
+
+def test_first_append_seeds_the_store_and_loaders_follow_it(data_dir, pa_frame):
+    source = data_dir / ingest.SOURCE_FILES[DATASET]
+    report = _append(data_dir, "2021.csv", pa_frame([2021], seed=1))
+    assert (report["rows_new"], report["rows_revised"], report["new_years"]) == (10, 0, ["2021"])
+    assert utils.current_path(source) == ingest.store_path(DATASET)
+    loaded = utils.load_prevention_data(source)
+    assert sorted(loaded["Data Years"].unique()) == ["2018", "2019", "2020", "2021"]
+
+    revision = pa_frame([2021], seed=2).iloc[:1]
+    report = _append(data_dir, "revision.csv", revision)
+    assert (report["rows_new"], report["rows_revised"]) == (0, 1)
+    assert len(utils.load_prevention_data(source)) == 40
+
+@pytest.mark.parametrize("name, compute, key_cols", [
+    ("hanlon", hanlon.score_latest, hanlon.KEY_COLS),
+    ("trends", lambda df: trends.fit_trends(df, trends.series_columns(CONFIGS[DATASET]), "Data Years", "Percentage/Rate/Ratio"),
+     trends.series_columns(CONFIGS[DATASET])),
+])
+def test_incremental_ingest_equals_full_rebuild(data_dir, pa_frame, name, compute, key_cols):
+    source = data_dir / ingest.SOURCE_FILES[DATASET]
+    _append(data_dir, "2021.csv", pa_frame([2021], seed=1))
+    builds = []
+    _derived(source, name, compute, key_cols, builds)
+
+    # A new year for one indicator, then a revision and a new county-year for another.
+    _append(data_dir, "2022.csv", pa_frame([2022], indicators=("Adult obesity",), seed=3))
+    revised = pa_frame([2020, 2023], indicators=("Adult smoking",), counties=["Kings"], seed=4)
+    _append(data_dir, "revision.csv", revised)
+    patched = _derived(source, name, compute, key_cols, builds)
+    assert builds == [name]  # Both appends were patched in, not rebuilt.
+
+    full = compute(utils.load_prevention_data(source))
+    cols = [col for col in key_cols if col in full.columns]
+    pd.testing.assert_frame_equal(_sorted(patched, cols), _sorted(full, cols), check_dtype=False)
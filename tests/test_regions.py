@@ -0,0 +1,53 @@
+# tests/test_regions.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import counties, regions
+
+SPEC = {"county_col": "County Name", "value_col": "Rate", "keys": ["Indicator", "Data Years"], "notes_col": "Notes",
+        "count_col": "Event Count", "denominator_col": "Denominator"}
+REGION = (("Test (Region)", (36001, 36027, 36071)),)  # Albany, Dutchess, Orange
+
+def _frame(rates, denominators):
+    df = pd.DataFrame({"Indicator": "Obesity", "Data Years": "2022", "County Name": ["Albany", "Dutchess", "Orange"],
+                       "Rate": rates, "Event Count": np.nan, "Denominator": denominators, "Notes": ""})
+    return counties.attach(df, "County Name", "test-regions")
+
+def test_denominator_weighted_when_every_reporting_county_has_one():
+    rolled = regions.aggregate(_frame([10.0, 20.0, 40.0], [100, 300, 600]), SPEC, REGION)
+    row = rolled.iloc[0]
+    assert row["County Name"] == "Test (Region)"
+    assert row["Rate"] == pytest.approx((10 * 100 + 20 * 300 + 40 * 600) / 1000)
+    assert row["Denominator"] == 1000
+    assert row["Notes"] == "Region: 3 of 3 counties reporting, denominator-weighted"
+    assert pd.isna(row[counties.KEY])
+
+def test_population_weighted_when_a_denominator_is_missing():
+    population = {36001: 300_000, 36027: 300_000, 36071: 400_000}
+    rolled = regions.aggregate(_frame([10.0, 20.0, 40.0], [100, np.nan, 600]), SPEC, REGION, population)
+    assert rolled.iloc[0]["Rate"] == pytest.approx((10 * 3 + 20 * 3 + 40 * 4) / 10)
+    assert rolled.iloc[0]["Notes"].endswith("population-weighted")
+    assert pd.isna(rolled.iloc[0]["Denominator"])
+
+def test_plain_mean_without_weights_and_missing_counties_skipped():
+    rolled = regions.aggregate(_frame([10.0, np.nan, 40.0], [np.nan, np.nan, np.nan]), SPEC, REGION)
+    assert rolled.iloc[0]["Rate"] == pytest.approx(25.0)
+    assert rolled.iloc[0]["Notes"] == "Region: 2 of 3 counties reporting, unweighted mean"
+
+def test_one_row_per_region_and_published_value():
+    df = pd.concat([_frame([10.0, 20.0, 40.0], [1, 1, 1]), _frame([1.0, 2.0, 3.0], [1, 1, 1]).assign(**{"Data Years": "2023"})],
+                   ignore_index=True)
+    region_defs = REGION + (("Pair (Region)", (36001, 36027)),)
+    rolled = regions.aggregate(df, SPEC, region_defs)
+    assert len(rolled) == 4
+    assert list(rolled.columns) == list(df.columns)
+    pair = rolled[(rolled["County Name"] == "Pair (Region)") & (rolled["Data Years"] == "2023")]
+    assert pair["Rate"].tolist() == [1.5]
+
+def test_population_is_needed_only_where_a_denominator_is_missing():
+    assert not regions.needs_population(_frame([10.0, 20.0, 40.0], [100, 300, 600]), SPEC, REGION)
+    assert not regions.needs_population(_frame([10.0, np.nan, 40.0], [100, np.nan, 600]), SPEC, REGION)
+    assert regions.needs_population(_frame([10.0, 20.0, 40.0], [100, np.nan, 600]), SPEC, REGION)
+    assert regions.needs_population(_frame([10.0, 20.0, 40.0], [100, 300, 600]), dict(SPEC, denominator_col=None), REGION)
+    assert not regions.needs_population(_frame([10.0, 20.0, 40.0], [100, np.nan, 600]), SPEC, (("Other (Region)", (36047,)),))
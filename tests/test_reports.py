@@ -0,0 +1,25 @@
+# tests/test_reports.py
+import altair as alt
+import pandas as pd
+
+from modules import reports
+
+def _chart_section():
+    df = pd.DataFrame({"Year": [2020, 2021, 2022], "Rate": [10.5, 11.0, 9.8]})
+    chart = alt.Chart(df).mark_line(point=True).encode(x="Year:O", y="Rate:Q")
+    return {"html": f"<h2>{reports.SECTION_NUMBER}. Rate</h2><div id='{reports.CHART_DIV_ID}'></div>",
+            "chart": reports.split_chart(chart.to_json())}
+
+def test_runtime_is_vendored_for_altairs_major_versions():
+    assert reports.missing_runtime() == []
+    targets = {"vega": alt.VEGA_VERSION, "vega-lite": alt.VEGALITE_VERSION, "vega-embed": alt.VEGAEMBED_VERSION}
+    for name, version in reports.VEGA_RUNTIME:
+        assert version.split(".")[0] == targets[name].lstrip("v").split(".")[0]
+
+def test_build_report_html_inlines_the_vendored_runtime():
+    html = reports.build_report_html("Report", "<h1>Report</h1>", [_chart_section(), _chart_section()], reports.ANALYSIS_REPORT_CSS)
+    assert "cdn.jsdelivr.net" not in html and "<script src=" not in html
+    for name, version in reports.VEGA_RUNTIME:
+        source = reports.vendored_runtime_path(name, version).read_text(encoding="utf-8").replace("</script", "<\\/script")
+        assert html.count(source) == 1
+    assert "<h2>2. Rate</h2><div id='vis2'>" in html
@@ -0,0 +1,61 @@
+# tests/test_trends.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import trends
+
+# Two-sided 95% Student's t critical values, for the degrees of freedom used below.
+T_95 = {1: 12.7062, 2: 4.3027, 3: 3.1824, 4: 2.7764, 5: 2.5706, 6: 2.4469}
+
+def _series(rng, name, years, slope, noise, ci=None):
+    values = 20 + slope * (np.asarray(years) - years[0]) + rng.normal(0, noise, len(years))
+    frame = pd.DataFrame({"series": name, "year": [str(y) for y in years], "value": values})
+    if ci is not None:
+        frame["low"], frame["high"] = values - ci, values + ci
+    return frame
+
+def _reference(group, weighted):
+    """Slope, 95% CI and significance from numpy.polyfit, one series at a time."""
+    x, y = group["year"].astype(float).to_numpy(), group["value"].to_numpy()
+    se = ((group["high"] - group["low"]) / (2 * 1.96)).to_numpy() if weighted else np.ones_like(y)
+    (slope, intercept), cov = np.polyfit(x, y, 1, w=1 / se, cov="unscaled")
+    dof = len(x) - 2
+    scale = np.sum(((y - slope * x - intercept) / se) ** 2) / dof
+    slope_se = np.sqrt(cov[0, 0] * (max(scale, 1.0) if weighted else scale))
+    half = T_95[dof] * slope_se
+    return slope, slope - half, slope + half, bool(slope_se > 0 and abs(slope) > half or slope_se == 0 and slope != 0)
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_grouped_fit_matches_polyfit(weighted):
+    rng = np.random.default_rng(7)
+    frames = [_series(rng, f"s{i}", list(range(2014, 2014 + n)), slope, noise, ci=rng.uniform(0.5, 3, n) if weighted else None)
+              for i, (n, slope, noise) in enumerate([(8, 1.5, 0.5), (5, -0.8, 0.3), (6, 0.0, 2.0), (3, 0.2, 1.0), (4, 2.0, 6.0)])]
+    df = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=1)  # Rows of a series need not be adjacent.
+    fit = trends.fit_trends(df, ["series"], "year", "value", ci_cols=("low", "high") if weighted else None).set_index("series")
+    assert set(fit["Method"]) == {"WLS (CI)" if weighted else "OLS"}
+
+    for name, group in df.groupby("series"):
+        slope, low, high, significant = _reference(group, weighted)
+        row = fit.loc[name]
+        assert row["Points"] == len(group)
+        assert row["Change per Year"] == pytest.approx(slope, abs=1e-4)
+        # The module's t table has three decimals.
+        assert row["CI Low"] == pytest.approx(low, rel=1e-3, abs=1e-4) and row["CI High"] == pytest.approx(high, rel=1e-3, abs=1e-4)
+        assert row["Significant"] == significant
+    assert fit["Significant"].any() and not fit["Significant"].all()
+
+def test_degenerate_series():
+    df = pd.DataFrame({
+        "series": ["single", "flat", "flat", "flat", "same-year", "same-year", "pair", "pair", "exact", "exact", "exact"],
+        "year": ["2020", "2018", "2019", "2020", "2020", "2020", "2019", "2020", "2018", "2019", "2020"],
+        "value": [5.0, 7.0, 7.0, 7.0, 1.0, 2.0, 1.0, 3.0, 1.0, 2.0, 3.0]})
+    fit = trends.fit_trends(df, ["series"], "year", "value").set_index("series")
+    assert "single" not in fit.index  # One point has no trend.
+    flat = fit.loc["flat"]
+    assert (flat["Change per Year"], flat["CI Low"], flat["CI High"], flat["Significant"]) == (0, 0, 0, False)
+    assert np.isnan(fit.loc["same-year", "Change per Year"]) and not fit.loc["same-year", "Significant"]
+    pair = fit.loc["pair"]  # Two points: a slope but no interval, and too few points to be significant.
+    assert pair["Change per Year"] == 2 and np.isnan(pair["CI Low"]) and not pair["Significant"]
+    exact = fit.loc["exact"]  # A perfect fit is significant with a zero-width interval.
+    assert (exact["Change per Year"], exact["CI Low"], exact["CI High"], exact["Significant"]) == (1, 1, 1, True)